@@ -21,6 +21,10 @@ setup(
         "pydantic>=2.0.0",
     ],
     extras_require={
+        "speedups": [
+            "orjson>=3.8.0",
+            "msgpack>=1.0.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
         ],
@@ -0,0 +1,56 @@
+import argparse
+import sys
+from .harness import run_benchmarks, compare, load_results, save_results
+
+
+def _progress(name, result):
+    if "skipped" in result:
+        print(f"  {name:<36} skipped ({result['skipped']})")
+    else:
+        print(f"  {name:<36} {result['ns_per_op'] / 1000:>12.2f} us/op  (median {result['median_ns_per_op'] / 1000:.2f})")
+
+
+def run_bench_tool(pattern: str = "*", output: str = None, baseline: str = None, threshold: float = 0.10,
+                   min_time: float = 0.2, repeats: int = 5) -> int:
+    """
+    Run benchmarks, optionally write JSON results and compare with a baseline.
+    Returns the process exit code: 1 if any benchmark regressed beyond `threshold`.
+    """
+    print(f"Running benchmarks matching '{pattern}'...")
+    results = run_benchmarks(pattern, min_time=min_time, repeats=repeats, progress=_progress)
+    if output:
+        save_results(output, results)
+        print(f"Results written to {output}")
+
+    if not baseline:
+        return 0
+    rows = compare(results, load_results(baseline), threshold)
+    print(f"\nCompared with {baseline} (threshold {threshold:.0%}):")
+    for row in rows:
+        print(f"  {row['name']:<36} {row['baseline_ns'] / 1000:>10.2f} -> {row['current_ns'] / 1000:>10.2f} us/op "
+              f"{(row['ratio'] - 1):>+7.1%}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regressed"]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed.")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("pattern", nargs="?", default="*", help="Glob over benchmark names or groups (default: *)")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", "-b", help="Compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing (default: 0.10)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed run (default: 0.2)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+
+
+def run_from_args(args):
+    sys.exit(run_bench_tool(args.pattern, args.output, args.baseline, args.threshold, args.min_time, args.repeats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the C-S Framework benchmarks.")
+    add_arguments(parser)
+    run_from_args(parser.parse_args())
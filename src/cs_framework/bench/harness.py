@@ -0,0 +1,145 @@
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# name -> (group, factory). A factory does the setup and returns (op, ops_per_call):
+# `op()` is what gets timed and performs `ops_per_call` operations. Factories that
+# open resources (sockets, threads, shared memory) return (op, ops_per_call, teardown)
+# instead; `teardown()` is called once the benchmark has been timed (or failed).
+BENCHMARKS: Dict[str, Tuple[str, Callable[[], tuple]]] = {}
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a factory when a benchmark cannot run here (e.g. examples not on disk)."""
+    pass
+
+
+def benchmark(name: str, group: str = "core"):
+    """Register a benchmark factory under `name`."""
+    def decorator(factory):
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark '{name}' is already registered")
+        BENCHMARKS[name] = (group, factory)
+        return factory
+    return decorator
+
+
+def _time_op(op: Callable[[], Any], min_time: float, repeats: int) -> Dict[str, Any]:
+    # Calibrate: grow the loop count until one run takes at least min_time
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    timings = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        timings.append((time.perf_counter() - start) / loops)
+    return {"loops": loops, "timings": timings}
+
+
+def run_benchmarks(pattern: str = "*", min_time: float = 0.2, repeats: int = 5,
+                   progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run the registered benchmarks whose name matches the glob `pattern`.
+
+    Each benchmark is timed `repeats` times with a loop count calibrated to
+    take at least `min_time` seconds; the reported ns_per_op is the best run
+    (least disturbed by other processes), with the median alongside.
+    """
+    # Importing the suites registers them
+    from . import suites, transport  # noqa: F401
+
+    results: Dict[str, Any] = {}
+    for name, (group, factory) in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern) and not fnmatch.fnmatch(group, pattern):
+            continue
+        try:
+            setup = factory()
+        except BenchmarkSkipped as e:
+            results[name] = {"group": group, "skipped": str(e)}
+            if progress:
+                progress(name, results[name])
+            continue
+        op, ops_per_call = setup[0], setup[1]
+        teardown = setup[2] if len(setup) > 2 else None
+
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            timing = _time_op(op, min_time, repeats)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+            if teardown:
+                teardown()
+        per_op = [t * 1e9 / ops_per_call for t in timing["timings"]]
+        results[name] = {
+            "group": group,
+            "ns_per_op": min(per_op),
+            "median_ns_per_op": statistics.median(per_op),
+            "ops_per_call": ops_per_call,
+            "loops": timing["loops"],
+            "repeats": repeats,
+        }
+        if progress:
+            progress(name, results[name])
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "min_time": min_time,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare two run_benchmarks() results. A benchmark regressed when its
+    ns_per_op grew by more than `threshold` (0.10 = 10%).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if "ns_per_op" not in result or not base or "ns_per_op" not in base:
+            continue
+        ratio = result["ns_per_op"] / base["ns_per_op"] if base["ns_per_op"] else 1.0
+        if ratio > 1 + threshold:
+            status = "regressed"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline_ns": base["ns_per_op"], "current_ns": result["ns_per_op"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(path: str, results: Dict[str, Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,323 @@
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import uuid
+from pydantic import BaseModel
+from ..core.concept import Concept
+from ..core.event import EventPattern, ActionInvocation
+from ..core.synchronization import Synchronization
+from ..core.yaml_loader import YamlLoader
+from ..engine.runner import Runner
+from ..logging.logger import RDFLogger
+from .harness import benchmark, BenchmarkSkipped
+
+# src/examples next to the cs_framework package (source checkout only)
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "examples")
+
+
+class Moved(BaseModel):
+    x: int
+    y: int
+
+
+class Counter(Concept):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._state = {"count": 0, "history": list(range(20))}
+
+    def increment(self, payload: dict):
+        self._state["count"] += 1
+
+    def relay(self, payload: dict):
+        self._state["count"] += 1
+        self.emit("relayed", payload)
+
+
+class Mover(Concept):
+    __events__ = {"moved": Moved}
+
+
+def _runner(**kwargs) -> Runner:
+    # Metrics stay on: they are part of the default per-action cost
+    return Runner(**kwargs)
+
+
+def _tick(runner: Runner, concept_id: uuid.UUID, action: str, payload: dict):
+    runner.dispatch(concept_id, action, payload)
+    # Keep memory flat over millions of iterations
+    if len(runner.history) > 1000:
+        del runner.history[:-1]
+
+
+@benchmark("concept.dispatch")
+def bench_dispatch():
+    concept = Counter("Counter")
+    return lambda: concept.dispatch("increment", {}), 1
+
+
+@benchmark("concept.emit.dict")
+def bench_emit_dict():
+    concept = Counter("Counter")
+
+    def op():
+        concept.emit("moved", {"x": 1, "y": 2})
+        concept._pending_events.clear()
+    return op, 1
+
+
+@benchmark("concept.emit.pydantic")
+def bench_emit_pydantic():
+    concept = Mover("Mover")
+
+    def op():
+        concept.emit("moved", {"x": 1, "y": 2})
+        concept._pending_events.clear()
+    return op, 1
+
+
+@benchmark("runner.sync_matching.100_rules", group="runner")
+def bench_sync_matching():
+    # One event checked against 100 rules of which one matches
+    runner = _runner()
+    source, target = Counter("Source"), Counter("Target")
+    runner.register(source)
+    runner.register(target)
+    for i in range(99):
+        runner.register(Synchronization(f"Other{i}", when=EventPattern(source, f"other{i}"),
+                                        then=[ActionInvocation(target, "increment", lambda e: {})]))
+    runner.register(Synchronization("Relay", when=EventPattern(source, "relayed"),
+                                    then=[ActionInvocation(target, "increment", lambda e: {})]))
+    runner.start()
+    return lambda: _tick(runner, source.id, "relay", {}), 1
+
+
+@benchmark("runner.cascade.depth_8", group="runner")
+def bench_cascade_depth():
+    # A chain of 8 concepts, each relaying to the next
+    runner = _runner()
+    chain = [Counter(f"C{i}") for i in range(9)]
+    for concept in chain:
+        runner.register(concept)
+    for a, b in zip(chain, chain[1:]):
+        runner.register(Synchronization(f"{a.name}To{b.name}", when=EventPattern(a, "relayed"),
+                                        then=[ActionInvocation(b, "relay", lambda e: {})]))
+    runner.start()
+    return lambda: _tick(runner, chain[0].id, "relay", {}), 1
+
+
+@benchmark("runner.cascade.fanout_50", group="runner")
+def bench_fanout():
+    # One event triggering 50 actions
+    runner = _runner()
+    source = Counter("Source")
+    targets = [Counter(f"T{i}") for i in range(50)]
+    runner.register(source)
+    for target in targets:
+        runner.register(target)
+    runner.register(Synchronization("FanOut", when=EventPattern(source, "relayed"),
+                                    then=[ActionInvocation(t, "increment", lambda e: {}) for t in targets]))
+    runner.start()
+    return lambda: _tick(runner, source.id, "relay", {}), 1
+
+
+@benchmark("runner.snapshot.20_concepts", group="runner")
+def bench_snapshot():
+    runner = _runner()
+    for i in range(20):
+        runner.register(Counter(f"C{i}"))
+
+    def op():
+        runner._save_snapshot()
+        runner.history.pop()
+    return op, 1
+
+
+@benchmark("runner.replay.20_concepts", group="runner")
+def bench_replay():
+    runner = _runner()
+    for i in range(20):
+        runner.register(Counter(f"C{i}"))
+    runner.start()
+    runner._save_snapshot()
+    snapshot = runner.history[-1]
+
+    def op():
+        runner.replay(0)
+        runner.history.append(snapshot)
+    # replay() prints; keep the benchmark output clean
+    return _quiet(op), 1
+
+
+def _quiet(op):
+    devnull = open(os.devnull, "w")
+
+    def wrapped():
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            op()
+        finally:
+            sys.stdout = stdout
+    return wrapped
+
+
+def _tempdir() -> str:
+    directory = tempfile.mkdtemp(prefix="csfw-bench-")
+    atexit.register(shutil.rmtree, directory, True)
+    return directory
+
+
+def _logger(directory: str, **kwargs) -> RDFLogger:
+    return RDFLogger(os.path.join(directory, "bench.ttl"), console_output=False, text_log=False, **kwargs)
+
+
+@benchmark("logger.save.1k_events", group="logging")
+def bench_logger_save():
+    directory = _tempdir()
+    logger = _logger(directory)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Counter", {"count": 0})
+    for i in range(1000):
+        aid = uuid.uuid4()
+        logger.log_action(aid, "increment", cid, tick=i)
+        logger.log_event(uuid.uuid4(), "incremented", cid, causal_link=aid, payload={"count": i}, tick=i)
+    return logger.save, 1
+
+
+@benchmark("logger.log_event", group="logging")
+def bench_log_event():
+    directory = _tempdir()
+    logger = _logger(directory)
+    cid = uuid.uuid4()
+    payload = {"x": 1, "y": 2}
+
+    def op():
+        logger.log_event(uuid.uuid4(), "moved", cid, payload=payload, tick=0)
+        if len(logger.graph) > 100_000:
+            logger.graph.remove((None, None, None))
+    return op, 1
+
+
+def _examples():
+    if not os.path.isdir(EXAMPLES_DIR):
+        raise BenchmarkSkipped("examples are only available in a source checkout")
+    root = os.path.dirname(EXAMPLES_DIR)
+    if root not in sys.path:
+        sys.path.append(root)
+    return EXAMPLES_DIR
+
+
+@benchmark("yaml_loader.load.pacman", group="runner")
+def bench_yaml_load():
+    examples = _examples()
+    from examples.pacman.src.concepts.pacman import Pacman
+    from examples.pacman.src.concepts.ghost import Ghost
+    from examples.pacman.src.concepts.board import Board
+    from examples.pacman.src.concepts.gameloop import GameLoop
+    from examples.pacman.src.concepts.inputsystem import InputSystem
+    runner = _runner()
+    for concept in (Pacman("Pacman", start_x=0, start_y=0), Ghost("Ghost", start_x=5, start_y=5, color="red"),
+                    Board("Board", width=10, height=10), GameLoop("GameLoop"), InputSystem("InputSystem")):
+        runner.register(concept)
+    rules = os.path.join(examples, "pacman", "src", "sync", "rules.yaml")
+    loader = YamlLoader(runner)
+
+    def op():
+        runner.clear_synchronizations()
+        loader.load(rules)
+    return op, 1
+
+
+def _game_logger():
+    # Logging stays on (in memory); the Turtle file is written by logger.save.1k_events instead
+    logger = _logger(_tempdir(), save_interval=1e9)
+    logger.last_save_time = float("inf")
+    return logger
+
+
+@benchmark("example.pacman.tick", group="examples")
+def bench_pacman():
+    examples = _examples()
+    from examples.pacman.src.concepts.pacman import Pacman
+    from examples.pacman.src.concepts.ghost import Ghost
+    from examples.pacman.src.concepts.board import Board
+    from examples.pacman.src.concepts.gameloop import GameLoop
+    from examples.pacman.src.concepts.inputsystem import InputSystem
+    runner = Runner(logger=_game_logger())
+    for concept in (Pacman("Pacman", start_x=0, start_y=0), Ghost("Ghost", start_x=5, start_y=5, color="red"),
+                    Board("Board", width=10, height=10), GameLoop("GameLoop"), InputSystem("InputSystem")):
+        runner.register(concept)
+    YamlLoader(runner).load(os.path.join(examples, "pacman", "src", "sync", "rules.yaml"))
+    runner.start()
+    game_loop = runner.get_concept_by_name("GameLoop")
+    input_system = runner.get_concept_by_name("InputSystem")
+    rng = random.Random(0)
+    keys = ["UP", "DOWN", "LEFT", "RIGHT"]
+
+    def op():
+        if rng.random() < 0.2:
+            _tick(runner, input_system.id, "receive_input", {"key": rng.choice(keys)})
+        _tick(runner, game_loop.id, "tick", {})
+    return op, 1
+
+
+@benchmark("example.roguelike.turn", group="examples")
+def bench_roguelike():
+    examples = _examples()
+    from examples.roguelike.src.concepts.player import Player
+    from examples.roguelike.src.concepts.monster import Monster
+    from examples.roguelike.src.concepts.dungeon import Dungeon
+    from examples.roguelike.src.concepts.item import Item
+    from examples.roguelike.src.concepts.gamestate import GameState
+    random.seed(0)
+    runner = Runner(logger=_game_logger())
+    dungeon = Dungeon("Dungeon", width=40, height=25)
+    dungeon.generate({"floor": 1})
+    start = dungeon.get_player_start()
+    player = Player("Player", start_x=start[0], start_y=start[1])
+    runner.register(dungeon)
+    runner.register(player)
+    for i, (mx, my) in enumerate(dungeon.get_monster_spawn_positions(3)):
+        runner.register(Monster(f"Monster_{i}", monster_id=f"m{i}", monster_type="goblin", x=mx, y=my))
+    runner.register(Item("ItemManager"))
+    game_state = GameState("GameState")
+    runner.register(game_state)
+    YamlLoader(runner).load(os.path.join(examples, "roguelike", "src", "sync", "rules.yaml"))
+    runner.start()
+    rng = random.Random(0)
+    moves = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+    def op():
+        dx, dy = rng.choice(moves)
+        _tick(runner, player.id, "move", {"dx": dx, "dy": dy})
+        _tick(runner, game_state.id, "next_turn", {})
+    return op, 1
+
+
+@benchmark("example.tetris.tick", group="examples")
+def bench_tetris():
+    _examples()
+    from examples.tetris.concepts import TetrisEngine, ScoreBoard, InputController
+    random.seed(0)
+    runner = Runner(logger=_game_logger())
+    engine, score, controls = TetrisEngine("TetrisEngine"), ScoreBoard("ScoreBoard"), InputController("Input")
+    for concept in (engine, score, controls):
+        runner.register(concept)
+    runner.register(Synchronization("InputMoveLeft", when=EventPattern(controls, "LeftPressed"),
+                                    then=[ActionInvocation(engine, "move_left", lambda e: {})]))
+    runner.register(Synchronization("InputMoveRight", when=EventPattern(controls, "RightPressed"),
+                                    then=[ActionInvocation(engine, "move_right", lambda e: {})]))
+    runner.register(Synchronization("UpdateScoreOnClear", when=EventPattern(engine, "LinesCleared"),
+                                    then=[ActionInvocation(score, "add_score", lambda e: {"count": e.payload["count"]})]))
+    runner.start()
+    rng = random.Random(0)
+
+    def op():
+        if rng.random() < 0.3:
+            _tick(runner, controls.id, "press_key", {"key": rng.choice(["left", "right"])})
+        _tick(runner, engine.id, "tick", {})
+        if engine._state.get("game_over"):
+            engine.restore_state(TetrisEngine("TetrisEngine")._state)
+    return op, 1
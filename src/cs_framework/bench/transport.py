@@ -0,0 +1,267 @@
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict
+from ..core.socket_transport import SocketHub, SocketTransport, Address
+from ..core.shm_transport import SharedMemoryTransport
+from ..core.event_bridge import EventBridge
+from ..core.message_codec import SchemaMessageCodec, get_message_codec
+from ..core.schema_codec import SchemaRegistry
+from ..core.transport import LocalTransport
+from .harness import benchmark
+
+PING, PONG = "bench.ping", "bench.pong"
+
+
+def _message(size: int, seq: int = 0) -> Dict[str, Any]:
+    # Shaped like an EventBridge message
+    return {"source_bridge": "8c1f6a0e-0000-4000-8000-000000000000", "original_event": "moved",
+            "payload": {"seq": seq, "data": "x" * size}}
+
+
+def _connect(address: Address, codec: str, side: str):
+    # A str "shm:<namespace>" address selects SharedMemoryTransport, polled
+    # by the benchmark thread itself so the fast path has no thread hand-off
+    if isinstance(address, str) and address.startswith("shm:"):
+        peer = "peer" if side == "client" else "client"
+        return SharedMemoryTransport(address[4:], side, peer, codec=codec, start_reader=False)
+    return SocketTransport(address, codec=codec)
+
+
+def _acquire(transport, semaphore, timeout: float = 5.0) -> bool:
+    if isinstance(transport, SharedMemoryTransport) and transport._reader is None:
+        deadline = time.monotonic() + timeout
+        while not semaphore.acquire(blocking=False):
+            if not transport.poll():
+                if time.monotonic() > deadline:
+                    return False
+                # Yield the CPU to the peer (matters on machines with few cores)
+                time.sleep(0)
+        return True
+    return semaphore.acquire(timeout=timeout)
+
+
+def _echo_peer(address: Address, codec: str, ready, stop):
+    """Answer every ping with a pong carrying the same payload."""
+    transport = _connect(address, codec, "peer")
+    transport.subscribe(PING, lambda message: transport.publish(PONG, message))
+    ready.set()
+    if isinstance(transport, SharedMemoryTransport):
+        while not stop.is_set():
+            for _ in range(10_000):
+                if not transport.poll():
+                    time.sleep(0)
+    else:
+        # The reader thread does the work
+        stop.wait()
+    transport.close()
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_transport_benchmark(kind: str = "tcp", messages: int = 10_000, payload_size: int = 64,
+                            codec: str = "auto", window: int = 256) -> Dict[str, Any]:
+    """
+    Measure a transport ("tcp", "unix" or "shm") between this process and an
+    echo peer process.
+
+    - latency: sequential ping/pong round trips (p50 / p99 in microseconds)
+    - throughput: pipelined pings with up to `window` in flight (messages/sec)
+    """
+    hub = None
+    if kind == "shm":
+        address = "shm:bench-" + uuid.uuid4().hex[:8]
+    else:
+        hub = SocketHub(os.path.join(tempfile.mkdtemp(prefix="csfw-bench-"), "hub.sock") if kind == "unix"
+                        else ("127.0.0.1", 0))
+        address = hub.address
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    peer = multiprocessing.Process(target=_echo_peer, args=(address, codec, ready, stop), daemon=True)
+    peer.start()
+    client = None
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("transport benchmark: echo peer did not start")
+        client = _connect(address, codec, "client")
+        received = threading.Semaphore(0)
+        credits = threading.Semaphore(window)
+
+        def on_pong(message):
+            received.release()
+            credits.release()
+        client.subscribe(PONG, on_pong)
+        message = _message(payload_size)
+
+        # Warm up (and make sure the peer's subscription reached the hub)
+        for _ in range(100):
+            client.publish(PING, message)
+            if not _acquire(client, received):
+                raise RuntimeError("transport benchmark: no reply from echo peer")
+
+        latencies = []
+        for _ in range(min(messages, 5_000)):
+            start = time.perf_counter_ns()
+            client.publish(PING, message)
+            _acquire(client, received)
+            latencies.append(time.perf_counter_ns() - start)
+
+        credits = threading.Semaphore(window)
+        start = time.perf_counter()
+        for _ in range(messages):
+            _acquire(client, credits)
+            client.publish(PING, message)
+        for _ in range(window):
+            _acquire(client, credits)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        peer.join(5)
+        if peer.is_alive():
+            peer.terminate()
+        if client is not None:
+            client.close()
+        if hub is not None:
+            hub.close()
+
+    return {
+        "transport": kind,
+        "codec": client.codec.name,
+        "payload_size": payload_size,
+        "messages": messages,
+        "messages_per_sec": messages / elapsed,
+        "p50_us": _percentile(latencies, 0.50) / 1000,
+        "p99_us": _percentile(latencies, 0.99) / 1000,
+        "mean_us": statistics.fmean(latencies) / 1000,
+    }
+
+
+@benchmark("transport.socket.roundtrip", group="transport")
+def bench_socket_roundtrip():
+    # In-process echo over loopback TCP; the standalone runner below uses a second process
+    hub = SocketHub()
+    echo = SocketTransport(hub.address, codec="json")
+    echo.subscribe(PING, lambda message: echo.publish(PONG, message))
+    client = SocketTransport(hub.address, codec="json")
+    received = threading.Semaphore(0)
+    client.subscribe(PONG, lambda message: received.release())
+    message = _message(64)
+    # Wait until both subscriptions are live at the hub
+    client.publish(PING, message)
+    received.acquire(timeout=5)
+
+    def op():
+        client.publish(PING, message)
+        received.acquire()
+
+    def teardown():
+        client.close()
+        echo.close()
+        hub.close()
+    return op, 1, teardown
+
+
+@benchmark("transport.shm.roundtrip", group="transport")
+def bench_shm_roundtrip():
+    # In-process echo through two shared-memory rings, each side polled by its reader thread
+    namespace = "bench-" + uuid.uuid4().hex[:8]
+    echo = SharedMemoryTransport(namespace, "peer", "client", codec="json")
+    echo.subscribe(PING, lambda message: echo.publish(PONG, message))
+    client = SharedMemoryTransport(namespace, "client", "peer", codec="json")
+    received = threading.Semaphore(0)
+    client.subscribe(PONG, lambda message: received.release())
+    message = _message(64)
+
+    def op():
+        client.publish(PING, message)
+        received.acquire()
+
+    def teardown():
+        client.close()
+        echo.close()
+    return op, 1, teardown
+
+
+def _bridge_tick(**options):
+    # 4 ghosts moving 10 times per tick, each move sent through an EventBridge;
+    # the subscriber pays the wire encoding cost per published message
+    codec = get_message_codec("json")
+    transport = LocalTransport()
+    transport.subscribe("global", codec.encode)
+    bridge = EventBridge("Bridge", transport, **options)
+    moves = [{"event_name": "moved", "source": ghost, "payload": {"ghost": ghost, "x": step, "y": step}}
+             for step in range(10) for ghost in ("blinky", "pinky", "inky", "clyde")]
+
+    def op():
+        for move in moves:
+            bridge.send_remote(move)
+        bridge.on_tick_end()
+    return op, 1
+
+
+def _codec_round_trip(codec):
+    # A coalesced tick of 4 ghost moves, shaped like EventBridge batches
+    source = "8c1f6a0e-0000-4000-8000-000000000000"
+    message = {"source_bridge": source,
+               "batch": [["moved", {"ghost": ghost, "x": 12, "y": 7, "frightened": False}]
+                         for ghost in ("blinky", "pinky", "inky", "clyde")]}
+
+    def op():
+        codec.decode(codec.encode(message))
+    return op, 1
+
+
+@benchmark("codec.batch.json", group="transport")
+def bench_codec_json():
+    return _codec_round_trip(get_message_codec("json"))
+
+
+@benchmark("codec.batch.schema", group="transport")
+def bench_codec_schema():
+    from pydantic import BaseModel, Field
+
+    class Moved(BaseModel):
+        ghost: str
+        x: int = Field(ge=0, le=255)
+        y: int = Field(ge=0, le=255)
+        frightened: bool
+
+    registry = SchemaRegistry()
+    registry.register("moved", Moved)
+    return _codec_round_trip(SchemaMessageCodec(registry))
+
+
+@benchmark("bridge.tick.unbatched", group="transport")
+def bench_bridge_unbatched():
+    return _bridge_tick()
+
+
+@benchmark("bridge.tick.coalesced", group="transport")
+def bench_bridge_coalesced():
+    return _bridge_tick(batch=True, coalesce=["moved"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-process transports (messages/sec and round-trip p99).")
+    parser.add_argument("--kind", choices=("tcp", "unix", "shm"), default="tcp",
+                        help="Loopback TCP, Unix domain socket or shared-memory rings (default: tcp)")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--payload-size", type=int, default=64, help="Bytes of filler in each message payload")
+    parser.add_argument("--codec", default="auto", help="auto, json, msgpack or schema")
+    args = parser.parse_args()
+
+    result = run_transport_benchmark(args.kind, args.messages, args.payload_size, args.codec)
+    print(f"{result['transport']} / {result['codec']}, {result['payload_size']} byte payload")
+    print(f"  throughput  {result['messages_per_sec']:>12,.0f} msg/s")
+    print(f"  round trip  p50 {result['p50_us']:.1f} us  p99 {result['p99_us']:.1f} us  mean {result['mean_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
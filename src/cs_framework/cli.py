@@ -8,6 +8,8 @@ from .tools.architect import generate_concept
 from .tools.speckit_integration import run_integration
 from .tools.linter import run_linter
 from .tools.scenario_runner import run_scenario_tool
+from .tools.profiler import run_profile_tool
+from .bench import cli as bench_cli
 
 # For GUI, it's in src/cs_gui/main.py. This is outside cs_framework package usually?
 # In setup.py: packages=find_packages(where="src"), package_dir={"": "src"}
@@ -226,6 +228,21 @@ def main():
     parser_scenario.add_argument("scenario_file", help="Path to YAML/JSON scenario file")
     parser_scenario.set_defaults(func=lambda args: run_scenario_tool(args.setup_file, args.scenario_file))
 
+    # profile command
+    parser_profile = subparsers.add_parser("profile", help="Profile a scenario (cProfile + per-action timing)")
+    parser_profile.add_argument("setup_file", help="Path to Python file that exports 'runner'")
+    parser_profile.add_argument("scenario_file", help="Path to YAML/JSON scenario file")
+    parser_profile.add_argument("--output", "-o", default="profile",
+                                help="Output prefix for .pstats and .speedscope.json (default: profile)")
+    parser_profile.add_argument("--top", type=int, default=15, help="Rows per table (default: 15)")
+    parser_profile.set_defaults(func=lambda args: run_profile_tool(args.setup_file, args.scenario_file,
+                                                                   args.output, args.top))
+
+    # bench command
+    parser_bench = subparsers.add_parser("bench", help="Run benchmarks (JSON output, baseline comparison)")
+    bench_cli.add_arguments(parser_bench)
+    parser_bench.set_defaults(func=bench_cli.run_from_args)
+
     # gui command
     if run_gui:
         parser_gui = subparsers.add_parser("gui", help="Run the Debugger GUI")
@@ -0,0 +1,226 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+from loguru import logger
+from .async_transport import AsyncTransport, Subscription
+from .event_bridge import BLOCK
+from .message_codec import MessageCodec, get_message_codec
+from .socket_transport import (
+    Address, LENGTH_SIZE, PUBLISH, SUBSCRIBE, UNSUBSCRIBE, frame_length, pack_frame, parse_frame
+)
+
+
+async def read_frame_async(reader: asyncio.StreamReader) -> Optional[Tuple[bytes, str, bytes]]:
+    """Read one frame from a StreamReader; None on EOF."""
+    try:
+        head = await reader.readexactly(LENGTH_SIZE)
+        body = await reader.readexactly(frame_length(head))
+    except asyncio.IncompleteReadError:
+        return None
+    return parse_frame(body)
+
+
+async def _open(address: Address):
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    # asyncio enables TCP_NODELAY on TCP connections
+    return await asyncio.open_connection(address[0], address[1])
+
+
+class AsyncSocketTransport(AsyncTransport):
+    """
+    AsyncTransport over one connection to a SocketHub or AsyncSocketHub,
+    speaking the SocketTransport frame format (so sync and async clients
+    share a hub). Every channel is multiplexed on the one connection and
+    read by a single task; create it inside the event loop with
+
+        transport = await AsyncSocketTransport.connect(hub.address)
+
+    Local subscriptions get published messages directly. Subscriptions end
+    when the connection is lost.
+
+    Remote messages never wait for room: all channels share one connection,
+    so a full subscription (even under "block") drops the incoming message
+    instead of stalling every other channel. Size `maxsize` accordingly.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, address: Address,
+                 codec: Any = "json"):
+        self.address = address
+        self.codec: MessageCodec = get_message_codec(codec)
+        self.subscriptions: Dict[str, List[Subscription]] = {}
+        self.messages_sent = 0
+        self.messages_received = 0
+        self._reader = reader
+        self._writer = writer
+        self._closed = False
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, address: Address, codec: Any = "json", connect_timeout: float = 5.0):
+        reader, writer = await asyncio.wait_for(_open(address), connect_timeout)
+        return cls(reader, writer, address, codec)
+
+    async def publish(self, channel: str, message: dict):
+        for subscription in self.subscriptions.get(channel, ()):
+            await subscription.put(message)
+        if self._closed or self._writer.is_closing():
+            raise ConnectionError(f"AsyncSocketTransport: connection to {self.address} is closed")
+        self._writer.write(pack_frame(PUBLISH, channel, self.codec.encode(message)))
+        # Waits only while the socket buffer is above its high-water mark
+        await self._writer.drain()
+        self.messages_sent += 1
+
+    def subscribe(self, channel: str, maxsize: int = 10_000, overflow: str = BLOCK) -> Subscription:
+        subscription = Subscription(channel, maxsize, overflow, self._remove)
+        existing = self.subscriptions.get(channel)
+        if existing is None and not self._closed:
+            self._writer.write(pack_frame(SUBSCRIBE, channel))
+        self.subscriptions[channel] = (existing or []) + [subscription]
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        channel = subscription.channel
+        remaining = [s for s in self.subscriptions.get(channel, []) if s is not subscription]
+        if remaining:
+            self.subscriptions[channel] = remaining
+            return
+        self.subscriptions.pop(channel, None)
+        if not self._closed and not self._writer.is_closing():
+            self._writer.write(pack_frame(UNSUBSCRIBE, channel))
+
+    async def _read_loop(self):
+        try:
+            while True:
+                try:
+                    frame = await read_frame_async(self._reader)
+                except (OSError, ValueError) as e:
+                    # The socket failed or the stream lost its framing
+                    if not self._closed:
+                        logger.warning(f"AsyncSocketTransport: connection lost: {e}")
+                    break
+                if frame is None:
+                    break
+                kind, channel, payload = frame
+                if kind != PUBLISH:
+                    continue
+                try:
+                    message = self.codec.decode(payload)
+                except Exception as e:
+                    # The frame was read whole, so the next one is intact
+                    logger.error(f"AsyncSocketTransport: dropping undecodable message on '{channel}': {e}")
+                    continue
+                self.messages_received += 1
+                for subscription in self.subscriptions.get(channel, ()):
+                    subscription.put_nowait(message)
+        finally:
+            self._close_subscriptions()
+
+    def _close_subscriptions(self):
+        self._closed = True
+        for subscriptions in list(self.subscriptions.values()):
+            for subscription in subscriptions:
+                subscription.close()
+
+    async def close(self):
+        self._close_subscriptions()
+        self._read_task.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncSocketHub:
+    """
+    SocketHub on an asyncio event loop: the same relay (and wire format),
+    but every client connection is a task instead of a thread. Start it
+    inside the loop with
+
+        hub = await AsyncSocketHub.start(("127.0.0.1", 0))
+
+    and read the bound address from `hub.address`.
+    """
+    def __init__(self):
+        self.address: Optional[Address] = None
+        self.frames_relayed = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._channels: Dict[str, List[asyncio.StreamWriter]] = {}
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    @classmethod
+    async def start(cls, address: Address = ("127.0.0.1", 0)) -> "AsyncSocketHub":
+        hub = cls()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            hub._server = await asyncio.start_unix_server(hub._serve, path=address)
+            hub.address = address
+        else:
+            hub._server = await asyncio.start_server(hub._serve, address[0], address[1])
+            hub.address = hub._server.sockets[0].getsockname()[:2]
+        return hub
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        channels: Set[str] = set()
+        try:
+            while True:
+                frame = await read_frame_async(reader)
+                if frame is None:
+                    break
+                kind, channel, payload = frame
+                if kind == PUBLISH:
+                    await self._relay(writer, channel, pack_frame(PUBLISH, channel, payload))
+                elif kind == SUBSCRIBE and channel not in channels:
+                    channels.add(channel)
+                    # Copy-on-write so _relay can iterate while others subscribe
+                    self._channels[channel] = self._channels.get(channel, []) + [writer]
+                elif kind == UNSUBSCRIBE and channel in channels:
+                    channels.discard(channel)
+                    self._unsubscribe(writer, channel)
+        except (OSError, ValueError) as e:
+            logger.warning(f"AsyncSocketHub: dropping connection: {e}")
+        finally:
+            for channel in channels:
+                self._unsubscribe(writer, channel)
+            self._writers.discard(writer)
+            writer.close()
+
+    def _unsubscribe(self, writer: asyncio.StreamWriter, channel: str):
+        remaining = [w for w in self._channels.get(channel, []) if w is not writer]
+        if remaining:
+            self._channels[channel] = remaining
+        else:
+            self._channels.pop(channel, None)
+
+    async def _relay(self, sender: asyncio.StreamWriter, channel: str, frame: bytes):
+        for writer in self._channels.get(channel, ()):
+            if writer is not sender and not writer.is_closing():
+                writer.write(frame)
+                self.frames_relayed += 1
+                try:
+                    # A slow subscriber holds back this sender only (as SocketHub's sendall does)
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+    async def close(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,279 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Set
+from loguru import logger
+from .transport import Transport
+from .event_bridge import BLOCK, DROP_OLDEST, OVERFLOW_POLICIES
+
+_CLOSED = object()
+
+
+class Subscription:
+    """
+    Async iterator over the messages published on one channel:
+
+        async for message in transport.subscribe("global"):
+            ...
+
+    Buffers up to `maxsize` messages. When full, "block" makes async
+    publishers wait for the consumer, "drop_oldest" / "drop_newest" drop a
+    message (as BridgeInbox does). close() ends the iteration once the
+    buffered messages are consumed. Use from the event loop's thread only.
+    """
+    def __init__(self, channel: str, maxsize: int = 10_000, overflow: str = BLOCK,
+                 on_close: Optional[Callable[["Subscription"], None]] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Use one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.channel = channel
+        self.overflow = overflow
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._on_close = on_close
+        # Counters
+        self.received = 0
+        self.dropped = 0
+
+    def put_nowait(self, message: dict) -> bool:
+        """Buffer a message without waiting; False if it was dropped."""
+        if self.closed:
+            return False
+        self.received += 1
+        queue = self._queue
+        if queue.full():
+            self.dropped += 1
+            if self.overflow != DROP_OLDEST:
+                return False
+            queue.get_nowait()
+        queue.put_nowait(message)
+        return True
+
+    async def put(self, message: dict) -> bool:
+        """Buffer a message, waiting for room under the "block" policy."""
+        if self.closed or self.overflow != BLOCK or not self._queue.full():
+            return self.put_nowait(message)
+        self.received += 1
+        await self._queue.put(message)
+        return True
+
+    async def get(self) -> dict:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        message = await self._queue.get()
+        if message is _CLOSED:
+            raise StopAsyncIteration
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        return await self.get()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._queue.empty():
+            # Wake a consumer waiting in get()
+            self._queue.put_nowait(_CLOSED)
+        if self._on_close is not None:
+            self._on_close(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+class AsyncTransport(ABC):
+    """
+    asyncio counterpart of Transport: publish is a coroutine and each
+    subscribe() returns a Subscription to iterate, so one event loop can
+    serve many channels and connections without a thread per connection.
+    """
+    @abstractmethod
+    async def publish(self, channel: str, message: dict):
+        pass
+
+    @abstractmethod
+    def subscribe(self, channel: str, maxsize: int = 10_000, overflow: str = BLOCK) -> Subscription:
+        pass
+
+    async def close(self):
+        pass
+
+
+class AsyncLocalTransport(AsyncTransport):
+    """In-process AsyncTransport (one event loop)."""
+    def __init__(self):
+        self.subscriptions: Dict[str, List[Subscription]] = {}
+
+    async def publish(self, channel: str, message: dict):
+        for subscription in self.subscriptions.get(channel, ()):
+            await subscription.put(message)
+
+    def subscribe(self, channel: str, maxsize: int = 10_000, overflow: str = BLOCK) -> Subscription:
+        subscription = Subscription(channel, maxsize, overflow, self._remove)
+        # Copy-on-write: publish may be iterating the current list
+        self.subscriptions[channel] = self.subscriptions.get(channel, []) + [subscription]
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        remaining = [s for s in self.subscriptions.get(subscription.channel, []) if s is not subscription]
+        if remaining:
+            self.subscriptions[subscription.channel] = remaining
+        else:
+            self.subscriptions.pop(subscription.channel, None)
+
+    async def close(self):
+        for subscriptions in list(self.subscriptions.values()):
+            for subscription in subscriptions:
+                subscription.close()
+
+
+class AsyncTransportAdapter(AsyncTransport):
+    """
+    AsyncTransport over a sync Transport (LocalTransport, SocketTransport,
+    SharedMemoryTransport, ...). Call subscribe() from the event loop;
+    messages the sync transport delivers on other threads are handed to the
+    loop thread-safely. Under the "block" policy those threads wait while a
+    subscription is full; on the loop's own thread the message is dropped
+    instead, as it would have to wait for itself.
+    """
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._callbacks: Dict[str, Callable[[dict], None]] = {}
+
+    async def publish(self, channel: str, message: dict):
+        self.transport.publish(channel, message)
+
+    def subscribe(self, channel: str, maxsize: int = 10_000, overflow: str = BLOCK) -> Subscription:
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+        subscription = Subscription(channel, maxsize, overflow, self._remove)
+        existing = self._subscriptions.get(channel)
+        self._subscriptions[channel] = (existing or []) + [subscription]
+        if existing is None:
+            callback = self._callbacks[channel] = lambda message: self._on_message(channel, message)
+            self.transport.subscribe(channel, callback)
+        return subscription
+
+    def _on_message(self, channel: str, message: dict):
+        subscriptions = self._subscriptions.get(channel, ())
+        if threading.get_ident() == self._loop_thread:
+            for subscription in subscriptions:
+                subscription.put_nowait(message)
+        elif any(s.overflow == BLOCK for s in subscriptions):
+            asyncio.run_coroutine_threadsafe(self._deliver(subscriptions, message), self.loop).result()
+        else:
+            self.loop.call_soon_threadsafe(self._deliver_nowait, subscriptions, message)
+
+    @staticmethod
+    async def _deliver(subscriptions: List[Subscription], message: dict):
+        for subscription in subscriptions:
+            await subscription.put(message)
+
+    @staticmethod
+    def _deliver_nowait(subscriptions: List[Subscription], message: dict):
+        for subscription in subscriptions:
+            subscription.put_nowait(message)
+
+    def _remove(self, subscription: Subscription):
+        channel = subscription.channel
+        remaining = [s for s in self._subscriptions.get(channel, []) if s is not subscription]
+        if remaining:
+            self._subscriptions[channel] = remaining
+            return
+        self._subscriptions[channel] = []
+        unsubscribe = getattr(self.transport, "unsubscribe", None)
+        if unsubscribe is not None:
+            unsubscribe(channel, self._callbacks.pop(channel))
+            del self._subscriptions[channel]
+
+    async def close(self):
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in subscriptions:
+                subscription.close()
+
+
+class SyncTransportAdapter(Transport):
+    """
+    Transport over an AsyncTransport running on `loop`, e.g. to connect an
+    EventBridge (sync callbacks) to AsyncSocketTransport. Callbacks run on
+    the loop's thread, so they must not block (use BridgeInbox drop policies).
+
+    From other threads publish() waits until the message is handed over;
+    on the loop's thread it is scheduled as a task.
+    """
+    def __init__(self, transport: AsyncTransport, loop: asyncio.AbstractEventLoop,
+                 maxsize: int = 10_000, overflow: str = BLOCK):
+        self.transport = transport
+        self.loop = loop
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._tasks: Set[asyncio.Task] = set()
+        self._subscriptions: List[Subscription] = []
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = self.loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def publish(self, channel: str, message: dict):
+        if self._on_loop():
+            self._spawn(self.transport.publish(channel, message))
+        else:
+            asyncio.run_coroutine_threadsafe(self.transport.publish(channel, message), self.loop).result()
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]):
+        if self._on_loop():
+            self._start(channel, callback)
+            return
+
+        async def start():
+            self._start(channel, callback)
+        # Wait so that messages published after subscribe() returns are received
+        asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+
+    def _start(self, channel: str, callback: Callable[[dict], None]):
+        subscription = self.transport.subscribe(channel, self.maxsize, self.overflow)
+        self._subscriptions.append(subscription)
+        self._spawn(self._pump(subscription, callback))
+
+    @staticmethod
+    async def _pump(subscription: Subscription, callback: Callable[[dict], None]):
+        async for message in subscription:
+            try:
+                callback(message)
+            except Exception as e:
+                logger.error(f"SyncTransportAdapter: subscriber on '{subscription.channel}' failed: {e}")
+
+    def close(self):
+        """Close the subscriptions; their pump tasks end once the buffered messages are delivered."""
+        async def close_all():
+            for subscription in self._subscriptions:
+                subscription.close()
+            self._subscriptions = []
+            if not self._on_loop():
+                await asyncio.gather(*self._tasks)
+
+        if self._on_loop():
+            self._spawn(close_all())
+        else:
+            asyncio.run_coroutine_threadsafe(close_all(), self.loop).result()
@@ -90,6 +90,21 @@ class Concept:
         """
         self._state = copy.deepcopy(state)
 
+    def on_tick_start(self) -> None:
+        """
+        Called by the Runner at the start of each top-level process_events(),
+        before pending events are collected. Override to turn input gathered
+        on other threads into events (see EventBridge).
+        """
+        pass
+
+    def on_tick_end(self) -> None:
+        """
+        Called by the Runner once the top-level process_events() has handled
+        every cascade of the tick (e.g. to flush buffered output).
+        """
+        pass
+
     def collect_events(self) -> List[Event]:
         """
         Return and clear pending events.
@@ -1,40 +1,362 @@
-from typing import Any, Dict
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from loguru import logger
 from .concept import Concept
 from .transport import Transport
 
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class BridgeInbox:
+    """
+    Bounded, thread-safe queue of remote messages. Transport threads put,
+    the Runner thread drains.
+
+    When full: "block" waits for the next drain (up to `block_timeout`
+    seconds, then drops the message), "drop_oldest" evicts the oldest
+    message, "drop_newest" discards the incoming one. The draining thread
+    itself never blocks (it would wait for itself, e.g. with LocalTransport);
+    it drops the incoming message instead. Until the first drain() the
+    thread that created the inbox counts as the draining thread.
+    """
+    def __init__(self, maxsize: int = 10_000, overflow: str = BLOCK, block_timeout: Optional[float] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Use one of: {', '.join(OVERFLOW_POLICIES)}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._messages = deque()
+        self._not_full = threading.Condition(threading.Lock())
+        # Usually the Runner thread builds the bridge; a synchronous producer
+        # on it must not wait for a drain that has not happened yet
+        self._drain_thread = threading.current_thread()
+        # Counters
+        self.received = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.high_water = 0
+
+    def put(self, message: Dict[str, Any]) -> bool:
+        """Queue a message; False if it was dropped."""
+        with self._not_full:
+            self.received += 1
+            if len(self._messages) >= self.maxsize:
+                if self.overflow == DROP_OLDEST:
+                    self._messages.popleft()
+                    self.dropped += 1
+                elif self.overflow == DROP_NEWEST or threading.current_thread() is self._drain_thread:
+                    self.dropped += 1
+                    return False
+                else:
+                    self.blocked += 1
+                    if not self._not_full.wait_for(lambda: len(self._messages) < self.maxsize, self.block_timeout):
+                        self.dropped += 1
+                        return False
+            self._messages.append(message)
+            if len(self._messages) > self.high_water:
+                self.high_water = len(self._messages)
+            return True
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take every queued message (oldest first)."""
+        with self._not_full:
+            self._drain_thread = threading.current_thread()
+            messages = list(self._messages)
+            self._messages.clear()
+            self._not_full.notify_all()
+        return messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._messages), "received": self.received, "dropped": self.dropped,
+                "blocked": self.blocked, "high_water": self.high_water}
+
+
+class _Sender:
+    __slots__ = ("highest", "mask", "next", "held", "held_since")
+
+    def __init__(self):
+        self.highest = -1       # highest sequence number seen
+        self.mask = 0           # bit i set: highest - i was seen
+        self.next = None        # next sequence number to deliver (ordered mode)
+        self.held = {}          # seq -> message waiting for its predecessors
+        self.held_since = 0.0
+
+
+class SequenceTracker:
+    """
+    Per-sender duplicate filter over the last `window` sequence numbers
+    (a sliding bitmask, O(1) per message) and, with ordered=True, a
+    reordering buffer that releases messages in sequence order.
+
+    A missing sequence number is given up on once `reorder_limit` later
+    messages are held or the oldest has waited `reorder_timeout` seconds
+    (see expire()); if it arrives afterwards it is dropped as late.
+    Not thread-safe: EventBridge serializes calls.
+    """
+    def __init__(self, window: int = 1024, ordered: bool = False, reorder_limit: int = 256,
+                 reorder_timeout: float = 0.05):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self._full = (1 << window) - 1
+        self.ordered = ordered
+        self.reorder_limit = reorder_limit
+        self.reorder_timeout = reorder_timeout
+        self._senders: Dict[Any, _Sender] = {}
+        # Counters
+        self.accepted = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.skipped = 0
+        self.late = 0
+
+    def _is_duplicate(self, sender: _Sender, seq: int) -> bool:
+        offset = sender.highest - seq
+        if offset < 0:
+            sender.mask = ((sender.mask << -offset) | 1) & self._full if -offset < self.window else 1
+            sender.highest = seq
+            return False
+        if offset >= self.window:
+            # Older than the window: cannot tell, assume it was seen
+            return True
+        bit = 1 << offset
+        if sender.mask & bit:
+            return True
+        sender.mask |= bit
+        return False
+
+    def offer(self, source: Any, seq: int, message: Any) -> List[Any]:
+        """Messages that can be delivered now (empty for duplicates and held ones)."""
+        sender = self._senders.get(source)
+        if sender is None:
+            sender = self._senders[source] = _Sender()
+        if self._is_duplicate(sender, seq):
+            self.duplicates += 1
+            return []
+        self.accepted += 1
+        if not self.ordered:
+            return [message]
+        if sender.next is None:
+            # Bridges number from 0: a small first number means earlier ones are still on the way,
+            # a large one that we joined mid-stream
+            sender.next = 0 if seq <= self.reorder_limit else seq
+        if seq == sender.next:
+            return self._release(sender, [message])
+        if seq < sender.next:
+            self.late += 1
+            return []
+        if not sender.held:
+            sender.held_since = time.monotonic()
+        sender.held[seq] = message
+        if len(sender.held) > self.reorder_limit:
+            return self._skip(sender)
+        return []
+
+    def _release(self, sender: _Sender, ready: List[Any]) -> List[Any]:
+        sender.next += 1
+        held = sender.held
+        while sender.next in held:
+            ready.append(held.pop(sender.next))
+            sender.next += 1
+            self.reordered += 1
+        if held:
+            sender.held_since = time.monotonic()
+        return ready
+
+    def _skip(self, sender: _Sender) -> List[Any]:
+        # Give up on the missing sequence numbers before the oldest held message
+        first = min(sender.held)
+        self.skipped += first - sender.next
+        sender.next = first
+        self.reordered += 1
+        return self._release(sender, [sender.held.pop(first)])
+
+    def expire(self) -> List[Any]:
+        """Release messages held longer than reorder_timeout."""
+        ready = []
+        now = time.monotonic()
+        for sender in self._senders.values():
+            while sender.held and now - sender.held_since >= self.reorder_timeout:
+                ready.extend(self._skip(sender))
+        return ready
+
+    def stats(self) -> Dict[str, int]:
+        return {"accepted": self.accepted, "duplicates": self.duplicates, "reordered": self.reordered,
+                "skipped": self.skipped, "late": self.late,
+                "held": sum(len(s.held) for s in self._senders.values())}
+
+
+def _coalesce_key(payload: dict):
+    # Default: one slot per event name and originating concept; without a
+    # "source" the sends of different concepts cannot be told apart
+    source = payload.get("source")
+    if source is None:
+        return None
+    return payload.get("event_name"), source
+
+
 class EventBridge(Concept):
     """
     Concept that bridges local events to/from a Transport layer.
+
+    Remote messages arrive on the transport's thread and are queued in
+    `inbox`; the Runner turns them into "remote_received" events at the
+    start of each tick (see on_tick_start).
+
+    With batch=True, send_remote buffers events and publishes them as one
+    message at the end of the tick (on_tick_end), or earlier once
+    `max_batch` events are buffered or the oldest one is `max_delay`
+    seconds old. Event names listed in `coalesce` keep only their latest
+    payload per tick and per `coalesce_key(payload)` (default: event name
+    and the "source" field of the send_remote payload), e.g. only the last
+    "moved" of each Ghost. A key of None sends the event uncoalesced; the
+    default key does that (with a warning) when "source" is missing.
+
+    Every published message carries a per-bridge sequence number. Received
+    messages pass a duplicate filter over the last `dedup_window` numbers
+    of each sender, so at-least-once transports (retries, several paths)
+    are safe; with ordered=True they are also delivered in sequence order
+    (see SequenceTracker). dedup_window=0 turns both off.
     """
-    def __init__(self, name: str, transport: Transport, channel: str = "global"):
+    def __init__(self, name: str, transport: Transport, channel: str = "global",
+                 inbox_size: int = 10_000, overflow: str = BLOCK, block_timeout: Optional[float] = None,
+                 batch: bool = False, max_batch: int = 256, max_delay: Optional[float] = None,
+                 coalesce: Iterable[str] = (), coalesce_key: Callable[[dict], Any] = _coalesce_key,
+                 dedup_window: int = 1024, ordered: bool = False, reorder_limit: int = 256,
+                 reorder_timeout: float = 0.05):
         super().__init__(name)
         self.transport = transport
         self.channel = channel
-        
+        self.inbox = BridgeInbox(inbox_size, overflow, block_timeout)
+        self._source = str(self.id)
+        self._seq = 0
+        self.sequencer = SequenceTracker(dedup_window, ordered, reorder_limit, reorder_timeout) if dedup_window else None
+        # Serializes the sequencer and the inbox puts that follow it across transport threads
+        self._receive_lock = threading.Lock()
+
+        self.batch = batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.coalesce = frozenset(coalesce)
+        self.coalesce_key = coalesce_key
+        self._unkeyed_warned = set()
+        # Buffered [event_name, payload] entries; superseded ones become None
+        self._outbox: List[Optional[list]] = []
+        self._outbox_slots: Dict[Any, int] = {}
+        self._outbox_count = 0
+        self._outbox_since = 0.0
+        # Counters
+        self.events_sent = 0
+        self.events_coalesced = 0
+        self.messages_published = 0
+
         # Subscribe to transport
         self.transport.subscribe(self.channel, self._on_remote_message)
 
     def _on_remote_message(self, message: dict):
-        # This is called from transport thread/callback.
-        # We need to emit an event.
-        # Since emit just appends to a list, it's thread-safe enough for this simple example.
-        # But strictly, we might need a lock if Runner is multi-threaded.
-        # For now, assume single threaded or simple callback.
-        
-        # Avoid loops: check if source was us (if transport echoes)
-        if message.get("source_bridge") == self.id:
+        # Called from the transport thread/callback: only touch the inbox here.
+        # Avoid loops: skip our own messages (transports that echo)
+        source = message.get("source_bridge")
+        if source == self._source:
             return
+        seq = message.get("seq")
+        if self.sequencer is None or seq is None:
+            self._enqueue(message)
+            return
+        with self._receive_lock:
+            for ready in self.sequencer.offer(source, seq, message):
+                self._enqueue(ready)
+
+    def _enqueue(self, message: dict):
+        source = message.get("source_bridge")
+        batch = message.get("batch")
+        if batch is None:
+            self.inbox.put({"source_bridge": source, "original_event": message.get("original_event"),
+                            "payload": message.get("payload")})
+            return
+        for event_name, payload in batch:
+            self.inbox.put({"source_bridge": source, "original_event": event_name, "payload": payload})
 
-        self.emit("remote_received", message)
+    def on_tick_start(self):
+        sequencer = self.sequencer
+        # Never wait here: a transport thread holding the lock may itself be waiting for this drain
+        if sequencer is not None and sequencer.ordered and self._receive_lock.acquire(blocking=False):
+            try:
+                for message in sequencer.expire():
+                    self._enqueue(message)
+            finally:
+                self._receive_lock.release()
+        for message in self.inbox.drain():
+            self.emit("remote_received", message)
+
+    def on_tick_end(self):
+        self.flush()
 
     def send_remote(self, payload: dict):
         """
         Action: send_remote
-        Payload: { "event_name": "moved", "payload": {...} }
+        Payload: { "event_name": "moved", "payload": {...}, "source": coalescing key, e.g. the sender's name }
         """
-        message = {
-            "source_bridge": str(self.id),
-            "original_event": payload.get("event_name"),
-            "payload": payload.get("payload")
-        }
-        self.transport.publish(self.channel, message)
+        event_name = payload.get("event_name")
+        self.events_sent += 1
+        if not self.batch:
+            message = {
+                "source_bridge": self._source,
+                "original_event": event_name,
+                "payload": payload.get("payload"),
+                "seq": self._next_seq()
+            }
+            self.transport.publish(self.channel, message)
+            self.messages_published += 1
+            return
+
+        entry = [event_name, payload.get("payload")]
+        if not self._outbox_count:
+            self._outbox_since = time.monotonic()
+        if event_name in self.coalesce:
+            key = self.coalesce_key(payload)
+            if key is None:
+                if event_name not in self._unkeyed_warned:
+                    self._unkeyed_warned.add(event_name)
+                    logger.warning(f"EventBridge {self.name}: '{event_name}' sent without a coalescing key "
+                                   f"(no \"source\"?); sending it uncoalesced")
+            else:
+                slot = self._outbox_slots.get(key)
+                if slot is not None:
+                    # Keep the latest payload, at the position of the latest send
+                    self._outbox[slot] = None
+                    self._outbox_count -= 1
+                    self.events_coalesced += 1
+                self._outbox_slots[key] = len(self._outbox)
+        self._outbox.append(entry)
+        self._outbox_count += 1
+
+        if self._outbox_count >= self.max_batch or (
+                self.max_delay is not None and time.monotonic() - self._outbox_since >= self.max_delay):
+            self.flush()
+
+    def flush(self):
+        """Publish buffered events as one batch message."""
+        if not self._outbox_count:
+            return
+        batch = [entry for entry in self._outbox if entry is not None]
+        self._outbox = []
+        self._outbox_slots = {}
+        self._outbox_count = 0
+        self.transport.publish(self.channel, {"source_bridge": self._source, "batch": batch, "seq": self._next_seq()})
+        self.messages_published += 1
+
+    def _next_seq(self) -> int:
+        seq = self._seq
+        self._seq += 1
+        return seq
@@ -0,0 +1,227 @@
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+from ..logging.codec import to_jsonable
+from .schema_codec import EVENT_SCHEMAS, SchemaRegistry, write_varint, read_varint
+
+# Optional faster/compact encoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# EventBridge messages (single events and batches) are sent as tagged arrays
+# instead of dicts with long key names, with the bridge UUID as 16 raw bytes
+# where the format allows it. The optional sequence number goes last.
+_BRIDGE_KEYS = frozenset(("source_bridge", "original_event", "payload"))
+_BATCH_KEYS = frozenset(("source_bridge", "batch"))
+_SEQ_BRIDGE_KEYS = _BRIDGE_KEYS | {"seq"}
+_SEQ_BATCH_KEYS = _BATCH_KEYS | {"seq"}
+_BRIDGE_TAG = 0xB1
+_BATCH_TAG = 0xB2
+
+
+def _to_array(message: Dict[str, Any], source: Any) -> Any:
+    keys = message.keys()
+    if keys == _BRIDGE_KEYS or keys == _SEQ_BRIDGE_KEYS:
+        array = [_BRIDGE_TAG, source, message["original_event"], message["payload"]]
+    elif keys == _BATCH_KEYS or keys == _SEQ_BATCH_KEYS:
+        array = [_BATCH_TAG, source, message["batch"]]
+    else:
+        return message
+    if "seq" in message:
+        array.append(message["seq"])
+    return array
+
+
+def _from_array(value: Any, source_decoder=None) -> Dict[str, Any]:
+    if isinstance(value, list) and value and value[0] in (_BRIDGE_TAG, _BATCH_TAG):
+        source = source_decoder(value[1]) if source_decoder else value[1]
+        if value[0] == _BRIDGE_TAG and len(value) in (4, 5):
+            message = {"source_bridge": source, "original_event": value[2], "payload": value[3]}
+        elif value[0] == _BATCH_TAG and len(value) in (3, 4):
+            message = {"source_bridge": source, "batch": value[2]}
+        else:
+            return value
+        if len(value) == len(message) + 2:
+            message["seq"] = value[-1]
+        return message
+    return value
+
+
+class MessageCodec(ABC):
+    """
+    Serializes Transport messages (dicts) to bytes for the wire.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        pass
+
+
+class JsonMessageCodec(MessageCodec):
+    """Compact JSON; uses orjson when installed."""
+    name = "json"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        message = _to_array(message, message.get("source_bridge"))
+        if orjson is not None:
+            try:
+                return orjson.dumps(message, default=to_jsonable, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                return orjson.dumps(to_jsonable(message))
+        try:
+            return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError):
+            return json.dumps(to_jsonable(message), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return _from_array(orjson.loads(data) if orjson is not None else json.loads(data))
+
+
+def _uuid_from_bytes(source: Any) -> Any:
+    if isinstance(source, bytes) and len(source) == 16:
+        return str(uuid.UUID(bytes=source))
+    return source
+
+
+class MsgpackMessageCodec(MessageCodec):
+    """Binary msgpack (optional dependency); bridge UUIDs travel as 16 bytes."""
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed. Install it with: pip install msgpack")
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        source = message.get("source_bridge")
+        if source is not None:
+            try:
+                source = uuid.UUID(str(source)).bytes
+            except ValueError:
+                pass
+        message = _to_array(message, source)
+        try:
+            return msgpack.packb(message, default=to_jsonable, use_bin_type=True)
+        except (TypeError, ValueError):
+            return msgpack.packb(to_jsonable(message), use_bin_type=True)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return _from_array(msgpack.unpackb(data, raw=False, strict_map_key=False), _uuid_from_bytes)
+
+
+class SchemaMessageCodec(MessageCodec):
+    """
+    Bridge messages with payloads laid out by the registered event models
+    (see schema_codec); anything else is sent as JSON. Both ends need the
+    same models registered (the Runner registers each Concept's __events__).
+    """
+    name = "schema"
+
+    def __init__(self, registry: Optional[SchemaRegistry] = None):
+        self.registry = registry or EVENT_SCHEMAS
+        self._json = JsonMessageCodec()
+        # source_bridge id <-> 16 bytes; there are only a handful of bridges
+        self._source_bytes: Dict[Any, Optional[bytes]] = {}
+        self._source_ids: Dict[bytes, str] = {}
+
+    def _pack_source(self, source: Any) -> Optional[bytes]:
+        packed = self._source_bytes.get(source, False)
+        if packed is False:
+            try:
+                packed = uuid.UUID(str(source)).bytes
+            except ValueError:
+                packed = None
+            if len(self._source_bytes) >= 1024:
+                self._source_bytes.clear()
+            self._source_bytes[source] = packed
+        return packed
+
+    def _unpack_source(self, data: bytes) -> str:
+        packed = data[1:17]
+        source = self._source_ids.get(packed)
+        if source is None:
+            source = str(uuid.UUID(bytes=packed))
+            if len(self._source_ids) >= 1024:
+                self._source_ids.clear()
+            self._source_ids[packed] = source
+        return source
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        keys = message.keys()
+        single = keys == _BRIDGE_KEYS or keys == _SEQ_BRIDGE_KEYS
+        if single or keys == _BATCH_KEYS or keys == _SEQ_BATCH_KEYS:
+            source = self._pack_source(message["source_bridge"])
+            seq = message.get("seq")
+            if source is not None and (seq is None or isinstance(seq, int) and seq >= 0):
+                out = bytearray()
+                out.append(_BRIDGE_TAG if single else _BATCH_TAG)
+                out += source
+                # 0: no sequence number
+                write_varint(out, 0 if seq is None else seq + 1)
+                if single:
+                    self.registry.encode_into(out, message["original_event"], message["payload"])
+                else:
+                    write_varint(out, len(message["batch"]))
+                    for event_name, payload in message["batch"]:
+                        self.registry.encode_into(out, event_name, payload)
+                return bytes(out)
+        return b"\x00" + self._json.encode(message)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        tag = data[0]
+        if tag == _BRIDGE_TAG or tag == _BATCH_TAG:
+            source = self._unpack_source(data)
+            seq, pos = read_varint(data, 17)
+            if tag == _BRIDGE_TAG:
+                event_name, payload, _ = self.registry.decode_from(data, pos)
+                message = {"source_bridge": source, "original_event": event_name, "payload": payload}
+            else:
+                count, pos = read_varint(data, pos)
+                batch = []
+                for _ in range(count):
+                    event_name, payload, pos = self.registry.decode_from(data, pos)
+                    batch.append([event_name, payload])
+                message = {"source_bridge": source, "batch": batch}
+            if seq:
+                message["seq"] = seq - 1
+            return message
+        return self._json.decode(data[1:])
+
+
+MESSAGE_CODECS: Dict[str, Type[MessageCodec]] = {
+    JsonMessageCodec.name: JsonMessageCodec,
+    MsgpackMessageCodec.name: MsgpackMessageCodec,
+    SchemaMessageCodec.name: SchemaMessageCodec,
+}
+
+
+def register_message_codec(codec_class: Type[MessageCodec]):
+    MESSAGE_CODECS[codec_class.name] = codec_class
+
+
+def get_message_codec(codec: Any = "json") -> MessageCodec:
+    """
+    Resolve a codec by name ("json", "msgpack", "schema", "auto") or pass an instance
+    through. "auto" picks msgpack when it is installed, else json, so it is
+    only safe when every peer has the same packages installed.
+    Both ends of a connection must use the same codec.
+    """
+    if isinstance(codec, MessageCodec):
+        return codec
+    if codec == "auto":
+        codec = "msgpack" if msgpack is not None else "json"
+    if codec not in MESSAGE_CODECS:
+        raise ValueError(f"Unknown message codec '{codec}'. Available: {', '.join(MESSAGE_CODECS)}")
+    return MESSAGE_CODECS[codec]()
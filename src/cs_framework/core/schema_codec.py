@@ -0,0 +1,420 @@
+import enum
+import hashlib
+import json
+import struct
+import typing
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from loguru import logger
+from pydantic import BaseModel
+from ..logging.codec import to_jsonable
+
+# Binary encoding of event payloads driven by the pydantic models Concepts
+# declare in __events__.
+#
+#   event     = type id (uint16 LE) + body
+#   body      = fields in model declaration order; runs of fixed-width fields
+#               (bool, int, float, Literal/Enum index) are packed with one struct
+#   type id 0 = fallback: varint name length, name, varint JSON length, JSON
+#
+# A model is first reduced to a JSON-able layout descriptor:
+#   "bool" | "float" | "str" | "json" | ["int", struct format]
+#   ["choice", [values]] | ["optional", d] | ["list", d] | ["model", [[name, d], ...]]
+# Type ids are derived from the event name and the descriptor, so two
+# processes agree on them without coordination and a schema change yields a
+# new id instead of garbage. Readers that do not have the models (e.g. the
+# debugger) rebuild decoders from descriptors stored alongside the data.
+JSON_TYPE_ID = 0
+_TYPE_ID = struct.Struct("<H")
+
+_INT_FORMATS = (("b", -(1 << 7), (1 << 7) - 1), ("B", 0, (1 << 8) - 1),
+                ("h", -(1 << 15), (1 << 15) - 1), ("H", 0, (1 << 16) - 1),
+                ("i", -(1 << 31), (1 << 31) - 1), ("I", 0, (1 << 32) - 1))
+
+# Raised by struct/dict lookups when a payload does not fit its declared model
+_ENCODE_ERRORS = (KeyError, TypeError, ValueError, AttributeError, IndexError, struct.error)
+
+
+def write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_bytes(out: bytearray, data: bytes):
+    if len(data) < 0x80:
+        out.append(len(data))
+    else:
+        write_varint(out, len(data))
+    out += data
+
+
+def _read_bytes(data, pos: int) -> Tuple[bytes, int]:
+    length = data[pos]
+    if length < 0x80:
+        pos += 1
+    else:
+        length, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + length]), pos + length
+
+
+def _json_dumps(value: Any) -> bytes:
+    try:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    except (TypeError, ValueError):
+        return json.dumps(to_jsonable(value), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _int_format(metadata) -> str:
+    # Narrow ints declared with bounds, e.g. Field(ge=0, le=255) -> one byte
+    low = high = None
+    for item in metadata:
+        if getattr(item, "ge", None) is not None:
+            low = item.ge
+        if getattr(item, "gt", None) is not None:
+            low = item.gt + 1
+        if getattr(item, "le", None) is not None:
+            high = item.le
+        if getattr(item, "lt", None) is not None:
+            high = item.lt - 1
+    if low is not None and high is not None:
+        for fmt, fmt_low, fmt_high in _INT_FORMATS:
+            if fmt_low <= low and high <= fmt_high:
+                return fmt
+    return "q"
+
+
+def describe_type(annotation: Any, metadata=()) -> Any:
+    """Layout descriptor for a field annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Annotated:
+        return describe_type(args[0], tuple(metadata) + tuple(args[1:]))
+    if annotation is bool:
+        return "bool"
+    if annotation is int:
+        return ["int", _int_format(metadata)]
+    if annotation is float:
+        return "float"
+    if annotation is str:
+        return "str"
+    if origin is typing.Literal:
+        return ["choice", list(args)]
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return ["choice", [member.value for member in annotation]]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return describe_model(annotation)
+    if origin is typing.Union and type(None) in args:
+        inner = [a for a in args if a is not type(None)]
+        if len(inner) == 1:
+            return ["optional", describe_type(inner[0], metadata)]
+    if origin in (list, set, frozenset) and args:
+        return ["list", describe_type(args[0])]
+    if origin is tuple and len(args) == 2 and args[1] is Ellipsis:
+        return ["list", describe_type(args[0])]
+    # Dicts, unions, Any, ...: embedded JSON
+    return "json"
+
+
+def describe_model(model: Type[BaseModel]) -> list:
+    return ["model", [[name, describe_type(info.annotation, info.metadata)]
+                      for name, info in model.model_fields.items()]]
+
+
+class _Field:
+    """
+    Compiled descriptor: fixed-width (`fmt`, optional to_raw / from_raw) or
+    variable-width (`encode(out, value)` / `decode(data, pos)`).
+    """
+    def __init__(self, fmt: Optional[str] = None, encode: Optional[Callable] = None,
+                 decode: Optional[Callable] = None, to_raw: Optional[Callable] = None,
+                 from_raw: Optional[Callable] = None):
+        self.fmt = fmt
+        self.encode = encode
+        self.decode = decode
+        self.to_raw = to_raw
+        self.from_raw = from_raw
+
+    def codec(self) -> Tuple[Callable, Callable]:
+        """encode / decode for this field even when it is fixed-width."""
+        if self.fmt is None:
+            return self.encode, self.decode
+        packer = struct.Struct("<" + self.fmt)
+        to_raw, from_raw = self.to_raw, self.from_raw
+
+        def encode(out, value):
+            out += packer.pack(to_raw(value) if to_raw else value)
+
+        def decode(data, pos):
+            (raw,) = packer.unpack_from(data, pos)
+            return (from_raw(raw) if from_raw else raw), pos + packer.size
+        return encode, decode
+
+
+def _decode_str(data, pos):
+    raw, pos = _read_bytes(data, pos)
+    return raw.decode("utf-8"), pos
+
+
+def _decode_json(data, pos):
+    raw, pos = _read_bytes(data, pos)
+    return json.loads(raw), pos
+
+
+# struct would silently coerce these (any truthy value packs as "?", True as
+# an int), so values are type-checked and mismatches fall back to JSON
+def _check_bool(value):
+    if type(value) is not bool:
+        raise TypeError(f"expected bool, got {type(value).__name__}")
+    return value
+
+
+def _check_int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"expected int, got {type(value).__name__}")
+    return value
+
+
+def _check_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"expected float, got {type(value).__name__}")
+    return value
+
+
+def compile_descriptor(descriptor: Any) -> _Field:
+    if descriptor == "bool":
+        return _Field("?", to_raw=_check_bool)
+    if descriptor == "float":
+        return _Field("d", to_raw=_check_float)
+    if descriptor == "str":
+        return _Field(encode=lambda out, value: _write_bytes(out, value.encode("utf-8")), decode=_decode_str)
+    if descriptor == "json":
+        return _Field(encode=lambda out, value: _write_bytes(out, _json_dumps(value)), decode=_decode_json)
+    kind, arg = descriptor
+    if kind == "int":
+        return _Field(arg, to_raw=_check_int)
+    if kind == "choice":
+        # Literal / Enum values travel as their index: interned by the schema
+        choices = list(arg)
+        index = {value: i for i, value in enumerate(choices)}
+        return _Field("B" if len(choices) <= 256 else "H",
+                      to_raw=lambda value: index[value.value if isinstance(value, enum.Enum) else value],
+                      from_raw=choices.__getitem__)
+    if kind == "optional":
+        inner_encode, inner_decode = compile_descriptor(arg).codec()
+
+        def encode(out, value):
+            if value is None:
+                out.append(0)
+            else:
+                out.append(1)
+                inner_encode(out, value)
+
+        def decode(data, pos):
+            if data[pos] == 0:
+                return None, pos + 1
+            return inner_decode(data, pos + 1)
+        return _Field(encode=encode, decode=decode)
+    if kind == "list":
+        item_encode, item_decode = compile_descriptor(arg).codec()
+
+        def encode(out, value):
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                raise TypeError(f"expected a list, got {type(value).__name__}")
+            write_varint(out, len(value))
+            for element in value:
+                item_encode(out, element)
+
+        def decode(data, pos):
+            count, pos = read_varint(data, pos)
+            items = []
+            for _ in range(count):
+                element, pos = item_decode(data, pos)
+                items.append(element)
+            return items, pos
+        return _Field(encode=encode, decode=decode)
+    if kind == "model":
+        layout = ModelLayout(descriptor)
+        return _Field(encode=layout.encode_into, decode=layout.decode_from)
+    raise ValueError(f"Unknown layout descriptor {descriptor!r}")
+
+
+class ModelLayout:
+    """Encoder/decoder for one ["model", ...] descriptor, compiled once."""
+    def __init__(self, descriptor: list):
+        self.descriptor = descriptor
+        self.field_names = [name for name, _ in descriptor[1]]
+        self.keys = frozenset(self.field_names)
+        # (packer, [(name, to_raw, from_raw)], None, None) for a run of consecutive
+        # fixed-width fields packed with one struct, or (None, name, encode, decode)
+        self._segments = []
+        run: List[Tuple[str, _Field]] = []
+
+        def close_run():
+            if run:
+                packer = struct.Struct("<" + "".join(f.fmt for _, f in run))
+                self._segments.append((packer, [(name, f.to_raw, f.from_raw) for name, f in run], None, None))
+                run.clear()
+
+        for name, field_descriptor in descriptor[1]:
+            field = compile_descriptor(field_descriptor)
+            if field.fmt is not None:
+                run.append((name, field))
+            else:
+                close_run()
+                self._segments.append((None, name, field.encode, field.decode))
+        close_run()
+
+    def encode_into(self, out: bytearray, payload: Any):
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump()
+        if payload.keys() != self.keys:
+            # Missing or extra keys would be lost on the way
+            raise KeyError(f"payload keys do not match {self.field_names}")
+        for packer, fields, encode, _ in self._segments:
+            if packer is None:
+                encode(out, payload[fields])
+            else:
+                out += packer.pack(*[to_raw(payload[name]) if to_raw else payload[name]
+                                     for name, to_raw, _ in fields])
+
+    def decode_from(self, data, pos: int) -> Tuple[Dict[str, Any], int]:
+        payload: Dict[str, Any] = {}
+        for packer, fields, _, decode in self._segments:
+            if packer is None:
+                payload[fields], pos = decode(data, pos)
+            else:
+                for (name, _, from_raw), value in zip(fields, packer.unpack_from(data, pos)):
+                    payload[name] = from_raw(value) if from_raw else value
+                pos += packer.size
+        return payload, pos
+
+
+class SchemaRegistry:
+    """
+    Event name -> compiled layouts of the models declared for it, with
+    stable numeric type ids. Events without a (matching) registered model
+    are encoded as JSON.
+    """
+    def __init__(self):
+        self._by_name: Dict[str, List[Tuple[int, ModelLayout]]] = {}
+        self._by_id: Dict[int, Tuple[str, ModelLayout]] = {}
+        self._concepts = set()
+
+    def register(self, event_name: str, model: Type[BaseModel], type_id: Optional[int] = None) -> int:
+        """Register `model` for `event_name`; returns its type id."""
+        return self.register_descriptor(event_name, describe_model(model), type_id)
+
+    def register_descriptor(self, event_name: str, descriptor: list, type_id: Optional[int] = None) -> int:
+        for existing_id, existing in self._by_name.get(event_name, ()):
+            # Same layout declared by another Concept (e.g. Pacman and Ghost "moved")
+            if existing.descriptor == descriptor and type_id in (None, existing_id):
+                return existing_id
+        if type_id is None:
+            key = event_name + json.dumps(descriptor, separators=(",", ":"))
+            digest = hashlib.blake2b(key.encode("utf-8"), digest_size=2).digest()
+            type_id = _TYPE_ID.unpack(digest)[0] or 1
+        elif not 0 < type_id < 1 << 16:
+            raise ValueError("type_id must be between 1 and 65535")
+        if type_id in self._by_id:
+            other_name, other = self._by_id[type_id]
+            if other_name == event_name and other.descriptor == descriptor:
+                return type_id
+            raise ValueError(f"Type id {type_id} of event '{event_name}' collides with '{other_name}'; "
+                             f"register one of them with an explicit type_id")
+        layout = ModelLayout(descriptor)
+        self._by_id[type_id] = (event_name, layout)
+        self._by_name.setdefault(event_name, []).append((type_id, layout))
+        return type_id
+
+    def register_concept(self, concept_class: type):
+        """
+        Register every model in a Concept class's __events__ (once per class).
+        Events whose type id collides stay on the JSON fallback.
+        """
+        if concept_class in self._concepts:
+            return
+        for event_name, model in getattr(concept_class, "__events__", {}).items():
+            try:
+                self.register(event_name, model)
+            except ValueError as e:
+                logger.warning(f"SchemaRegistry: {e}")
+        self._concepts.add(concept_class)
+
+    def describe(self, type_id: int) -> Tuple[str, list]:
+        """(event name, layout descriptor) of a registered type id."""
+        event_name, layout = self._by_id[type_id]
+        return event_name, layout.descriptor
+
+    def _layout_for(self, event_name: str, payload: Any) -> Tuple[int, Optional[ModelLayout]]:
+        # Event names are not unique across Concepts: a layout is only used
+        # when the payload has exactly its fields (values are checked on encode)
+        entries = self._by_name.get(event_name)
+        if not entries:
+            return JSON_TYPE_ID, None
+        if isinstance(payload, dict):
+            keys = payload.keys()
+        elif isinstance(payload, BaseModel):
+            keys = type(payload).model_fields.keys()
+        else:
+            return JSON_TYPE_ID, None
+        for type_id, layout in entries:
+            if keys == layout.keys:
+                return type_id, layout
+        return JSON_TYPE_ID, None
+
+    def encode_into(self, out: bytearray, event_name: str, payload: Any) -> int:
+        """Append one encoded event to `out`; returns the type id used (0 for JSON)."""
+        type_id, layout = self._layout_for(event_name, payload)
+        if layout is not None:
+            start = len(out)
+            out += _TYPE_ID.pack(type_id)
+            try:
+                layout.encode_into(out, payload)
+                return type_id
+            except _ENCODE_ERRORS:
+                # Payload does not fit the declared model
+                del out[start:]
+        out += _TYPE_ID.pack(JSON_TYPE_ID)
+        _write_bytes(out, (event_name or "").encode("utf-8"))
+        _write_bytes(out, _json_dumps(payload))
+        return JSON_TYPE_ID
+
+    def decode_from(self, data, pos: int = 0) -> Tuple[str, Any, int]:
+        """Returns (event_name, payload, next position)."""
+        (type_id,) = _TYPE_ID.unpack_from(data, pos)
+        pos += _TYPE_ID.size
+        if type_id == JSON_TYPE_ID:
+            name, pos = _read_bytes(data, pos)
+            raw, pos = _read_bytes(data, pos)
+            return name.decode("utf-8"), json.loads(raw), pos
+        if type_id not in self._by_id:
+            raise ValueError(f"Unknown event type id {type_id}; register the same event models on both ends")
+        event_name, layout = self._by_id[type_id]
+        payload, pos = layout.decode_from(data, pos)
+        return event_name, payload, pos
+
+    def encode(self, event_name: str, payload: Any) -> bytes:
+        out = bytearray()
+        self.encode_into(out, event_name, payload)
+        return bytes(out)
+
+    def decode(self, data: bytes) -> Tuple[str, Any]:
+        event_name, payload, _ = self.decode_from(data)
+        return event_name, payload
+
+
+# Shared by the Runner (which registers each Concept class it sees), the
+# "schema" message codec and the "schema" trace payload codec
+EVENT_SCHEMAS = SchemaRegistry()
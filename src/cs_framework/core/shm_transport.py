@@ -0,0 +1,289 @@
+import hashlib
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+from .transport import Transport
+from .message_codec import MessageCodec, get_message_codec
+
+# Ring layout (one segment per channel and direction):
+#   [0]   head: bytes ever written (producer-owned, uint64)
+#   [64]  tail: bytes ever read (consumer-owned, uint64)
+#   [128] magic, capacity, creator pid (uint32 each)
+#   [192] data area of `capacity` bytes holding [uint32 length][uint32 crc32][payload] records
+# head and tail sit in separate cache lines and each has a single writer, so
+# no lock is needed with one producer and one consumer. Records wrap around
+# the end of the data area.
+#
+# Python cannot issue memory fences, so on weakly ordered CPUs (ARM) the
+# consumer may see a new head before the record bytes behind it. The crc32
+# of each record catches that: a record whose length or checksum does not
+# match yet is left in place and read again on the next call.
+_HEAD, _TAIL, _META, _DATA = 0, 64, 128, 192
+# head / tail are accessed as elements of a "Q" memoryview: that is a single
+# 8-byte store, whereas struct.pack_into zero-fills before writing and the
+# other process could observe the intermediate 0.
+_HEAD_WORD, _TAIL_WORD = _HEAD // 8, _TAIL // 8
+_META_STRUCT = struct.Struct("III")
+_RECORD = struct.Struct("II")
+_MAGIC = 0xC5F3B1F1
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the segment with the resource tracker,
+    # which unlinks it when this (non-owning) process exits; only the creator should
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Windows frees a segment with its last handle, so nothing is left over
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _backoff(idle: float):
+    # Keep yielding (sleep(0) releases the GIL) for a while so the other side
+    # is picked up promptly, then back off the longer nothing happens
+    time.sleep(0 if idle < 0.01 else 0.0002 if idle < 1.0 else 0.002)
+
+
+class ShmRing:
+    """
+    Single-producer / single-consumer byte-record ring in shared memory.
+    The first side to open `name` creates the segment; the other attaches.
+    A segment whose creator is no longer running (left over from a crashed
+    run) is unlinked and created afresh instead of being attached to.
+    """
+    def __init__(self, name: str, capacity: int = 1 << 20, attach_timeout: float = 5.0):
+        self.name = name
+        capacity = (capacity + 7) // 8 * 8
+        while True:
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=_DATA + capacity)
+                self.owner = True
+                buf = self.shm.buf
+                # Magic last: it marks the header as initialized for attaching processes
+                _META_STRUCT.pack_into(buf, _META, 0, capacity, os.getpid())
+                _META_STRUCT.pack_into(buf, _META, _MAGIC, capacity, os.getpid())
+                break
+            except FileExistsError:
+                pass
+            try:
+                self.shm = _attach(name)
+            except FileNotFoundError:
+                # Unlinked in the meantime (e.g. by another process replacing a stale ring)
+                continue
+            self.owner = False
+            deadline = time.monotonic() + attach_timeout
+            while _META_STRUCT.unpack_from(self.shm.buf, _META)[0] != _MAGIC:
+                if time.monotonic() > deadline:
+                    self.shm.close()
+                    raise TimeoutError(f"ShmRing '{name}' was never initialized")
+                time.sleep(0.001)
+            creator = _META_STRUCT.unpack_from(self.shm.buf, _META)[2]
+            if _process_alive(creator):
+                break
+            logger.warning(f"ShmRing '{name}': replacing segment left over by process {creator}")
+            self.shm.close()
+            try:
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+        self.buf = self.shm.buf
+        self.capacity = _META_STRUCT.unpack_from(self.buf, _META)[1]
+        self.words = self.buf[:_DATA].cast("Q")
+
+    def _copy_in(self, position: int, data: bytes):
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self.buf[_DATA + offset:_DATA + offset + first] = data[:first]
+        if first < len(data):
+            self.buf[_DATA:_DATA + len(data) - first] = data[first:]
+
+    def _copy_out(self, position: int, length: int) -> bytes:
+        offset = position % self.capacity
+        first = min(length, self.capacity - offset)
+        data = bytes(self.buf[_DATA + offset:_DATA + offset + first])
+        if first < length:
+            data += bytes(self.buf[_DATA:_DATA + length - first])
+        return data
+
+    def write(self, payload: bytes) -> bool:
+        """Append one record; False if the ring is full (the consumer is behind)."""
+        size = _RECORD.size + len(payload)
+        if size > self.capacity:
+            raise ValueError(f"Message of {len(payload)} bytes does not fit ring '{self.name}' ({self.capacity} bytes)")
+        words = self.words
+        head, tail = words[_HEAD_WORD], words[_TAIL_WORD]
+        if self.capacity - (head - tail) < size:
+            return False
+        self._copy_in(head, _RECORD.pack(len(payload), zlib.crc32(payload)))
+        self._copy_in(head + _RECORD.size, payload)
+        # Publish the record only after its bytes are in place
+        words[_HEAD_WORD] = head + size
+        return True
+
+    def read(self) -> Optional[bytes]:
+        """Pop one record, or None if the ring is empty (or the next record is not fully visible yet)."""
+        words = self.words
+        tail, head = words[_TAIL_WORD], words[_HEAD_WORD]
+        available = head - tail
+        if available < _RECORD.size:
+            return None
+        length, crc = _RECORD.unpack(self._copy_out(tail, _RECORD.size))
+        if _RECORD.size + length > available:
+            return None
+        payload = self._copy_out(tail + _RECORD.size, length)
+        if zlib.crc32(payload) != crc:
+            return None
+        words[_TAIL_WORD] = tail + _RECORD.size + length
+        return payload
+
+    def pending_bytes(self) -> int:
+        return self.words[_HEAD_WORD] - self.words[_TAIL_WORD]
+
+    def close(self):
+        self.words.release()
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            if sys.version_info < (3, 13):
+                # An attacher sharing our resource tracker (e.g. a multiprocessing
+                # child) unregistered the name; unlink() expects it registered
+                from multiprocessing import resource_tracker
+                resource_tracker.register(self.shm._name, "shared_memory")
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def ring_name(namespace: str, channel: str, source: str, target: str) -> str:
+    # Shared memory names are short on some platforms (31 chars on macOS)
+    digest = hashlib.blake2b(f"{namespace}\0{channel}\0{source}\0{target}".encode("utf-8"), digest_size=8)
+    return "csfw_" + digest.hexdigest()
+
+
+class SharedMemoryTransport(Transport):
+    """
+    Transport between two processes on the same host over shared-memory
+    rings: one SPSC ring per channel and direction, so the fast path is a
+    memory copy with no syscalls.
+
+    Both processes use the same `namespace` with swapped `endpoint` / `peer`
+    names, e.g. SharedMemoryTransport("game", "sim", "render") and
+    SharedMemoryTransport("game", "render", "sim"). Subscribers in this
+    process get published messages directly, as with LocalTransport.
+
+    Incoming messages are delivered by a polling reader thread, or call
+    `poll()` yourself with `start_reader=False`. When the peer falls behind
+    and a ring fills up, publish() waits up to `publish_timeout` seconds and
+    then raises BufferError.
+    """
+    def __init__(self, namespace: str, endpoint: str, peer: str, codec: Any = "json",
+                 capacity: int = 1 << 20, publish_timeout: float = 1.0, start_reader: bool = True):
+        self.namespace = namespace
+        self.endpoint = endpoint
+        self.peer = peer
+        self.codec: MessageCodec = get_message_codec(codec)
+        self.capacity = capacity
+        self.publish_timeout = publish_timeout
+        self.subscribers: Dict[str, List[Callable[[dict], None]]] = {}
+        self._outbound: Dict[str, ShmRing] = {}
+        self._inbound: Dict[str, ShmRing] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.messages_sent = 0
+        self.messages_received = 0
+        self._reader = None
+        if start_reader:
+            self._reader = threading.Thread(target=self._read_loop, name="csfw-shm-transport", daemon=True)
+            self._reader.start()
+
+    def _ring(self, rings: Dict[str, ShmRing], channel: str, source: str, target: str) -> ShmRing:
+        ring = rings.get(channel)
+        if ring is None:
+            with self._lock:
+                ring = rings.get(channel)
+                if ring is None:
+                    ring = ShmRing(ring_name(self.namespace, channel, source, target), self.capacity)
+                    rings[channel] = ring
+        return ring
+
+    def publish(self, channel: str, message: dict):
+        for callback in self.subscribers.get(channel, ()):
+            callback(message)
+        ring = self._ring(self._outbound, channel, self.endpoint, self.peer)
+        data = self.codec.encode(message)
+        if not ring.write(data):
+            start = time.monotonic()
+            while not ring.write(data):
+                waited = time.monotonic() - start
+                if waited > self.publish_timeout:
+                    raise BufferError(f"SharedMemoryTransport: ring for '{channel}' is full; is '{self.peer}' reading?")
+                _backoff(waited)
+        self.messages_sent += 1
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]):
+        self.subscribers.setdefault(channel, []).append(callback)
+        self._ring(self._inbound, channel, self.peer, self.endpoint)
+
+    def poll(self, max_messages: Optional[int] = None) -> int:
+        """Deliver pending incoming messages; returns how many were delivered."""
+        delivered = 0
+        for channel, ring in list(self._inbound.items()):
+            while max_messages is None or delivered < max_messages:
+                data = ring.read()
+                if data is None:
+                    break
+                message = self.codec.decode(data)
+                delivered += 1
+                for callback in list(self.subscribers.get(channel, ())):
+                    try:
+                        callback(message)
+                    except Exception as e:
+                        logger.error(f"SharedMemoryTransport: subscriber on '{channel}' failed: {e}")
+        self.messages_received += delivered
+        return delivered
+
+    def _read_loop(self):
+        last_message = time.monotonic()
+        while not self._closed:
+            if self.poll():
+                last_message = time.monotonic()
+                continue
+            _backoff(time.monotonic() - last_message)
+
+    def close(self):
+        self._closed = True
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(1)
+        for ring in list(self._outbound.values()) + list(self._inbound.values()):
+            ring.close()
+        self._outbound.clear()
+        self._inbound.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
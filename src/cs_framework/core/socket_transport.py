@@ -0,0 +1,309 @@
+import os
+import socket
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from loguru import logger
+from .transport import Transport
+from .message_codec import MessageCodec, get_message_codec
+
+# Wire format: every frame is a 4-byte big-endian body length followed by
+#   1 byte  frame type (PUBLISH / SUBSCRIBE / UNSUBSCRIBE)
+#   2 bytes channel length, channel (utf-8)
+#   payload (codec-encoded message; empty for SUBSCRIBE / UNSUBSCRIBE)
+# The hub never decodes payloads: a published frame is relayed as-is to
+# every other connection subscribed to its channel.
+PUBLISH = b"P"
+SUBSCRIBE = b"S"
+UNSUBSCRIBE = b"U"
+
+_LENGTH = struct.Struct("!I")
+_HEADER = struct.Struct("!cH")
+MAX_FRAME = 64 * 1024 * 1024
+
+Address = Union[Tuple[str, int], str]
+
+
+def pack_frame(kind: bytes, channel: str, payload: bytes = b"") -> bytes:
+    channel_bytes = channel.encode("utf-8")
+    body_length = _HEADER.size + len(channel_bytes) + len(payload)
+    return _LENGTH.pack(body_length) + _HEADER.pack(kind, len(channel_bytes)) + channel_bytes + payload
+
+
+LENGTH_SIZE = _LENGTH.size
+
+
+def frame_length(head: bytes) -> int:
+    """Body length from the 4-byte frame prefix."""
+    (length,) = _LENGTH.unpack(head)
+    if length < _HEADER.size or length > MAX_FRAME:
+        raise ValueError(f"Invalid frame length {length}")
+    return length
+
+
+def parse_frame(body: bytes) -> Tuple[bytes, str, bytes]:
+    """(type, channel, payload) of a frame body."""
+    kind, channel_length = _HEADER.unpack_from(body)
+    start = _HEADER.size
+    channel = body[start:start + channel_length].decode("utf-8")
+    return kind, channel, body[start + channel_length:]
+
+
+def read_frame(stream) -> Optional[Tuple[bytes, str, bytes]]:
+    """Read one frame from a binary file object; None on a clean EOF."""
+    head = stream.read(LENGTH_SIZE)
+    if len(head) < LENGTH_SIZE:
+        return None
+    length = frame_length(head)
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return parse_frame(body)
+
+
+def _family(address: Address) -> int:
+    if isinstance(address, str):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix domain sockets are not available on this platform; use a (host, port) address")
+        return socket.AF_UNIX
+    return socket.AF_INET6 if ":" in address[0] else socket.AF_INET
+
+
+def _tune(sock: socket.socket):
+    if sock.family in (socket.AF_INET, socket.AF_INET6):
+        # Frames are small and latency-sensitive
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _Connection:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.stream = sock.makefile("rb")
+        self.write_lock = threading.Lock()
+        self.channels: Set[str] = set()
+
+    def send(self, data: bytes) -> bool:
+        try:
+            with self.write_lock:
+                self.sock.sendall(data)
+            return True
+        except OSError:
+            return False
+
+    def close(self):
+        for closer in (self.stream.close, self.sock.close):
+            try:
+                closer()
+            except OSError:
+                pass
+
+
+class SocketHub:
+    """
+    Relay server for SocketTransport clients (TCP or Unix domain socket).
+    Keeps channel -> subscribed connections and forwards each published
+    frame to the subscribers other than its sender.
+
+    `address` is a (host, port) tuple or a filesystem path. Port 0 picks a
+    free port; read the bound address from `hub.address`.
+    """
+    def __init__(self, address: Address = ("127.0.0.1", 0), backlog: int = 64):
+        self._server = socket.socket(_family(address), socket.SOCK_STREAM)
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+        else:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen(backlog)
+        self.address: Address = address if isinstance(address, str) else self._server.getsockname()[:2]
+
+        self._lock = threading.Lock()
+        self._channels: Dict[str, List[_Connection]] = {}
+        self._connections: Set[_Connection] = set()
+        self._closed = False
+        self.frames_relayed = 0
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="csfw-hub", daemon=True)
+        self._accept_thread.start()
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                break
+            _tune(sock)
+            connection = _Connection(sock)
+            with self._lock:
+                self._connections.add(connection)
+            threading.Thread(target=self._serve, args=(connection,), name="csfw-hub-conn", daemon=True).start()
+
+    def _serve(self, connection: _Connection):
+        try:
+            while True:
+                frame = read_frame(connection.stream)
+                if frame is None:
+                    break
+                kind, channel, payload = frame
+                if kind == PUBLISH:
+                    self._relay(connection, channel, pack_frame(PUBLISH, channel, payload))
+                elif kind == SUBSCRIBE:
+                    self._subscribe(connection, channel)
+                elif kind == UNSUBSCRIBE:
+                    self._unsubscribe(connection, channel)
+        except (OSError, ValueError) as e:
+            if not self._closed:
+                logger.warning(f"SocketHub: dropping connection: {e}")
+        finally:
+            self._drop(connection)
+
+    def _subscribe(self, connection: _Connection, channel: str):
+        with self._lock:
+            if channel not in connection.channels:
+                connection.channels.add(channel)
+                # Copy-on-write so _relay can iterate without holding the lock
+                self._channels[channel] = self._channels.get(channel, []) + [connection]
+
+    def _unsubscribe(self, connection: _Connection, channel: str):
+        with self._lock:
+            if channel in connection.channels:
+                connection.channels.discard(channel)
+                remaining = [c for c in self._channels.get(channel, []) if c is not connection]
+                if remaining:
+                    self._channels[channel] = remaining
+                else:
+                    self._channels.pop(channel, None)
+
+    def _relay(self, sender: _Connection, channel: str, frame: bytes):
+        for connection in self._channels.get(channel, ()):
+            if connection is not sender:
+                connection.send(frame)
+                self.frames_relayed += 1
+
+    def _drop(self, connection: _Connection):
+        for channel in list(connection.channels):
+            self._unsubscribe(connection, channel)
+        with self._lock:
+            self._connections.discard(connection)
+        connection.close()
+
+    def close(self):
+        self._closed = True
+        # close() alone does not wake a thread blocked in accept() on Linux
+        for closer in (lambda: self._server.shutdown(socket.SHUT_RDWR), self._server.close):
+            try:
+                closer()
+            except OSError:
+                pass
+        if self._accept_thread is not threading.current_thread():
+            self._accept_thread.join(1.0)
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            connection.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SocketTransport(Transport):
+    """
+    Transport over one persistent connection to a SocketHub.
+
+    Messages are encoded once per publish and sent as length-prefixed
+    frames. Subscribers in this process get the message directly (as with
+    LocalTransport); the hub forwards it to other processes. Each channel
+    is subscribed at the hub once, however many local callbacks it has.
+    Remote messages are delivered on the transport's reader thread.
+
+    The codec defaults to "json", which every peer can decode; pick another
+    one only when all processes on the hub use it.
+    """
+    def __init__(self, address: Address, codec: Any = "json", connect_timeout: float = 5.0):
+        self.address = address
+        self.codec: MessageCodec = get_message_codec(codec)
+        self.subscribers: Dict[str, List[Callable[[dict], None]]] = {}
+        self.messages_sent = 0
+        self.messages_received = 0
+
+        sock = socket.socket(_family(address), socket.SOCK_STREAM)
+        sock.settimeout(connect_timeout)
+        sock.connect(address)
+        sock.settimeout(None)
+        _tune(sock)
+        self._connection = _Connection(sock)
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="csfw-transport", daemon=True)
+        self._reader.start()
+
+    def publish(self, channel: str, message: dict):
+        for callback in self.subscribers.get(channel, ()):
+            callback(message)
+        if not self._connection.send(pack_frame(PUBLISH, channel, self.codec.encode(message))):
+            raise ConnectionError(f"SocketTransport: connection to {self.address} is closed")
+        self.messages_sent += 1
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]):
+        if channel not in self.subscribers:
+            self.subscribers[channel] = []
+            self._connection.send(pack_frame(SUBSCRIBE, channel))
+        self.subscribers[channel].append(callback)
+
+    def unsubscribe(self, channel: str, callback: Callable[[dict], None]):
+        callbacks = self.subscribers.get(channel)
+        if not callbacks or callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if not callbacks:
+            del self.subscribers[channel]
+            self._connection.send(pack_frame(UNSUBSCRIBE, channel))
+
+    def _read_loop(self):
+        while True:
+            try:
+                frame = read_frame(self._connection.stream)
+            except (OSError, ValueError) as e:
+                # The socket failed or the stream lost its framing
+                if not self._closed:
+                    logger.warning(f"SocketTransport: connection lost: {e}")
+                return
+            if frame is None:
+                return
+            kind, channel, payload = frame
+            if kind != PUBLISH:
+                continue
+            try:
+                message = self.codec.decode(payload)
+            except Exception as e:
+                # The frame was read whole, so the next one is intact
+                logger.error(f"SocketTransport: dropping undecodable message on '{channel}': {e}")
+                continue
+            self.messages_received += 1
+            for callback in list(self.subscribers.get(channel, ())):
+                try:
+                    callback(message)
+                except Exception as e:
+                    logger.error(f"SocketTransport: subscriber on '{channel}' failed: {e}")
+
+    def close(self):
+        self._closed = True
+        try:
+            self._connection.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,277 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from ..logging.logger import RDFLogger
+
+# How often file/database backed channels check for new commands while waiting.
+# Checks start at WAIT_CHECK_INTERVAL and back off to WAIT_CHECK_MAX_INTERVAL
+# while nothing changes, so an idle Runner does not stat/query 1000 times a second.
+# The cap bounds how late a command from another process is noticed.
+WAIT_CHECK_INTERVAL = 0.001
+WAIT_CHECK_MAX_INTERVAL = 0.004
+
+
+def _wait_for(changed: Callable[[], bool], timeout: float, wake: threading.Event,
+              interval: float = WAIT_CHECK_INTERVAL,
+              max_interval: float = WAIT_CHECK_MAX_INTERVAL) -> bool:
+    """
+    Block until `changed()` is true, `wake` is set or `timeout` expires.
+    Sleeps on the event, so wake() interrupts the wait immediately.
+    The check interval doubles after every unchanged check, up to `max_interval`.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if wake.is_set():
+            wake.clear()
+            return True
+        if changed():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        wake.wait(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
+
+
+class CommandChannel(ABC):
+    """
+    Delivers external commands (e.g. from an LLM agent) to a Runner.
+
+    A command is a dict with the keys "id", "target" (Concept name),
+    "action" and "payload".
+    """
+    @abstractmethod
+    def submit(self, target: str, action: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """Queue a command. Returns its id."""
+        pass
+
+    @abstractmethod
+    def poll(self) -> List[Dict[str, Any]]:
+        """Return the commands that are pending and not yet delivered."""
+        pass
+
+    @abstractmethod
+    def ack(self, command_id: str, error: Optional[str] = None):
+        """Mark a delivered command as done (or failed with `error`)."""
+        pass
+
+    def flush(self):
+        """Persist buffered acks. The Runner calls this once per poll."""
+        pass
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until new commands may be available, wake() is called or
+        `timeout` seconds pass. Returns False on timeout.
+        Channels that cannot detect new commands simply sleep.
+        """
+        time.sleep(timeout)
+        return False
+
+    def wake(self):
+        """Interrupt a blocked wait() (e.g. to stop the Runner)."""
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class InProcessCommandChannel(CommandChannel):
+    """
+    Thread-safe in-memory queue. Threads in the same process (e.g. an agent
+    talking to an LLM) submit commands, and a Runner blocked in wait() is
+    woken through a condition variable as soon as one arrives.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        self._woken = False
+        # Command id -> "done" or "error: <message>"
+        self.results: Dict[str, str] = {}
+
+    def submit(self, target: str, action: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        cmd_id = uuid.uuid4().hex[:8]
+        with self._cond:
+            self._queue.append({"id": cmd_id, "target": target, "action": action, "payload": payload or {}})
+            self._cond.notify_all()
+        return cmd_id
+
+    def poll(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            commands = list(self._queue)
+            self._queue.clear()
+        return commands
+
+    def ack(self, command_id: str, error: Optional[str] = None):
+        self.results[command_id] = f"error: {error}" if error else "done"
+
+    def wait(self, timeout: float) -> bool:
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self._queue or self._woken, timeout)
+            self._woken = False
+            return bool(ready)
+
+    def wake(self):
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+
+
+class RDFCommandChannel(CommandChannel):
+    """
+    Compatibility adapter for the original Turtle command file
+    (`<log>_commands.ttl`) managed by RDFLogger.
+    Every poll re-parses the file, so prefer SQLiteCommandChannel for new code.
+    """
+    def __init__(self, logger: RDFLogger):
+        self.logger = logger
+        self._wake = threading.Event()
+        self._seen_mtime = self._mtime()
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.logger.command_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def submit(self, target: str, action: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        return self.logger.add_command(action, target, payload)
+
+    def poll(self) -> List[Dict[str, Any]]:
+        self._seen_mtime = self._mtime()
+        commands = self.logger.get_pending_commands()
+        for cmd in commands:
+            cmd["id"] = cmd["uri"]
+        return commands
+
+    def ack(self, command_id: str, error: Optional[str] = None):
+        # Written once per poll by flush() instead of once per command
+        self.logger.mark_command_done(command_id, error, save=False)
+
+    def flush(self):
+        if self.logger.flush_command_graph():
+            # Our own write must not look like an external command
+            self._seen_mtime = self._mtime()
+
+    def wait(self, timeout: float) -> bool:
+        # A stat() per check instead of a Turtle parse per poll
+        return _wait_for(lambda: self._mtime() != self._seen_mtime, timeout, self._wake)
+
+    def wake(self):
+        self._wake.set()
+
+
+class SQLiteCommandChannel(CommandChannel):
+    """
+    Command queue stored in a SQLite database (WAL mode).
+
+    Any process can enqueue commands with plain SQL or with `submit()`;
+    a poll is a single indexed SELECT instead of a full Turtle parse. A
+    Runner blocked in wait() notices commits from other processes within
+    WAIT_CHECK_MAX_INTERVAL (a few milliseconds); submit() on this channel
+    wakes it at once.
+
+        INSERT INTO commands (target, action, payload) VALUES ('Player', 'move', '{"dx": 1}');
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS commands (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        target TEXT NOT NULL,
+        action TEXT NOT NULL,
+        payload TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'pending',
+        error TEXT,
+        created_at REAL,
+        processed_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_commands_pending ON commands (status, id);
+    """
+
+    def __init__(self, path: str = "commands.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # Highest id handed out by poll(); commands are delivered once per channel
+        self._last_id = 0
+        # Acks are written in one transaction by flush()
+        self._pending_acks: List[tuple] = []
+        self._wake = threading.Event()
+        self._data_version = self._get_data_version()
+
+    def _get_data_version(self) -> int:
+        # Changes whenever another connection commits to the database
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def submit(self, target: str, action: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO commands (target, action, payload, created_at) VALUES (?, ?, ?, ?)",
+                (target, action, json.dumps(payload or {}), time.time())
+            )
+        # Same-connection commits do not change data_version
+        self._wake.set()
+        return str(cur.lastrowid)
+
+    def poll(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, target, action, payload FROM commands "
+                "WHERE status = 'pending' AND id > ? ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+        commands = []
+        for row_id, target, action, payload in rows:
+            self._last_id = max(self._last_id, row_id)
+            try:
+                decoded = json.loads(payload) if payload else {}
+            except ValueError:
+                decoded = {}
+            commands.append({"id": str(row_id), "target": target, "action": action, "payload": decoded})
+        return commands
+
+    def ack(self, command_id: str, error: Optional[str] = None):
+        with self._lock:
+            self._pending_acks.append(("error" if error else "done", error, time.time(), int(command_id)))
+
+    def flush(self):
+        with self._lock:
+            if not self._pending_acks:
+                return
+            acks, self._pending_acks = self._pending_acks, []
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE commands SET status = ?, error = ?, processed_at = ? WHERE id = ?", acks
+            )
+            self._conn.execute("COMMIT")
+
+    def wait(self, timeout: float) -> bool:
+        def changed() -> bool:
+            version = self._get_data_version()
+            if version != self._data_version:
+                self._data_version = version
+                return True
+            return False
+        return _wait_for(changed, timeout, self._wake)
+
+    def wake(self):
+        self._wake.set()
+
+    def status(self, command_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM commands WHERE id = ?", (int(command_id),)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
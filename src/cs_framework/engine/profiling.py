@@ -0,0 +1,132 @@
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+# Span kinds recorded by the Runner
+ACTION = "action"
+EVENT = "event"
+SYNC = "sync"
+
+
+class SpanRecorder:
+    """
+    Bounded buffer of wall-clock spans recorded by the Runner.
+
+    A span is a plain tuple (kind, name, span_id, parent_id, start_ns, end_ns, tick):
+    - action: one concept.dispatch() + collect_events(), named "Concept.action";
+              parent is the triggering event
+    - sync:   one Synchronization evaluate() + execute(); parent is the event
+    - event:  the whole handling of an event, including the cascade it starts;
+              parent is the action that emitted it
+    Times come from time.perf_counter_ns(). Only the latest `maxlen` spans are kept.
+    """
+    def __init__(self, maxlen: int = 100_000):
+        self.spans: deque = deque(maxlen=maxlen)
+
+    def record(self, kind: str, name: str, span_id: Any, parent_id: Any,
+               start_ns: int, end_ns: int, tick: int = 0):
+        self.spans.append((kind, name, span_id, parent_id, start_ns, end_ns, tick))
+
+    def clear(self):
+        self.spans.clear()
+
+
+def _frame_name(kind: str, name: str) -> str:
+    return f"{kind}:{name}"
+
+
+def to_chrome_trace(spans: Iterable[tuple]) -> Dict[str, Any]:
+    """
+    Chrome trace event format (chrome://tracing, Perfetto).
+    Spans are complete ("X") events on one thread, so the cascade nests by time.
+    """
+    spans = list(spans)
+    origin = min((s[4] for s in spans), default=0)
+    events = []
+    for kind, name, span_id, parent_id, start_ns, end_ns, tick in spans:
+        events.append({
+            "name": name,
+            "cat": kind,
+            "ph": "X",
+            "ts": (start_ns - origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": 1,
+            "tid": 1,
+            "args": {
+                "id": str(span_id) if span_id is not None else None,
+                "parent": str(parent_id) if parent_id is not None else None,
+                "tick": tick,
+            },
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def to_speedscope(spans: Iterable[tuple], name: str = "cs-framework") -> Dict[str, Any]:
+    """
+    Speedscope "sampled" profile whose stacks follow causality instead of
+    the call stack: every action and sync evaluation is a sample weighted by
+    its own duration, with the chain of events/actions that caused it as the
+    stack. Slow actions and deep fan-outs show up as wide or tall frames.
+    """
+    spans = list(spans)
+    by_id = {s[2]: s for s in spans if s[2] is not None}
+    frames: List[Dict[str, str]] = []
+    frame_index: Dict[str, int] = {}
+
+    def frame(kind: str, frame_name: str) -> int:
+        key = _frame_name(kind, frame_name)
+        if key not in frame_index:
+            frame_index[key] = len(frames)
+            frames.append({"name": key})
+        return frame_index[key]
+
+    samples = []
+    weights = []
+    for kind, span_name, span_id, parent_id, start_ns, end_ns, tick in spans:
+        if kind == EVENT:
+            # Event time is the sum of its syncs and the cascade below it
+            continue
+        stack = [frame(kind, span_name)]
+        seen = {span_id}
+        parent = by_id.get(parent_id)
+        while parent is not None and parent[2] not in seen:
+            seen.add(parent[2])
+            stack.append(frame(parent[0], parent[1]))
+            parent = by_id.get(parent[3])
+        stack.reverse()
+        samples.append(stack)
+        weights.append(end_ns - start_ns)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "nanoseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "cs-framework",
+    }
+
+
+def write_profile(path: str, spans: Iterable[tuple], format: Optional[str] = None):
+    """
+    Write spans as speedscope JSON or Chrome trace JSON.
+    The format is guessed from the file name ("*.speedscope.json" or "*.trace.json")
+    unless given explicitly ("speedscope" / "chrome").
+    """
+    if format is None:
+        format = "chrome" if path.endswith(".trace.json") else "speedscope"
+    if format == "chrome":
+        data = to_chrome_trace(spans)
+    elif format == "speedscope":
+        data = to_speedscope(spans)
+    else:
+        raise ValueError(f"Unknown profile format '{format}'. Available: speedscope, chrome")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
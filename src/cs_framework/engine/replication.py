@@ -0,0 +1,233 @@
+import copy
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from ..core.concept import Concept
+from ..core.transport import Transport
+from .runner import Runner
+
+# Messages on `channel`:
+#   {"kind": "keyframe", "seq": n, "tick": t, "states": {concept name: full state}}
+#   {"kind": "delta",    "seq": n, "tick": t, "states": {concept name: state delta}}
+# and on `channel + SYNC_SUFFIX`, from replicas: {"replica": id} asks for a keyframe.
+# Ticks in which no selected concept changed publish nothing; `seq` counts
+# published messages so a replica can tell a lost message from a quiet tick.
+KEYFRAME = "keyframe"
+DELTA = "delta"
+SYNC_SUFFIX = ".sync"
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Delta turning `old` into `new`: {"set": {key: value}, "unset": [key],
+    "nested": {key: delta}} (empty parts omitted). Nested dicts are diffed
+    recursively, any other changed value (lists included) is replaced.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            delta.setdefault("set", {})[key] = value
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            delta.setdefault("nested", {})[key] = diff_state(previous, value)
+        else:
+            delta.setdefault("set", {})[key] = value
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta["unset"] = removed
+    return delta
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a diff_state() delta to `state` in place; returns `state`."""
+    for key in delta.get("unset", ()):
+        state.pop(key, None)
+    for key, value in delta.get("set", {}).items():
+        state[key] = value
+    for key, nested in delta.get("nested", {}).items():
+        target = state.get(key)
+        if not isinstance(target, dict):
+            target = state[key] = {}
+        apply_delta(target, nested)
+    return state
+
+
+class StatePublisher:
+    """
+    Streams the state of selected concepts (by name; all concepts by
+    default) from a primary Runner over a Transport: a keyframe with full
+    states first, then per-tick deltas of the concepts that changed.
+
+    States are taken from the Runner's per-tick snapshot (history[-1]), so
+    publishing costs one comparison per concept and no extra copy. A keyframe
+    is re-sent every `keyframe_interval` ticks (if set) and whenever a
+    replica asks for one (on joining or after losing a message).
+    """
+    def __init__(self, runner: Runner, transport: Transport, concepts: Optional[Iterable[str]] = None,
+                 channel: str = "replication", keyframe_interval: Optional[int] = None):
+        self.runner = runner
+        self.transport = transport
+        self.concepts = None if concepts is None else set(concepts)
+        self.channel = channel
+        self.keyframe_interval = keyframe_interval
+        # Last published state per concept name (references into runner.history)
+        self._published: Dict[str, Dict[str, Any]] = {}
+        self._keyframe_due = True
+        self._last_keyframe_tick = 0
+        self.seq = 0
+        # Counters
+        self.keyframes = 0
+        self.deltas = 0
+
+        self.transport.subscribe(channel + SYNC_SUFFIX, self._on_sync_request)
+        runner.add_tick_listener(self._on_tick)
+
+    def _on_sync_request(self, message: dict):
+        # Transport thread: only set a flag, the next tick sends the keyframe
+        self._keyframe_due = True
+
+    def _selected(self) -> Dict[str, Dict[str, Any]]:
+        runner = self.runner
+        snapshot = runner.history[-1] if runner.history else runner._get_global_state()
+        states = {}
+        for cid, state in snapshot.items():
+            concept = runner.concepts.get(cid)
+            if concept is not None and (self.concepts is None or concept.name in self.concepts):
+                states[concept.name] = state
+        return states
+
+    def _on_tick(self, runner: Runner):
+        states = self._selected()
+        tick = runner.tick_count
+        if self.keyframe_interval and tick - self._last_keyframe_tick >= self.keyframe_interval:
+            self._keyframe_due = True
+        if self._keyframe_due:
+            self.publish_keyframe(states)
+            return
+        changed = {}
+        for name, state in states.items():
+            previous = self._published.get(name)
+            if previous is None:
+                changed[name] = {"set": state}
+            elif previous != state:
+                changed[name] = diff_state(previous, state)
+            else:
+                continue
+            self._published[name] = state
+        if changed:
+            self._publish(DELTA, changed)
+            self.deltas += 1
+
+    def publish_keyframe(self, states: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Publish the full state of every selected concept now."""
+        states = self._selected() if states is None else states
+        self._keyframe_due = False
+        self._last_keyframe_tick = self.runner.tick_count
+        self._published = dict(states)
+        self._publish(KEYFRAME, states)
+        self.keyframes += 1
+
+    def _publish(self, kind: str, states: Dict[str, Any]):
+        message = {"kind": kind, "seq": self.seq, "tick": self.runner.tick_count, "states": states}
+        self.seq += 1
+        self.transport.publish(self.channel, message)
+
+    def close(self):
+        self.runner.remove_tick_listener(self._on_tick)
+
+
+class ReplicaRunner:
+    """
+    Read-only mirror of the concepts a StatePublisher streams: applies
+    keyframes and deltas without executing actions, for spectator views,
+    analytics or the GUI.
+
+    Messages are applied on the transport's thread. Read states with
+    get_state() / snapshot(), or register local Concept instances (matched
+    by name) to have their state restored on every update. Listeners added
+    with add_listener(callback) get (replica, changed concept names).
+
+    If a message is lost (sequence gap) the replica ignores deltas and asks
+    for a new keyframe.
+    """
+    def __init__(self, transport: Transport, channel: str = "replication"):
+        self.transport = transport
+        self.channel = channel
+        self.id = uuid.uuid4()
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.concepts_by_name: Dict[str, Concept] = {}
+        self.tick: Optional[int] = None
+        self.synced = False
+        self._expected_seq: Optional[int] = None
+        self._listeners: List[Callable[["ReplicaRunner", List[str]], None]] = []
+        self._lock = threading.Lock()
+        # Counters
+        self.messages_applied = 0
+        self.gaps = 0
+
+        self.transport.subscribe(channel, self._on_message)
+        self.request_sync()
+
+    def request_sync(self):
+        self.transport.publish(self.channel + SYNC_SUFFIX, {"replica": str(self.id)})
+
+    def register(self, concept: Concept):
+        """Mirror the replicated state of `concept.name` into this Concept."""
+        with self._lock:
+            self.concepts_by_name[concept.name] = concept
+            if concept.name in self.states:
+                concept.restore_state(self.states[concept.name])
+
+    def get_concept_by_name(self, name: str) -> Optional[Concept]:
+        return self.concepts_by_name.get(name)
+
+    def add_listener(self, callback: Callable[["ReplicaRunner", List[str]], None]):
+        self._listeners.append(callback)
+
+    def get_state(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self.states.get(name)
+            return copy.deepcopy(state) if state is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(self.states)
+
+    def dispatch(self, *args, **kwargs):
+        raise RuntimeError("ReplicaRunner is read-only; dispatch actions on the primary Runner")
+
+    def _on_message(self, message: dict):
+        kind = message.get("kind")
+        with self._lock:
+            # Copies: with LocalTransport the message shares objects with the primary's snapshots
+            if kind == KEYFRAME:
+                self.states = copy.deepcopy(message["states"])
+                self.synced = True
+            elif kind == DELTA and self.synced:
+                if message["seq"] != self._expected_seq:
+                    self.gaps += 1
+                    self.synced = False
+                else:
+                    for name, delta in message["states"].items():
+                        apply_delta(self.states.setdefault(name, {}), copy.deepcopy(delta))
+            else:
+                return
+            synced = self.synced
+            if synced:
+                changed = list(message["states"])
+                self._expected_seq = message["seq"] + 1
+                self.tick = message["tick"]
+                self.messages_applied += 1
+                for name in changed:
+                    concept = self.concepts_by_name.get(name)
+                    if concept is not None:
+                        concept.restore_state(self.states[name])
+        if not synced:
+            # Outside the lock: LocalTransport delivers synchronously
+            self.request_sync()
+            return
+        for listener in self._listeners:
+            listener(self, changed)
@@ -1,13 +1,20 @@
 import uuid
-from typing import Dict, List, Any, Optional
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Any, Optional, Set
 from ..core.concept import Concept
 from ..core.synchronization import Synchronization
 from ..core.event import Event, FailureEvent
 from ..core.invariant import Invariant
+from ..core.schema_codec import EVENT_SCHEMAS
 from ..logging.logger import RDFLogger
+from .command_channel import CommandChannel, RDFCommandChannel
+from .profiling import SpanRecorder, write_profile, ACTION, EVENT, SYNC
+from .metrics import MetricsRegistry, DEPTH_BUCKETS, start_http_server
 
 class Runner:
-    def __init__(self, max_depth: int = 10, logger: Optional[RDFLogger] = None):
+    def __init__(self, max_depth: int = 10, logger: Optional[RDFLogger] = None,
+                 command_channel: Optional[CommandChannel] = None, profile: bool = False,
+                 metrics: bool = True):
         self.concepts: Dict[uuid.UUID, Concept] = {}
         self.concepts_by_name: Dict[str, Concept] = {}
         self.synchronizations: List[Synchronization] = []
@@ -15,15 +22,77 @@ class Runner:
         self.max_depth = max_depth
         self._event_queue: List[Event] = []
         self.logger = logger
+        # External commands; defaults to the logger's Turtle command file
+        self.command_channel = command_channel
+        # Last state published per concept name (only changed states are re-published)
+        self._published_states: Dict[str, Dict[str, Any]] = {}
+        # File writes made by the logger during the last external-control tick
+        self.last_tick_writes: int = 0
+        # Set by run_with_external_control so all commands of a tick share one trace save
+        self._defer_save = False
+        self._save_pending = False
+        # Wall-clock spans of actions, sync evaluations and event cascades (profile=True).
+        # Durations are also written to the trace for the GUI flame view.
+        self.profiler: Optional[SpanRecorder] = SpanRecorder() if profile else None
+        # Counters and histograms for dashboards (see metrics() / serve_metrics())
+        self.registry: Optional[MetricsRegistry] = None
+        self._tick_depth = 0
+        if metrics:
+            self._init_metrics()
         
         # Time-Travel
         self.history: List[Dict[uuid.UUID, Dict[str, Any]]] = []
         self.tick_count: int = 0
+        # Concepts whose actions ran during the last completed tick (or that were
+        # registered / replayed since the tick before); see ShadowRunner.
+        # Concepts overriding on_tick_start/on_tick_end may change state in those
+        # hooks, so they count as changed in every tick.
+        self.changed_concepts: Set[uuid.UUID] = set()
+        self._changed: Set[uuid.UUID] = set()
+        self._tick_hooked: Set[uuid.UUID] = set()
+        # Called with the Runner after each completed tick (see add_tick_listener)
+        self._tick_listeners: List[Callable[["Runner"], None]] = []
+
+    def _init_metrics(self):
+        registry = self.registry = MetricsRegistry()
+        self._m_ticks = registry.counter("ticks_total", "Ticks processed")
+        self._m_events = registry.counter("events_handled_total", "Events handled")
+        self._m_failures = registry.counter("failures_total", "Events with a non-Success status")
+        self._m_actions = registry.counter("actions_dispatched_total", "Actions dispatched")
+        self._m_sync_matches = registry.counter("sync_matches_total", "Synchronization matches", ["sync"])
+        self._m_action_latency = registry.histogram("action_latency_seconds", "Action execution time", ["action"])
+        self._m_cascade_depth = registry.histogram("cascade_depth", "Deepest cascade level per tick",
+                                                   buckets=DEPTH_BUCKETS)
+        self._m_snapshot = registry.histogram("snapshot_seconds", "Time to take the per-tick state snapshot")
+        self._m_logger_flush = registry.histogram("logger_flush_seconds", "Time spent in RDFLogger.save per tick")
+        self._m_tick_writes = registry.gauge("last_tick_writes", "Logger file writes during the last external-control tick")
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current metric values: name -> {label values: value}. Histograms report
+        {"count", "sum"}. Empty when the Runner was created with metrics=False.
+        """
+        return self.registry.snapshot() if self.registry else {}
+
+    def serve_metrics(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Expose metrics in Prometheus text format at http://host:port/metrics
+        (background thread). Returns the server; call shutdown() to stop it.
+        """
+        if self.registry is None:
+            raise RuntimeError("Metrics are disabled. Create the Runner with metrics=True.")
+        return start_http_server(self.registry, port, host)
 
     def register(self, entity: Any):
         if isinstance(entity, Concept):
             self.concepts[entity.id] = entity
             self.concepts_by_name[entity.name] = entity
+            self._changed.add(entity.id)
+            if (type(entity).on_tick_start is not Concept.on_tick_start
+                    or type(entity).on_tick_end is not Concept.on_tick_end):
+                self._tick_hooked.add(entity.id)
+            # Declared event models, for the "schema" payload / message codecs
+            EVENT_SCHEMAS.register_concept(type(entity))
             if self.logger:
                 self.logger.log_concept(entity.id, entity.name, entity.get_state_snapshot())
         elif isinstance(entity, Synchronization):
@@ -35,6 +104,18 @@ class Runner:
         else:
             raise ValueError("Entity must be a Concept, Synchronization, or Invariant")
 
+    def add_tick_listener(self, callback: Callable[["Runner"], None]):
+        """
+        Call `callback(runner)` after every top-level tick, once the snapshot
+        (history[-1]) is taken and invariants hold. Snapshots are never
+        mutated afterwards, so listeners may keep references to them.
+        """
+        self._tick_listeners.append(callback)
+
+    def remove_tick_listener(self, callback: Callable[["Runner"], None]):
+        if callback in self._tick_listeners:
+            self._tick_listeners.remove(callback)
+
     def clear_synchronizations(self):
         """
         Remove all registered synchronizations.
@@ -59,13 +140,17 @@ class Runner:
 
     def process_events(self, depth: int = 0):
         if depth == 0:
+             self._changed.update(self._tick_hooked)
              # Collect any pending events from all concepts (e.g. from async callbacks or external inputs)
              for concept in self.concepts.values():
+                 concept.on_tick_start()
                  self._event_queue.extend(concept.collect_events())
 
         if depth > self.max_depth:
             print("Max recursion depth reached. Stopping propagation.")
             return
+        if depth > self._tick_depth:
+            self._tick_depth = depth
 
         # Process all currently queued events
         current_batch = self._event_queue[:]
@@ -74,13 +159,35 @@ class Runner:
         for event in current_batch:
             self._handle_event(event, depth)
         
-        if self.logger and depth == 0:
-            self.logger.save()
+        if depth != 0:
+            return
+        for concept in self.concepts.values():
+            concept.on_tick_end()
+        registry = self.registry
+        if self.logger:
+            if self._defer_save:
+                self._save_pending = True
+            else:
+                self._save_log()
 
-        if depth == 0:
-            self.tick_count += 1
-            self._save_snapshot()
-            self._check_invariants()
+        self.tick_count += 1
+        self.changed_concepts, self._changed = self._changed, set()
+        started = perf_counter_ns()
+        self._save_snapshot()
+        if registry is not None:
+            self._m_snapshot.observe((perf_counter_ns() - started) / 1e9)
+            self._m_ticks.inc()
+            self._m_cascade_depth.observe(self._tick_depth)
+        self._tick_depth = 0
+        self._check_invariants()
+        for listener in self._tick_listeners:
+            listener(self)
+
+    def _save_log(self):
+        started = perf_counter_ns()
+        self.logger.save()
+        if self.registry is not None:
+            self._m_logger_flush.observe((perf_counter_ns() - started) / 1e9)
 
     def _check_invariants(self):
         global_state = self._get_global_state()
@@ -93,16 +200,34 @@ class Runner:
                 raise RuntimeError(msg)
 
     def _handle_event(self, event: Event, depth: int):
+        profiler = self.profiler
+        event_start = perf_counter_ns() if profiler else 0
+        sync_ns = 0
+        if self.registry is not None:
+            self._m_events.inc()
+            if event.status != "Success":
+                self._m_failures.inc()
         if self.logger:
-            self.logger.log_event(event.id, event.name, event.source_id, event.causal_link, event.status, payload=event.payload)
+            self.logger.log_event(event.id, event.name, event.source_id, event.causal_link, event.status, payload=event.payload,
+                                   tick=self.tick_count)
 
         # Find matching synchronizations
         global_state = self._get_global_state()
         
         for sync in self.synchronizations:
-            if sync.evaluate(event, global_state):
+            if profiler:
+                sync_start = perf_counter_ns()
+            matched = sync.evaluate(event, global_state)
+            if matched:
                 # Execute sync
                 invocations = sync.execute(event)
+            if profiler:
+                sync_end = perf_counter_ns()
+                sync_ns += sync_end - sync_start
+                profiler.record(SYNC, sync.name, None, event.id, sync_start, sync_end, self.tick_count)
+            if matched:
+                if self.registry is not None:
+                    self._m_sync_matches.inc(sync.name)
                 for invocation in invocations:
                     target_concept = invocation.target_concept
                     # Resolve target concept if it's an ID or Name (not implemented fully yet, assuming object)
@@ -116,12 +241,15 @@ class Runner:
                             # Log Action Start
                             action_id = uuid.uuid4() # Generate ID for the action execution
                             if self.logger:
-                                self.logger.log_action(action_id, invocation.action_name, concept.id, triggered_by=event.id) # Triggered by Event -> Sync -> Action
+                                self.logger.log_action(action_id, invocation.action_name, concept.id, triggered_by=event.id, tick=self.tick_count) # Triggered by Event -> Sync -> Action
 
+                            action_start = perf_counter_ns()
+                            self._changed.add(target_id)
                             concept.dispatch(invocation.action_name, payload)
                             
                             # Collect new events from the concept
                             new_events = concept.collect_events()
+                            self._record_action(concept, invocation.action_name, action_id, event.id, action_start)
                             # Set causal link to the ACTION that caused it
                             for ne in new_events:
                                 ne.causal_link = action_id 
@@ -138,6 +266,32 @@ class Runner:
         if self._event_queue:
             self.process_events(depth + 1)
 
+        if profiler:
+            profiler.record(EVENT, event.name, event.id, event.causal_link, event_start, perf_counter_ns(), self.tick_count)
+            if self.logger:
+                # An event's own time is the evaluation of the synchronizations listening to it
+                self.logger.log_duration(event.id, sync_ns)
+
+    def _record_action(self, concept: Concept, name: str, action_id: uuid.UUID,
+                       parent_id: Optional[uuid.UUID], start_ns: int):
+        end_ns = perf_counter_ns()
+        if self.registry is not None:
+            self._m_actions.inc()
+            self._m_action_latency.observe((end_ns - start_ns) / 1e9, f"{concept.name}.{name}")
+        if self.profiler is not None:
+            self.profiler.record(ACTION, f"{concept.name}.{name}", action_id, parent_id, start_ns, end_ns, self.tick_count)
+            if self.logger:
+                self.logger.log_duration(action_id, end_ns - start_ns)
+
+    def export_profile(self, path: str, format: Optional[str] = None):
+        """
+        Write the recorded spans (Runner(profile=True)) as speedscope or Chrome trace JSON.
+        See engine.profiling.write_profile.
+        """
+        if self.profiler is None:
+            raise RuntimeError("Profiling is disabled. Create the Runner with profile=True.")
+        write_profile(path, self.profiler.spans, format)
+
     def dispatch(self, concept_id: uuid.UUID, action_name: str, payload: Any):
         """
         External entry point to trigger an action.
@@ -148,10 +302,13 @@ class Runner:
                 # Log Initial Action
                 action_id = uuid.uuid4()
                 if self.logger:
-                    self.logger.log_action(action_id, action_name, concept.id, triggered_by=None)
+                    self.logger.log_action(action_id, action_name, concept.id, triggered_by=None, tick=self.tick_count)
 
+                action_start = perf_counter_ns()
+                self._changed.add(concept_id)
                 concept.dispatch(action_name, payload)
                 new_events = concept.collect_events()
+                self._record_action(concept, action_name, action_id, None, action_start)
                 # Set causal link for initial action
                 for ne in new_events:
                     ne.causal_link = action_id
@@ -173,6 +330,7 @@ class Runner:
             for cid, state in snapshot.items():
                 if cid in self.concepts:
                     self.concepts[cid].restore_state(state)
+                    self._changed.add(cid)
             
             self.tick_count = tick_index
             self.history = self.history[:tick_index + 1]
@@ -183,17 +341,24 @@ class Runner:
 
     # ===== External Command Interface =====
 
+    def _get_command_channel(self) -> Optional[CommandChannel]:
+        if self.command_channel is None and self.logger:
+            self.command_channel = RDFCommandChannel(self.logger)
+        return self.command_channel
+
     def poll_and_execute_commands(self) -> int:
         """
-        Poll for pending commands from the RDF graph and execute them.
+        Poll for pending commands from the command channel and execute them.
         Returns the number of commands executed.
         
-        This enables LLM agents to control the Runner via SPARQL.
+        This enables LLM agents to control the Runner (via SPARQL on the
+        RDF command file by default, or any other CommandChannel).
         """
-        if not self.logger:
+        channel = self._get_command_channel()
+        if not channel:
             return 0
         
-        commands = self.logger.get_pending_commands()
+        commands = channel.poll()
         executed = 0
         
         for cmd in commands:
@@ -205,30 +370,42 @@ class Runner:
                 concept = self.get_concept_by_name(target_name)
                 if concept:
                     self.dispatch(concept.id, action_name, payload)
-                    self.logger.mark_command_done(cmd["uri"])
+                    channel.ack(cmd["id"])
                     executed += 1
                     print(f"Executed command: {target_name}.{action_name}")
                 else:
-                    self.logger.mark_command_done(cmd["uri"], f"Concept '{target_name}' not found")
+                    channel.ack(cmd["id"], f"Concept '{target_name}' not found")
                     print(f"Command failed: Concept '{target_name}' not found")
             except Exception as e:
-                self.logger.mark_command_done(cmd["uri"], str(e))
+                channel.ack(cmd["id"], str(e))
                 print(f"Command error: {e}")
+
+        # One write for all acks of this poll
+        channel.flush()
         
         return executed
 
-    def publish_all_states(self):
+    def publish_all_states(self, flush: bool = True):
         """
         Publish current state of all concepts to the command graph.
         Allows external agents (LLMs) to query current game state.
+
+        Only concepts whose state changed since the last publication are
+        re-published. With flush=False the command graph is written later
+        (e.g. together with command acks by poll_and_execute_commands).
         """
         if not self.logger:
             return
         
         for concept in self.concepts.values():
-            self.logger.publish_state(concept.name, concept.get_state_snapshot())
+            state = concept.get_state_snapshot()
+            if self._published_states.get(concept.name) == state:
+                continue
+            self._published_states[concept.name] = state
+            self.logger.publish_state(concept.name, state)
         
-        self.logger.save_command_graph()
+        if flush:
+            self.logger.flush_command_graph()
 
     def run_with_external_control(self, tick_callback=None, max_ticks: int = 1000, poll_interval: float = 0.1):
         """
@@ -243,24 +420,45 @@ class Runner:
         Args:
             tick_callback: Optional function to call each tick (for game logic like AI)
             max_ticks: Maximum number of ticks to run
-            poll_interval: Seconds to wait between polls
+            poll_interval: Maximum seconds to wait for a command before the next tick
         """
         import time
         
         for tick in range(max_ticks):
-            # Publish state for external agents to read
-            self.publish_all_states()
-            
-            # Poll and execute external commands
-            executed = self.poll_and_execute_commands()
-            
-            # Optional game tick logic
-            if tick_callback:
-                tick_callback(self, tick)
+            writes_before = self.logger.write_count if self.logger else 0
+
+            # Trace saves of the commands and callback below are made once, after them
+            self._defer_save = True
+            try:
+                # Publish state for external agents to read (written together with the acks below)
+                self.publish_all_states(flush=False)
+
+                # Poll and execute external commands
+                executed = self.poll_and_execute_commands()
+                if self.logger:
+                    self.logger.flush_command_graph()
+
+                # Optional game tick logic
+                if tick_callback:
+                    tick_callback(self, tick)
+            finally:
+                self._defer_save = False
+            if self._save_pending:
+                self._save_pending = False
+                self._save_log()
+
+            if self.logger:
+                self.last_tick_writes = self.logger.write_count - writes_before
+                if self.registry is not None:
+                    self._m_tick_writes.set(self.last_tick_writes)
             
-            # If no commands, wait before next poll
+            # If no commands, block until the channel signals new ones (or timeout)
             if executed == 0:
-                time.sleep(poll_interval)
+                channel = self._get_command_channel()
+                if channel:
+                    channel.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
             
             # Check for termination conditions (could be enhanced)
             if hasattr(self, '_should_stop') and self._should_stop:
@@ -271,4 +469,16 @@ class Runner:
     def stop_external_control(self):
         """Signal the external control loop to stop."""
         self._should_stop = True
+        if self.command_channel:
+            self.command_channel.wake()
+
+    def submit_command(self, target: str, action: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queue a command on the Runner's command channel (thread-safe for
+        InProcessCommandChannel and SQLiteCommandChannel).
+        """
+        channel = self._get_command_channel()
+        if not channel:
+            raise RuntimeError("Runner has no command channel")
+        return channel.submit(target, action, payload)
 
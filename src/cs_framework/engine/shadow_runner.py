@@ -1,53 +1,324 @@
-from typing import Any, Dict, List
+import hashlib
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+from ..logging.codec import to_jsonable
+from .replication import diff_state
 from .runner import Runner
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Queued work for the shadow thread: (concept name or None for process_events,
+# action, payload, main tick before, main state before, main tick after,
+# main state after, names of the main concepts changed since the previous
+# queued action, enqueue time). States are main.history snapshots, which
+# are never mutated, so the main thread hands over references, not copies.
+_STOP = None
+
+
+def state_fingerprint(state: Any) -> bytes:
+    """
+    Stable 16-byte blake2b digest of a concept state: canonical JSON with
+    sorted keys, so equal dicts hash equally whatever their insertion order.
+    """
+    if orjson is not None:
+        data = orjson.dumps(state, default=to_jsonable, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(to_jsonable(state), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
 class ShadowRunner:
     """
     Orchestrates a Main Runner and a Shadow Runner.
     Forwards all actions to both.
     Compares state after execution.
+
+    With threaded=True the shadow runs on its own thread: dispatch() and
+    process_events() run the main runner only and queue the action (at
+    most `queue_size`; when full the action is dropped, never waited for).
+    `sample_rate` mirrors that fraction of actions. Whenever the shadow did
+    not execute the main runner's previous tick (sampled out, dropped,
+    failed or diverged) it is first reset to the main state before the action, so every
+    comparison covers exactly one action. Lag and counts are exposed through
+    the main runner's metrics (shadow_*) and stats().
+
+    States are compared by per-concept fingerprints (state_fingerprint),
+    recomputed only for the concepts whose actions ran since the previous
+    comparison, or that override the tick hooks (Runner.changed_concepts);
+    only concepts whose fingerprints differ are diffed. A diff keeps just the
+    differing keys of each side. State changed any other way (e.g. assigned
+    directly from outside the Runner) is only seen by a full pass over every
+    concept: one runs every `full_check_interval` comparisons (0: only the
+    first one and after errors; 1: every comparison).
     """
-    def __init__(self, main_runner: Runner, shadow_runner: Runner):
+    def __init__(self, main_runner: Runner, shadow_runner: Runner, threaded: bool = False,
+                 queue_size: int = 1000, sample_rate: float = 1.0, full_check_interval: int = 0):
         self.main = main_runner
         self.shadow = shadow_runner
         self.diffs = []
+        self.threaded = threaded
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self._sample_credit = 0.0
+        self.full_check_interval = full_check_interval
+        self._comparisons = 0
+        # Counters (threaded mode)
+        self.mirrored = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.resyncs = 0
+        self.lag_seconds = 0.0
+        self.lag_ticks = 0
+        # Main tick whose resulting state the shadow holds (None: unknown)
+        self._shadow_tick: Optional[int] = None
+        # Fingerprint per concept name of each side at the last comparison (None: recompute all)
+        self._main_prints: Optional[Dict[str, bytes]] = None
+        self._shadow_prints: Optional[Dict[str, bytes]] = None
+        # Concept names changed since the last comparison (or the last queued action)
+        self._main_changed: Set[str] = set()
+        self._shadow_changed: Set[str] = set()
+        self.main.add_tick_listener(self._on_main_tick)
+        self.shadow.add_tick_listener(self._on_shadow_tick)
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        self._m_actions = self._m_diffs = self._m_lag = self._m_lag_ticks = self._m_queue = None
+        if threaded:
+            self._init_metrics()
+            self._queue = queue.Queue(queue_size)
+            self._worker = threading.Thread(target=self._run_shadow, name="csfw-shadow", daemon=True)
+            self._worker.start()
+
+    def _init_metrics(self):
+        registry = self.main.registry
+        if registry is None:
+            return
+        # get() first: several ShadowRunners may share a main runner
+        self._m_actions = registry.get("shadow_actions_total") or registry.counter(
+            "shadow_actions_total", "Main actions by shadow outcome (mirrored, skipped, dropped)", ["result"])
+        self._m_diffs = registry.get("shadow_diffs_total") or registry.counter(
+            "shadow_diffs_total", "Concept states that differed between main and shadow")
+        self._m_lag = registry.get("shadow_lag_seconds") or registry.gauge(
+            "shadow_lag_seconds", "Time from a main action to its shadow comparison")
+        self._m_lag_ticks = registry.get("shadow_lag_ticks") or registry.gauge(
+            "shadow_lag_ticks", "Main ticks not yet compared by the shadow")
+        self._m_queue = registry.get("shadow_queue_depth") or registry.gauge(
+            "shadow_queue_depth", "Actions waiting for the shadow runner")
 
     def dispatch(self, concept_name: str, action_name: str, payload: Any):
         """
         Dispatch action to both runners by Concept Name.
         """
+        if self.threaded:
+            main_c = self.main.get_concept_by_name(concept_name)
+            if main_c:
+                self._mirror(concept_name, action_name, payload,
+                             lambda: self.main.dispatch(main_c.id, action_name, payload))
+            return
+
         # Main
         main_c = self.main.get_concept_by_name(concept_name)
         if main_c:
             self.main.dispatch(main_c.id, action_name, payload)
-        
+
         # Shadow
         shadow_c = self.shadow.get_concept_by_name(concept_name)
         if shadow_c:
             self.shadow.dispatch(shadow_c.id, action_name, payload)
 
     def process_events(self):
+        if self.threaded:
+            self._mirror(None, None, None, self.main.process_events)
+            return
         self.main.process_events()
         self.shadow.process_events()
         self._compare_states()
 
+    def _on_main_tick(self, runner: Runner):
+        self._main_changed.update(runner.concepts[cid].name for cid in runner.changed_concepts
+                                  if cid in runner.concepts)
+
+    def _on_shadow_tick(self, runner: Runner):
+        self._shadow_changed.update(runner.concepts[cid].name for cid in runner.changed_concepts
+                                    if cid in runner.concepts)
+
+    @staticmethod
+    def _latest(runner: Runner) -> Dict[Any, Dict[str, Any]]:
+        # The last tick's snapshot; no further copy needed
+        return runner.history[-1] if runner.history else runner._get_global_state()
+
     def _compare_states(self):
-        main_state = self.main._get_global_state()
-        shadow_state = self.shadow._get_global_state()
-        
-        # Compare by Concept Name (since IDs might differ)
-        main_by_name = {self.main.concepts[cid].name: state for cid, state in main_state.items()}
-        shadow_by_name = {self.shadow.concepts[cid].name: state for cid, state in shadow_state.items()}
-        
-        for name, m_state in main_by_name.items():
-            if name in shadow_by_name:
-                s_state = shadow_by_name[name]
-                if m_state != s_state:
-                    diff = {
-                        "tick": self.main.tick_count,
-                        "concept": name,
-                        "main": m_state,
-                        "shadow": s_state
-                    }
-                    self.diffs.append(diff)
-                    print(f"Shadow Diff detected for {name}: {diff}")
+        main_changed, self._main_changed = self._main_changed, set()
+        shadow_changed, self._shadow_changed = self._shadow_changed, set()
+        self._compare(self._latest(self.main), self._latest(self.shadow), self.main.tick_count,
+                      main_changed, shadow_changed)
+
+    def _mirror(self, concept_name, action_name, payload, run_main):
+        main = self.main
+        before_tick = main.tick_count
+        before = main.history[-1] if main.history else None
+        run_main()
+
+        self._sample_credit += self.sample_rate
+        if self._sample_credit < 1.0:
+            self._count("skipped")
+            return
+        self._sample_credit -= 1.0
+        item = (concept_name, action_name, payload, before_tick, before, main.tick_count, self._latest(main),
+                self._main_changed, time.perf_counter())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # The changes stay pending for the next queued action
+            self._count("dropped")
+            return
+        self._main_changed = set()
+        if self._m_queue is not None:
+            self._m_queue.set(self._queue.qsize())
+
+    def _count(self, result: str):
+        setattr(self, result, getattr(self, result) + 1)
+        if self._m_actions is not None:
+            self._m_actions.inc(result)
+
+    def _run_shadow(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._execute(*item)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, concept_name, action_name, payload, before_tick, before, after_tick, after, main_changed,
+                 enqueued):
+        shadow = self.shadow
+        if self._shadow_tick != before_tick and before is not None:
+            self._resync(before)
+            # The shadow now holds the main state of before_tick: concepts the main
+            # runner did not change since the last comparison match its fingerprints
+            self._shadow_prints = None if self._main_prints is None else dict(self._main_prints)
+            self._shadow_changed = set(main_changed)
+        try:
+            if concept_name is None:
+                shadow.process_events()
+            else:
+                shadow_c = shadow.get_concept_by_name(concept_name)
+                if shadow_c:
+                    shadow.dispatch(shadow_c.id, action_name, payload)
+        except Exception as e:
+            self._shadow_tick = None
+            self._main_prints = None
+            self._record_diff({"tick": after_tick, "concept": concept_name, "action": action_name,
+                               "error": str(e)})
+        else:
+            shadow_changed, self._shadow_changed = self._shadow_changed, set()
+            diverged = self._compare(after, self._latest(shadow), after_tick, main_changed, shadow_changed)
+            # A diverged shadow is reset before its next action
+            self._shadow_tick = None if diverged else after_tick
+
+        self.mirrored += 1
+        self.lag_seconds = time.perf_counter() - enqueued
+        self.lag_ticks = self.main.tick_count - after_tick
+        if self._m_actions is not None:
+            self._m_actions.inc("mirrored")
+            self._m_lag.set(self.lag_seconds)
+            self._m_lag_ticks.set(self.lag_ticks)
+            self._m_queue.set(self._queue.qsize())
+
+    def _resync(self, main_state: Dict[Any, Dict[str, Any]]):
+        # restore_state copies, so the main runner's snapshot stays untouched
+        for cid, state in main_state.items():
+            concept = self.main.concepts.get(cid)
+            shadow_c = self.shadow.get_concept_by_name(concept.name) if concept else None
+            if shadow_c:
+                shadow_c.restore_state(state)
+        self.shadow._event_queue = []
+        self.resyncs += 1
+
+    @staticmethod
+    def _state_of(runner: Runner, state: Dict[Any, Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+        concept = runner.concepts_by_name.get(name)
+        return None if concept is None else state.get(concept.id)
+
+    def _fingerprint(self, runner: Runner, state, names, prints: Dict[str, bytes]):
+        for name in names:
+            concept_state = self._state_of(runner, state, name)
+            if concept_state is None:
+                prints.pop(name, None)
+            else:
+                prints[name] = state_fingerprint(concept_state)
+
+    def _compare(self, main_state, shadow_state, tick: int, main_changed: Set[str], shadow_changed: Set[str]) -> bool:
+        """
+        Refresh the fingerprints of the changed concepts (all of them on the first
+        call and every `full_check_interval` calls) and record a diff per concept
+        whose state differs; True if any did.
+        """
+        self._comparisons += 1
+        interval = self.full_check_interval
+        if (self._main_prints is None or self._shadow_prints is None
+                or (interval and self._comparisons % interval == 0)):
+            self._main_prints, self._shadow_prints = {}, {}
+            main_changed = self.main.concepts_by_name.keys()
+            shadow_changed = self.shadow.concepts_by_name.keys()
+        main_prints, shadow_prints = self._main_prints, self._shadow_prints
+        self._fingerprint(self.main, main_state, main_changed, main_prints)
+        self._fingerprint(self.shadow, shadow_state, shadow_changed, shadow_prints)
+        differs = False
+        for name in set(main_changed) | set(shadow_changed):
+            m_print, s_print = main_prints.get(name), shadow_prints.get(name)
+            if m_print is None or s_print is None or m_print == s_print:
+                continue
+            m_state = self._state_of(self.main, main_state, name)
+            s_state = self._state_of(self.shadow, shadow_state, name)
+            # Equal values can still serialize differently (1 vs 1.0, set order)
+            if m_state == s_state:
+                continue
+            differs = True
+            # Only the keys that differ, as each side has them
+            self._record_diff({"tick": tick, "concept": name, "main": diff_state(s_state, m_state),
+                               "shadow": diff_state(m_state, s_state)})
+        return differs
+
+    def _record_diff(self, diff: Dict[str, Any]):
+        self.diffs.append(diff)
+        if self._m_diffs is not None:
+            self._m_diffs.inc()
+        print(f"Shadow Diff detected for {diff['concept']}: {diff}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Threaded mode: wait until every queued action was compared; False on timeout."""
+        if self._queue is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop comparing; in threaded mode finish the queued actions and stop the shadow thread."""
+        self.main.remove_tick_listener(self._on_main_tick)
+        self.shadow.remove_tick_listener(self._on_shadow_tick)
+        if self._worker is None:
+            return
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+        self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mirrored": self.mirrored, "skipped": self.skipped, "dropped": self.dropped,
+                "resyncs": self.resyncs, "diffs": len(self.diffs),
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "lag_seconds": self.lag_seconds, "lag_ticks": self.lag_ticks}
@@ -0,0 +1,199 @@
+import json
+import uuid
+import base64
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel
+from rdflib import Literal, URIRef, XSD
+from .ontology import SCHEMA_PAYLOAD
+
+# Optional faster/compact encoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert a payload/state value into plain JSON types.
+    Used when the encoder cannot handle a value directly (models, UUIDs,
+    tuple keys, sets, ...).
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {k if isinstance(k, str) else str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return str(value)
+
+
+class PayloadCodec(ABC):
+    """
+    Serializes event payloads and concept states into RDF literals.
+    """
+    name: str = ""
+    datatype: Optional[URIRef] = None
+    # (type id, event name, layout descriptor) the logger still has to write (SchemaCodec)
+    pending_definitions: List[tuple] = ()
+
+    @abstractmethod
+    def encode(self, value: Any) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, text: str) -> Any:
+        pass
+
+    def to_literal(self, value: Any, event_name: Optional[str] = None) -> Literal:
+        return Literal(self.encode(value), datatype=self.datatype)
+
+
+class JsonCodec(PayloadCodec):
+    name = "json"
+
+    def encode(self, value: Any) -> str:
+        try:
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        except (TypeError, ValueError):
+            return json.dumps(to_jsonable(value), separators=(",", ":"), ensure_ascii=False)
+
+    def decode(self, text: str) -> Any:
+        return json.loads(text)
+
+
+class OrjsonCodec(PayloadCodec):
+    """JSON via orjson (optional dependency), output identical in structure to JsonCodec."""
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed. Install it with: pip install orjson")
+
+    def encode(self, value: Any) -> str:
+        try:
+            return orjson.dumps(value, default=to_jsonable, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            return orjson.dumps(to_jsonable(value)).decode("utf-8")
+
+    def decode(self, text: str) -> Any:
+        return orjson.loads(text)
+
+
+class MsgpackCodec(PayloadCodec):
+    """Compact binary encoding via msgpack (optional dependency), stored as xsd:base64Binary."""
+    name = "msgpack"
+    datatype = XSD.base64Binary
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed. Install it with: pip install msgpack")
+
+    def encode(self, value: Any) -> str:
+        try:
+            packed = msgpack.packb(value, default=to_jsonable, use_bin_type=True)
+        except (TypeError, ValueError):
+            packed = msgpack.packb(to_jsonable(value), use_bin_type=True)
+        return base64.b64encode(packed).decode("ascii")
+
+    def decode(self, text: str) -> Any:
+        return msgpack.unpackb(base64.b64decode(text), raw=False, strict_map_key=False)
+
+
+class SchemaCodec(PayloadCodec):
+    """
+    Event payloads in the binary layout of their registered pydantic model
+    (see core.schema_codec), stored as cs:schemaPayload base64 literals.
+    States and events without a registered model are written as JSON.
+    The layouts used are logged once as cs:EventSchema nodes so readers can
+    decode the trace without the application's models.
+    """
+    name = "schema"
+    datatype = SCHEMA_PAYLOAD
+
+    def __init__(self, registry=None):
+        from ..core.schema_codec import EVENT_SCHEMAS
+        self.registry = registry or EVENT_SCHEMAS
+        self._json = get_codec("auto")
+        self._defined = set()
+        self.pending_definitions = []
+
+    def encode(self, value: Any) -> str:
+        return self._json.encode(value)
+
+    def decode(self, text: str) -> Any:
+        return self._json.decode(text)
+
+    def to_literal(self, value: Any, event_name: Optional[str] = None) -> Literal:
+        if event_name is None:
+            return self._json.to_literal(value)
+        out = bytearray()
+        type_id = self.registry.encode_into(out, event_name, value)
+        if not type_id:
+            return self._json.to_literal(value)
+        if type_id not in self._defined:
+            self._defined.add(type_id)
+            self.pending_definitions.append((type_id,) + self.registry.describe(type_id))
+        return Literal(base64.b64encode(out).decode("ascii"), datatype=SCHEMA_PAYLOAD)
+
+
+CODECS: Dict[str, Type[PayloadCodec]] = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+    SchemaCodec.name: SchemaCodec,
+}
+
+
+def register_codec(codec_class: Type[PayloadCodec]):
+    CODECS[codec_class.name] = codec_class
+
+
+def get_codec(codec: Any = "auto") -> PayloadCodec:
+    """
+    Resolve a codec by name ("auto", "json", "orjson", "msgpack", "schema") or pass an
+    instance through. "auto" picks orjson when it is installed, else json.
+    """
+    if isinstance(codec, PayloadCodec):
+        return codec
+    if codec == "auto":
+        codec = "orjson" if orjson is not None else "json"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown payload codec '{codec}'. Available: {', '.join(CODECS)}")
+    return CODECS[codec]()
+
+
+def decode_literal(literal: Any, schemas=None) -> Any:
+    """
+    Decode a cs:hasState literal regardless of which codec wrote it.
+    Returns the raw string if it is not valid JSON (e.g. logs written before
+    structured payloads were introduced). Schema-encoded payloads are decoded
+    with `schemas` (a SchemaRegistry, e.g. rebuilt from the trace) or the
+    process-wide registry.
+    """
+    if isinstance(literal, Literal) and literal.datatype == XSD.base64Binary:
+        return MsgpackCodec().decode(str(literal))
+    if isinstance(literal, Literal) and literal.datatype == SCHEMA_PAYLOAD:
+        if schemas is None:
+            from ..core.schema_codec import EVENT_SCHEMAS as schemas
+        try:
+            return schemas.decode(base64.b64decode(str(literal)))[1]
+        except ValueError:
+            return str(literal)
+    try:
+        return json.loads(str(literal))
+    except ValueError:
+        return str(literal)
@@ -2,20 +2,44 @@ import sys
 import uuid
 import json
 from datetime import datetime
-from typing import Any, Optional, List, Dict
+from typing import Any, Optional, List, Dict, Union
 from rdflib import Graph, Literal, RDF, URIRef, XSD
 from loguru import logger
+from .codec import PayloadCodec, get_codec
 from .ontology import (
-    CS, CONCEPT, ACTION, EVENT, SYNCHRONIZATION, COMMAND,
-    HAS_NAME, HAS_STATE, BELONGS_TO, TRIGGERED_BY, CAUSED_BY, STATUS,
+    CS, CONCEPT, ACTION, EVENT, SYNCHRONIZATION, COMMAND, EVENT_SCHEMA,
+    HAS_NAME, HAS_STATE, BELONGS_TO, TRIGGERED_BY, CAUSED_BY, STATUS, AT_TICK, DURATION_NS,
     HAS_ACTION, HAS_TARGET, HAS_PAYLOAD, COMMAND_STATUS, CREATED_AT, PROCESSED_AT, ERROR_MESSAGE
 )
 
 import time
 
 
+# loguru's built-in severities, looked up without going through loguru
+_LEVEL_NO = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+def journal_path(log_file: str) -> str:
+    """Path of the append-only N-Triples journal kept next to a Turtle log."""
+    return os.path.abspath(log_file).replace(".ttl", "_journal.nt")
+
+
+def _nt_term(term) -> str:
+    if isinstance(term, Literal):
+        text = str(term).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+        if term.datatype:
+            return f'"{text}"^^<{term.datatype}>'
+        if term.language:
+            return f'"{text}"@{term.language}'
+        return f'"{text}"'
+    return f"<{term}>"
+
+
 class RDFLogger:
-    def __init__(self, log_file: str = "execution.ttl", console_output: bool = True, save_interval: float = 0.0):
+    def __init__(self, log_file: str = "execution.ttl", console_output: bool = True, save_interval: float = 0.0,
+                 journal: bool = False, codec: Union[str, PayloadCodec] = "auto",
+                 level: str = "DEBUG", sample_rate: int = 1, failures_only: bool = False,
+                 text_log: bool = True):
         self.graph = Graph()
         self.graph.bind("cs", CS)
         # Convert to absolute path for reliable file access
@@ -23,57 +47,147 @@ class RDFLogger:
         self.console_output = console_output
         self.save_interval = save_interval
         self.last_save_time = 0.0
+
+        # Payload/state serialization
+        self.codec = get_codec(codec)
         
         # Command graph (separate for external interaction)
         self.command_file = self.log_file.replace(".ttl", "_commands.ttl")
         self.command_graph = Graph()
         self.command_graph.bind("cs", CS)
+        # Pending in-memory changes to the command graph (see flush_command_graph)
+        self._command_graph_dirty = False
+
+        # Number of file writes (log, journal, command graph) since creation
+        self.write_count = 0
+
+        # Append-only journal: every save() appends the triples logged since the
+        # previous one, followed by a "# batch N" marker, so readers can tail it.
+        # Batches holding ticked entries are marked "# batch N ticks FIRST LAST",
+        # which lets readers seek to a tick window without parsing the rest.
+        self.journal_file = journal_path(self.log_file) if journal else None
+        self._journal_buffer: List[tuple] = []
+        self._journal_batches = 0
+        self._journal_ticks: Optional[tuple] = None
+        if self.journal_file:
+            with open(self.journal_file, "w", encoding="utf-8") as f:
+                f.write(f"# run {uuid.uuid4()}\n")
+        
+        # Console/text verbosity.
+        # Registrations are INFO, actions and successful events DEBUG, failures WARNING.
+        # Routine action/event messages can additionally be sampled (1 in `sample_rate`)
+        # or suppressed entirely (`failures_only`).
+        self.level = level
+        self.sample_rate = max(1, int(sample_rate))
+        self.failures_only = failures_only
+        self._sample_counter = 0
         
         # Configure loguru
         logger.remove() # Remove default handler
         if self.console_output:
-            logger.add(sys.stderr, format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>")
+            logger.add(sys.stderr, level=level, format="<green>{time:HH:mm:ss}</green> | <level>{message}</level>")
         
         # Also log to a text file for easier reading
-        text_log = log_file.replace(".ttl", ".log")
-        logger.add(text_log, rotation="1 MB")
+        if text_log:
+            logger.add(log_file.replace(".ttl", ".log"), level=level, rotation="1 MB")
+
+        # Nothing below this level reaches a sink, so such calls are skipped before
+        # any formatting happens.
+        self._min_level_no = logger.level(level).no if (self.console_output or text_log) else float("inf")
 
     def _log_to_console(self, message: str):
         logger.info(message)
 
+    def _enabled(self, level: str, routine: bool = False) -> bool:
+        if _LEVEL_NO[level] < self._min_level_no:
+            return False
+        if routine:
+            if self.failures_only:
+                return False
+            self._sample_counter += 1
+            return self._sample_counter % self.sample_rate == 0
+        return True
+
+    def _encode(self, value: Any, event_name: Optional[str] = None) -> Literal:
+        # Payloads are often mutable objects (e.g. a concept's own state dict)
+        # emitted repeatedly, so every call encodes the current value.
+        literal = self.codec.to_literal(value, event_name)
+        if self.codec.pending_definitions:
+            self._log_schemas()
+        return literal
+
+    def _log_schemas(self):
+        # Layouts first used by the schema codec, so readers can decode without the models
+        pending = self.codec.pending_definitions
+        while pending:
+            type_id, name, descriptor = pending.pop(0)
+            schema_uri = CS[f"schema_{type_id}"]
+            self._add((schema_uri, RDF.type, EVENT_SCHEMA))
+            self._add((schema_uri, HAS_NAME, Literal(name)))
+            self._add((schema_uri, HAS_STATE, Literal(json.dumps(descriptor, separators=(",", ":")))))
+
+    def _add(self, triple: tuple):
+        self.graph.add(triple)
+        if self.journal_file:
+            self._journal_buffer.append(triple)
+
     def log_concept(self, concept_id: uuid.UUID, name: str, state: Any):
         concept_uri = CS[str(concept_id)]
-        self.graph.add((concept_uri, RDF.type, CONCEPT))
-        self.graph.add((concept_uri, HAS_NAME, Literal(name)))
-        self.graph.add((concept_uri, HAS_STATE, Literal(json.dumps(str(state))))) # Simplified state serialization
-        self._log_to_console(f"Registered Concept: {name} ({concept_id})")
+        self._add((concept_uri, RDF.type, CONCEPT))
+        self._add((concept_uri, HAS_NAME, Literal(name)))
+        self._add((concept_uri, HAS_STATE, self._encode(state)))
+        if self._enabled("INFO"):
+            logger.info("Registered Concept: {} ({})", name, concept_id)
 
     def log_synchronization(self, sync_id: uuid.UUID, name: str):
         sync_uri = CS[str(sync_id)]
-        self.graph.add((sync_uri, RDF.type, SYNCHRONIZATION))
-        self.graph.add((sync_uri, HAS_NAME, Literal(name)))
-        self._log_to_console(f"Registered Sync: {name} ({sync_id})")
+        self._add((sync_uri, RDF.type, SYNCHRONIZATION))
+        self._add((sync_uri, HAS_NAME, Literal(name)))
+        if self._enabled("INFO"):
+            logger.info("Registered Sync: {} ({})", name, sync_id)
 
-    def log_action(self, action_id: uuid.UUID, name: str, concept_id: uuid.UUID, triggered_by: Optional[uuid.UUID] = None):
+    def _log_tick(self, uri: URIRef, tick: Optional[int]):
+        if tick is None:
+            return
+        self._add((uri, AT_TICK, Literal(tick)))
+        if self._journal_ticks is None:
+            self._journal_ticks = (tick, tick)
+        else:
+            self._journal_ticks = (min(self._journal_ticks[0], tick), max(self._journal_ticks[1], tick))
+
+    def log_action(self, action_id: uuid.UUID, name: str, concept_id: uuid.UUID, triggered_by: Optional[uuid.UUID] = None,
+                   tick: Optional[int] = None):
         action_uri = CS[str(action_id)]
-        self.graph.add((action_uri, RDF.type, ACTION))
-        self.graph.add((action_uri, HAS_NAME, Literal(name)))
-        self.graph.add((action_uri, BELONGS_TO, CS[str(concept_id)]))
+        self._add((action_uri, RDF.type, ACTION))
+        self._add((action_uri, HAS_NAME, Literal(name)))
+        self._add((action_uri, BELONGS_TO, CS[str(concept_id)]))
         if triggered_by:
-            self.graph.add((action_uri, TRIGGERED_BY, CS[str(triggered_by)]))
-        self._log_to_console(f"Action: {name} on {concept_id}")
+            self._add((action_uri, TRIGGERED_BY, CS[str(triggered_by)]))
+        self._log_tick(action_uri, tick)
+        if self._enabled("DEBUG", routine=True):
+            logger.debug("Action: {} on {}", name, concept_id)
 
-    def log_event(self, event_id: uuid.UUID, name: str, source_id: uuid.UUID, causal_link: Optional[uuid.UUID] = None, status: str = "Success", payload: Any = None):
+    def log_event(self, event_id: uuid.UUID, name: str, source_id: uuid.UUID, causal_link: Optional[uuid.UUID] = None, status: str = "Success", payload: Any = None,
+                  tick: Optional[int] = None):
         event_uri = CS[str(event_id)]
-        self.graph.add((event_uri, RDF.type, EVENT))
-        self.graph.add((event_uri, HAS_NAME, Literal(name)))
-        self.graph.add((event_uri, BELONGS_TO, CS[str(source_id)]))
-        self.graph.add((event_uri, STATUS, Literal(status)))
+        self._add((event_uri, RDF.type, EVENT))
+        self._add((event_uri, HAS_NAME, Literal(name)))
+        self._add((event_uri, BELONGS_TO, CS[str(source_id)]))
+        self._add((event_uri, STATUS, Literal(status)))
         if payload:
-             self.graph.add((event_uri, HAS_STATE, Literal(json.dumps(str(payload)))))
+            self._add((event_uri, HAS_STATE, self._encode(payload, name)))
         if causal_link:
-            self.graph.add((event_uri, CAUSED_BY, CS[str(causal_link)]))
-        self._log_to_console(f"Event: {name} from {source_id} (Status: {status})")
+            self._add((event_uri, CAUSED_BY, CS[str(causal_link)]))
+        self._log_tick(event_uri, tick)
+        if status != "Success":
+            if self._enabled("WARNING"):
+                logger.warning("Event: {} from {} (Status: {})", name, source_id, status)
+        elif self._enabled("DEBUG", routine=True):
+            logger.debug("Event: {} from {} (Status: {})", name, source_id, status)
+
+    def log_duration(self, entity_id: uuid.UUID, duration_ns: int):
+        """Record the measured wall-clock time of an Action/Event (Runner(profile=True))."""
+        self._add((CS[str(entity_id)], DURATION_NS, Literal(int(duration_ns))))
 
     # ===== Command Interface for LLM =====
     
@@ -89,13 +203,21 @@ class RDFLogger:
         self.command_graph.add((state_uri, HAS_NAME, Literal(concept_name)))
         self.command_graph.add((state_uri, HAS_STATE, Literal(json.dumps(state))))
         self.command_graph.add((state_uri, CREATED_AT, Literal(datetime.now().isoformat())))
+        self._command_graph_dirty = True
 
     def get_pending_commands(self) -> List[Dict[str, Any]]:
         """Query command graph for pending commands."""
-        # Reload command graph from file (external process may have written)
+        # Reload command graph from file (external process may have written).
+        # Only commands we do not know yet are merged, so unsaved acks and
+        # states in memory are not overwritten by their older on-disk versions.
         try:
             if os.path.exists(self.command_file):
-                self.command_graph.parse(self.command_file, format="turtle")
+                on_disk = Graph()
+                on_disk.parse(self.command_file, format="turtle")
+                for cmd in on_disk.subjects(RDF.type, COMMAND):
+                    if (cmd, RDF.type, COMMAND) not in self.command_graph:
+                        for triple in on_disk.triples((cmd, None, None)):
+                            self.command_graph.add(triple)
         except Exception as e:
             self._log_to_console(f"Error loading command file: {e}")
         
@@ -127,8 +249,11 @@ class RDFLogger:
         
         return commands
 
-    def mark_command_done(self, cmd_uri: str, error: Optional[str] = None):
-        """Mark a command as processed."""
+    def mark_command_done(self, cmd_uri: str, error: Optional[str] = None, save: bool = True):
+        """
+        Mark a command as processed.
+        With save=False the change is kept in memory until flush_command_graph().
+        """
         uri = URIRef(cmd_uri)
         
         # Remove pending status
@@ -142,7 +267,9 @@ class RDFLogger:
             self.command_graph.add((uri, COMMAND_STATUS, Literal("done")))
         
         self.command_graph.add((uri, PROCESSED_AT, Literal(datetime.now().isoformat())))
-        self.save_command_graph()
+        self._command_graph_dirty = True
+        if save:
+            self.save_command_graph()
 
     def add_command(self, action: str, target: str, payload: Dict[str, Any] = None) -> str:
         """Add a new command to the graph (for testing / programmatic use)."""
@@ -163,11 +290,42 @@ class RDFLogger:
         """Save command graph to file."""
         try:
             self.command_graph.serialize(destination=self.command_file, format="turtle")
+            self._command_graph_dirty = False
+            self.write_count += 1
         except Exception as e:
             self._log_to_console(f"Error saving command graph: {e}")
 
+    def flush_command_graph(self) -> bool:
+        """Save the command graph if it has unsaved changes. Returns True if written."""
+        if not self._command_graph_dirty:
+            return False
+        self.save_command_graph()
+        return True
+
+    def flush_journal(self):
+        """Append buffered triples to the journal as one batch."""
+        if not self.journal_file or not self._journal_buffer:
+            return
+        self._journal_batches += 1
+        lines = [f"{_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n" for s, p, o in self._journal_buffer]
+        if self._journal_ticks is not None:
+            lines.append(f"# batch {self._journal_batches} ticks {self._journal_ticks[0]} {self._journal_ticks[1]}\n")
+        else:
+            lines.append(f"# batch {self._journal_batches}\n")
+        self._journal_buffer = []
+        self._journal_ticks = None
+        try:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self.write_count += 1
+        except Exception as e:
+            self._log_to_console(f"Error writing journal: {e}")
+
     def save(self):
         import os
+
+        # The journal is cheap to append to, so it is not throttled
+        self.flush_journal()
         
         # Check throttle
         current_time = time.time()
@@ -180,8 +338,10 @@ class RDFLogger:
             self.graph.serialize(destination=temp_file, format="turtle")
             # Atomic replace
             os.replace(temp_file, self.log_file)
-            self._log_to_console(f"Log saved to {self.log_file}")
+            if self._enabled("DEBUG"):
+                logger.debug("Log saved to {}", self.log_file)
             self.last_save_time = current_time
+            self.write_count += 1
         except Exception as e:
             self._log_to_console(f"Error saving log: {e}")
             # Clean up temp file if it exists
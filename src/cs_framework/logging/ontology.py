@@ -9,6 +9,7 @@ ACTION = CS.Action
 EVENT = CS.Event
 ACTION_INVOCATION = CS.ActionInvocation
 COMMAND = CS.Command  # External command for LLM interaction
+EVENT_SCHEMA = CS.EventSchema  # Binary payload layout of one event type (codec="schema")
 
 # Properties
 HAS_NAME = CS.hasName
@@ -19,6 +20,11 @@ CAUSED_BY = CS.causedBy
 INVOKES = CS.invokes
 HAS_CONDITION = CS.hasCondition
 STATUS = CS.status
+AT_TICK = CS.atTick  # Runner tick during which an Action/Event happened
+DURATION_NS = CS.durationNs  # Wall-clock ns of an Action, or of the sync evaluation for an Event
+
+# Datatypes
+SCHEMA_PAYLOAD = CS.schemaPayload  # base64 of a schema_codec-encoded event payload
 
 # Command-specific properties
 HAS_ACTION = CS.hasAction
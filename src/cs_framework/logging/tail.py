@@ -0,0 +1,262 @@
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from rdflib import Graph, RDF
+from .ontology import CONCEPT, HAS_NAME
+from .trace_index import SCHEMA_PREFIX, TraceIndex
+from .trace_cache import load_trace_graph
+
+BATCH_MARKER = b"# batch"
+_CONCEPT_TYPE = f"<{RDF.type}> <{CONCEPT}>".encode("utf-8")
+_HAS_NAME = f"<{HAS_NAME}>".encode("utf-8")
+_SCHEMA_SUBJECT = f"<{SCHEMA_PREFIX}".encode("utf-8")
+
+
+class TraceTailReader:
+    """
+    Follows a growing execution trace and returns only what is new.
+
+    For the append-only journal written by `RDFLogger(journal=True)` the reader
+    keeps a byte offset and parses just the bytes appended since the last call,
+    up to the last complete batch marker, so the cost of an update does not
+    depend on the size of the trace.
+
+    Any other log (e.g. the Turtle file, which is rewritten on every save) is
+    re-read through the shared trace cache and diffed against the triples
+    already read, so facts added later to a known node (a duration, a status)
+    still reach the index.
+
+    read_new() returns records for nodes that appeared since the last call;
+    `triples_read` counts every triple indexed so far, new nodes or not.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.append_only = self.path.endswith(".nt")
+        self.offset = 0
+        self.index = TraceIndex()
+        self.resets = 0
+        self._seen: Set[str] = set()
+        self._run_header: Optional[bytes] = None
+        self._last_mtime_ns: Optional[int] = None
+        # Graph of the previous full read, to diff the next one against
+        self._previous: Optional[Graph] = None
+        self.triples_read = 0
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        """
+        Return records for the Concepts, Synchronizations, Actions and Events
+        that appeared since the previous call (in file order for the journal).
+        """
+        if self.append_only:
+            return self._read_journal()
+        return self._read_full()
+
+    def follow(self, poll_interval: float = 0.1, stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield new records forever (or until `stop()` returns True).
+        """
+        while not (stop and stop()):
+            records = self.read_new()
+            if not records:
+                time.sleep(poll_interval)
+                continue
+            for record in records:
+                yield record
+
+    def _reset(self):
+        self.offset = 0
+        self.index = TraceIndex()
+        self._seen = set()
+        self._previous = None
+        self.resets += 1
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            # The first line identifies the run; a new run truncates the journal
+            header = f.readline()
+            if size < self.offset or (self._run_header is not None and header != self._run_header):
+                self._reset()
+            self._run_header = header
+            if size == self.offset:
+                return []
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        # Only consume complete batches; a half-written batch is picked up next time
+        end = chunk.rfind(BATCH_MARKER)
+        if end < 0:
+            return []
+        end = chunk.find(b"\n", end)
+        if end < 0:
+            return []
+        chunk = chunk[:end + 1]
+        self.offset += len(chunk)
+
+        graph = Graph()
+        graph.parse(data=chunk, format="nt")
+        for s, p, o in graph:
+            self.index.add_triple(str(s), str(p), o)
+        self.triples_read += len(graph)
+
+        # Subjects in the order they were written (every journal line starts with <subject>)
+        order: Dict[str, None] = {}
+        for line in chunk.split(b"\n"):
+            if line.startswith(b"<"):
+                subject = line[1:line.find(b">")].decode("utf-8")
+                if subject not in self._seen:
+                    self._seen.add(subject)
+                    order[subject] = None
+        return self._records(list(order))
+
+    def _read_full(self) -> List[Dict[str, Any]]:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if mtime_ns == self._last_mtime_ns:
+            return []
+        try:
+            graph = load_trace_graph(self.path)
+        except Exception:
+            # The writer may be mid-save; try again on the next call
+            return []
+        self._last_mtime_ns = mtime_ns
+
+        previous = self._previous
+        new_subjects: Dict[str, None] = {}
+        for triple in graph:
+            if previous is not None and triple in previous:
+                continue
+            s, p, o = triple
+            subject = str(s)
+            self.index.add_triple(subject, str(p), o)
+            self.triples_read += 1
+            if subject not in self._seen:
+                new_subjects[subject] = None
+        self._previous = graph
+        self._seen.update(new_subjects)
+        return self._records(list(new_subjects))
+
+    def _records(self, subjects: List[str]) -> List[Dict[str, Any]]:
+        records = []
+        for uri in subjects:
+            if uri not in self.index.types:
+                continue
+            record = self.index.describe(uri)
+            record["concept_uri"] = self.index.belongs_to.get(uri)
+            record["parent"] = self.index.parents.get(uri)
+            records.append(record)
+        return records
+
+
+class JournalTickIndex:
+    """
+    Byte-offset index from ticks to batches of an append-only journal.
+
+    Batch markers written by RDFLogger carry the tick range of the batch
+    ("# batch N ticks FIRST LAST"), so keeping the index current is a line
+    scan of the appended bytes without any RDF parsing; read_window() then
+    seeks to the matching batches and parses nothing else. Concept type/name lines are kept aside so a
+    window can still show the concepts it refers to.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._run_header: Optional[bytes] = None
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        # (first_tick, last_tick, start_offset, end_offset) per ticked batch, in file order
+        self.batches: List[tuple] = []
+        self._last_ticks: List[int] = []
+        # False once ticks go backwards (Runner.replay), which disables bisection
+        self._monotonic = True
+        self._concept_lines: List[bytes] = []
+        self._concepts: Set[bytes] = set()
+
+    def refresh(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            header = f.readline()
+            if size < self.offset or (self._run_header is not None and header != self._run_header):
+                self._reset()
+            self._run_header = header
+            if size == self.offset:
+                return
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        end = chunk.rfind(BATCH_MARKER)
+        if end < 0 or chunk.find(b"\n", end) < 0:
+            return
+        chunk = chunk[:chunk.find(b"\n", end) + 1]
+
+        start = self.offset
+        pos = 0
+        for line in chunk.splitlines(keepends=True):
+            pos += len(line)
+            if line.startswith(BATCH_MARKER):
+                parts = line.split()
+                if len(parts) == 6 and parts[3] == b"ticks":
+                    first, last = int(parts[4]), int(parts[5])
+                    if self._last_ticks and first < self._last_ticks[-1]:
+                        self._monotonic = False
+                    self.batches.append((first, last, start, self.offset + pos))
+                    self._last_ticks.append(last)
+                start = self.offset + pos
+            elif line.startswith(b"<"):
+                if line.startswith(_SCHEMA_SUBJECT):
+                    # Payload layouts (codec="schema") are needed by every window
+                    self._concept_lines.append(line)
+                elif _CONCEPT_TYPE in line:
+                    self._concepts.add(line[:line.find(b">") + 1])
+                    self._concept_lines.append(line)
+                elif _HAS_NAME in line and line[:line.find(b">") + 1] in self._concepts:
+                    self._concept_lines.append(line)
+        self.offset += len(chunk)
+
+    def tick_range(self) -> Optional[tuple]:
+        """(first, last) tick in the journal, or None."""
+        self.refresh()
+        if not self.batches:
+            return None
+        return min(b[0] for b in self.batches), max(b[1] for b in self.batches)
+
+    def read_window(self, first: int, last: int) -> TraceIndex:
+        """
+        Index of the Actions/Events logged during ticks first..last, plus all
+        Concepts. Only the batches overlapping the window are read.
+        """
+        self.refresh()
+        # Ticks normally only grow, so batches are sorted by their last tick
+        lo = bisect_left(self._last_ticks, first) if self._monotonic else 0
+        data = [b"".join(self._concept_lines)]
+        with open(self.path, "rb") as f:
+            for batch_first, batch_last, start, end in self.batches[lo:]:
+                if batch_first > last or batch_last < first:
+                    if self._monotonic and batch_first > last:
+                        break
+                    continue
+                f.seek(start)
+                data.append(f.read(end - start))
+
+        graph = Graph()
+        graph.parse(data=b"".join(data), format="nt")
+        index = TraceIndex()
+        for s, p, o in graph:
+            index.add_triple(str(s), str(p), o)
+        # Batches can straddle the window edges
+        for tick in [t for t in index.by_tick if not first <= t <= last]:
+            for uri in index.by_tick.pop(tick):
+                index.ticks.pop(uri, None)
+        return index
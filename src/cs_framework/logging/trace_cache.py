@@ -0,0 +1,236 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from rdflib import Graph, Literal, URIRef, BNode
+from .ontology import CS
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".cache"
+
+
+def guess_format(path: str) -> str:
+    return "nt" if path.endswith(".nt") else "turtle"
+
+
+def _prefix_header(data: bytes) -> bytes:
+    """
+    Collect the leading @prefix/PREFIX declarations of a Turtle document so an
+    appended tail can be parsed on its own.
+    """
+    header = []
+    for line in data.splitlines(keepends=True):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith(b"@prefix") or stripped.upper().startswith(b"PREFIX"):
+            header.append(line)
+        else:
+            break
+    return b"".join(header)
+
+
+def _encode_graph(graph: Graph) -> Tuple[List[list], List[int]]:
+    """
+    Flatten a graph into an interned term table plus a flat list of indices.
+    Terms are plain lists of strings so the table round-trips through JSON.
+    """
+    terms: List[list] = []
+    lookup: Dict[Any, int] = {}
+    triples: List[int] = []
+    for triple in graph:
+        for term in triple:
+            idx = lookup.get(term)
+            if idx is None:
+                idx = len(terms)
+                lookup[term] = idx
+                if isinstance(term, Literal):
+                    terms.append(["l", str(term),
+                                  str(term.datatype) if term.datatype else None,
+                                  term.language])
+                elif isinstance(term, BNode):
+                    terms.append(["b", str(term)])
+                else:
+                    terms.append(["u", str(term)])
+            triples.append(idx)
+    return terms, triples
+
+
+def _decode_graph(terms: List[list], triples: List[int]) -> Graph:
+    nodes = []
+    for term in terms:
+        kind = term[0]
+        if kind == "u":
+            nodes.append(URIRef(term[1]))
+        elif kind == "l":
+            nodes.append(Literal(term[1],
+                                 datatype=URIRef(term[2]) if term[2] else None,
+                                 lang=term[3]))
+        else:
+            nodes.append(BNode(term[1]))
+
+    graph = Graph()
+    graph.bind("cs", CS)
+    it = iter(triples)
+    graph.addN((nodes[s], nodes[p], nodes[o], graph) for s, p, o in zip(it, it, it))
+    return graph
+
+
+class _Entry:
+    def __init__(self, size: int, mtime_ns: int, digest: bytes, header: bytes, graph: Graph):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.header = header
+        self.graph = graph
+
+
+class TraceCache:
+    """
+    Cache of parsed execution traces shared by the query engine and the GUI.
+
+    Entries are keyed by file path, size and mtime. When the file only grew
+    (its previous contents are an unchanged prefix), only the appended bytes
+    are parsed. That is the case for the append-only journal written by
+    `RDFLogger(journal=True)`; the Turtle log is rewritten on every save() and
+    is parsed in full whenever it changes.
+
+    With `persist=True` a JSON copy of every parsed trace is written next to
+    the log (`<log>.cache`, or under `cache_dir`), so a later process can skip
+    parsing entirely. This is off by default so that reading a trace never
+    writes into the trace directory.
+
+    Returned graphs are shared and must be treated as read-only. A load that
+    extends a trace returns a new graph; graphs handed out earlier keep their
+    contents.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, persist: bool = False):
+        self.cache_dir = cache_dir
+        self.persist = persist
+        self._entries: Dict[str, _Entry] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "extended": 0, "full_parses": 0}
+
+    def cache_path(self, path: str) -> str:
+        if self.cache_dir:
+            digest = hashlib.sha1(path.encode("utf-8")).hexdigest()
+            return os.path.join(self.cache_dir, digest + CACHE_SUFFIX)
+        return path + CACHE_SUFFIX
+
+    def load(self, path: str, format: Optional[str] = None) -> Graph:
+        """
+        Return the parsed graph for `path`, parsing as little as possible.
+        Raises FileNotFoundError if the log does not exist.
+        """
+        path = os.path.abspath(path)
+        fmt = format or guess_format(path)
+        st = os.stat(path)
+
+        entry = self._entries.get(path)
+        if entry and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+            self.stats["memory_hits"] += 1
+            return entry.graph
+
+        if entry is None:
+            entry = self._read_cache_file(path)
+            if entry and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+                self._entries[path] = entry
+                self.stats["disk_hits"] += 1
+                return entry.graph
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        hasher = hashlib.blake2b(digest_size=16)
+        new_entry = None
+        if entry and 0 < entry.size < len(data):
+            hasher.update(data[:entry.size])
+            if hasher.digest() == entry.digest:
+                new_entry = self._extend(entry, data, fmt)
+            if new_entry is None:
+                hasher = hashlib.blake2b(digest_size=16)
+
+        if new_entry is None:
+            graph = Graph()
+            graph.bind("cs", CS)
+            graph.parse(data=data, format=fmt)
+            header = _prefix_header(data) if fmt == "turtle" else b""
+            hasher.update(data)
+            new_entry = _Entry(len(data), st.st_mtime_ns, hasher.digest(), header, graph)
+            self.stats["full_parses"] += 1
+        else:
+            hasher.update(data[entry.size:])
+            new_entry.digest = hasher.digest()
+            new_entry.mtime_ns = st.st_mtime_ns
+            self.stats["extended"] += 1
+
+        self._entries[path] = new_entry
+        self._write_cache_file(path, new_entry)
+        return new_entry.graph
+
+    def invalidate(self, path: str):
+        self._entries.pop(os.path.abspath(path), None)
+
+    def _extend(self, entry: _Entry, data: bytes, fmt: str) -> Optional[_Entry]:
+        tail = data[entry.size:]
+        try:
+            delta = Graph()
+            delta.parse(data=entry.header + tail, format=fmt)
+        except Exception:
+            # The cut did not fall on a statement boundary; caller re-parses.
+            return None
+        # Copy rather than extend in place: callers (e.g. a LogQueryEngine and
+        # its TraceIndex) may still hold the previous graph.
+        graph = Graph()
+        graph.bind("cs", CS)
+        graph.addN((s, p, o, graph) for s, p, o in entry.graph)
+        graph.addN((s, p, o, graph) for s, p, o in delta)
+        return _Entry(len(data), entry.mtime_ns, entry.digest, entry.header, graph)
+
+    def _read_cache_file(self, path: str) -> Optional[_Entry]:
+        if not self.persist:
+            return None
+        try:
+            with open(self.cache_path(path), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != CACHE_VERSION or payload.get("path") != path:
+                return None
+            graph = _decode_graph(payload["terms"], payload["triples"])
+            return _Entry(payload["size"], payload["mtime_ns"], bytes.fromhex(payload["digest"]),
+                          payload["header"].encode("utf-8"), graph)
+        except Exception:
+            return None
+
+    def _write_cache_file(self, path: str, entry: _Entry):
+        if not self.persist:
+            return
+        cache_file = self.cache_path(path)
+        temp_file = cache_file + ".tmp"
+        terms, triples = _encode_graph(entry.graph)
+        payload = {
+            "version": CACHE_VERSION,
+            "path": path,
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "digest": entry.digest.hex(),
+            "header": entry.header.decode("utf-8"),
+            "terms": terms,
+            "triples": triples,
+        }
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(temp_file, cache_file)
+        except OSError:
+            if os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
+
+# Process-wide cache shared by LogQueryEngine and the GUI loader
+default_cache = TraceCache()
+
+
+def load_trace_graph(path: str, format: Optional[str] = None) -> Graph:
+    return default_cache.load(path, format)
@@ -0,0 +1,206 @@
+import json
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional, Union
+from rdflib import Graph, RDF
+from .ontology import (
+    CS, CONCEPT, ACTION, EVENT, SYNCHRONIZATION,
+    HAS_NAME, HAS_STATE, BELONGS_TO, TRIGGERED_BY, CAUSED_BY, STATUS, AT_TICK, DURATION_NS
+)
+from .codec import decode_literal
+
+# Type URI -> short label used in query results
+TYPE_LABELS = {
+    str(CONCEPT): "Concept",
+    str(ACTION): "Action",
+    str(EVENT): "Event",
+    str(SYNCHRONIZATION): "Synchronization",
+}
+
+_NAME = str(HAS_NAME)
+_BELONGS_TO = str(BELONGS_TO)
+_TRIGGERED_BY = str(TRIGGERED_BY)
+_CAUSED_BY = str(CAUSED_BY)
+_STATUS = str(STATUS)
+_STATE = str(HAS_STATE)
+_AT_TICK = str(AT_TICK)
+_DURATION_NS = str(DURATION_NS)
+_TYPE = str(RDF.type)
+# cs:EventSchema nodes written by codec="schema"
+SCHEMA_PREFIX = str(CS) + "schema_"
+
+
+def to_uri(entity_id: Union[str, uuid.UUID]) -> str:
+    """
+    Normalize a UUID, bare id string or full URI to the URI used in the log.
+    """
+    value = str(entity_id)
+    if value.startswith("http://") or value.startswith("https://"):
+        return value
+    return str(CS[value])
+
+
+class TraceIndex:
+    """
+    In-memory index over an execution trace.
+
+    Built with a single pass over the graph so that causal traversal
+    (Event -> Action -> Event ...) and per-type counts do not need SPARQL joins.
+    """
+    def __init__(self, graph: Optional[Graph] = None):
+        self.types: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+        self.status: Dict[str, str] = {}
+        self.belongs_to: Dict[str, str] = {}
+        # Raw cs:hasState literals, decoded lazily by payload()
+        self.payloads: Dict[str, Any] = {}
+        self._decoded: Dict[str, Any] = {}
+        # Event/Action name -> URIs, for filtered lookups
+        self.by_name: Dict[str, List[str]] = {}
+        # child -> parent (Event causedBy Action, Action triggeredBy Event)
+        self.parents: Dict[str, str] = {}
+        # parent -> children, the reverse of `parents`
+        self.children: Dict[str, List[str]] = {}
+        # Runner tick of each Action/Event (cs:atTick), and the reverse lookup
+        self.ticks: Dict[str, int] = {}
+        self.by_tick: Dict[int, List[str]] = {}
+        # Measured wall-clock ns (cs:durationNs, Runner(profile=True))
+        self.durations: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {label: 0 for label in TYPE_LABELS.values()}
+        self.failures: int = 0
+        # Schema node URI -> {"name": ..., "descriptor": ...}, and the registry built from them
+        self._schema_parts: Dict[str, Dict[str, str]] = {}
+        self._schemas = None
+
+        if graph is not None:
+            self.add_graph(graph)
+
+    def add_graph(self, graph: Graph):
+        for s, p, o in graph:
+            self.add_triple(str(s), str(p), o)
+
+    def add_triple(self, s: str, p: str, o: Any):
+        if s.startswith(SCHEMA_PREFIX):
+            if p == _NAME or p == _STATE:
+                self._schema_parts.setdefault(s, {})[p] = str(o)
+                self._schemas = None
+            return
+        if p == _TYPE:
+            label = TYPE_LABELS.get(str(o))
+            if label and s not in self.types:
+                self.types[s] = label
+                self.counts[label] += 1
+        elif p == _NAME:
+            name = str(o)
+            if s not in self.names:
+                self.by_name.setdefault(name, []).append(s)
+            self.names[s] = name
+        elif p == _STATE:
+            self.payloads[s] = o
+            self._decoded.pop(s, None)
+        elif p == _STATUS:
+            status = str(o)
+            if s not in self.status and status != "Success":
+                self.failures += 1
+            self.status[s] = status
+        elif p == _BELONGS_TO:
+            self.belongs_to[s] = str(o)
+        elif p == _AT_TICK:
+            tick = int(o)
+            if s not in self.ticks:
+                self.ticks[s] = tick
+                self.by_tick.setdefault(tick, []).append(s)
+        elif p == _DURATION_NS:
+            self.durations[s] = int(o)
+        elif p == _CAUSED_BY or p == _TRIGGERED_BY:
+            parent = str(o)
+            if self.parents.get(s) != parent:
+                self.parents[s] = parent
+                self.children.setdefault(parent, []).append(s)
+
+    def payload(self, uri: str) -> Any:
+        if uri not in self.payloads:
+            return None
+        if uri not in self._decoded:
+            self._decoded[uri] = decode_literal(self.payloads[uri], self.schemas() if self._schema_parts else None)
+        return self._decoded[uri]
+
+    def schemas(self):
+        """SchemaRegistry holding the event layouts recorded in the trace."""
+        if self._schemas is None:
+            from ..core.schema_codec import SchemaRegistry
+            registry = SchemaRegistry()
+            for uri, parts in self._schema_parts.items():
+                if _NAME in parts and _STATE in parts:
+                    registry.register_descriptor(parts[_NAME], json.loads(parts[_STATE]),
+                                                 int(uri[len(SCHEMA_PREFIX):]))
+            self._schemas = registry
+        return self._schemas
+
+    def describe(self, uri: str) -> Dict[str, Any]:
+        node = {
+            "id": uri.rsplit("/", 1)[-1],
+            "uri": uri,
+            "type": self.types.get(uri),
+            "name": self.names.get(uri),
+        }
+        if uri in self.status:
+            node["status"] = self.status[uri]
+        if uri in self.ticks:
+            node["tick"] = self.ticks[uri]
+        concept = self.belongs_to.get(uri)
+        if concept:
+            node["concept"] = self.names.get(concept, concept.rsplit("/", 1)[-1])
+        return node
+
+    def tick_range(self) -> Optional[tuple]:
+        """(first, last) tick present in the trace, or None if nothing is ticked."""
+        if not self.by_tick:
+            return None
+        return min(self.by_tick), max(self.by_tick)
+
+    def in_ticks(self, first: int, last: int) -> List[str]:
+        """URIs of the Actions/Events logged during ticks first..last (inclusive)."""
+        uris = []
+        for tick in sorted(t for t in self.by_tick if first <= t <= last):
+            uris.extend(self.by_tick[tick])
+        return uris
+
+    def ancestors(self, uri: str, max_depth: Optional[int] = None) -> List[str]:
+        """
+        Walk parent links from `uri` back to the root cause.
+        Returns URIs ordered from the node itself to the root.
+        """
+        chain = [uri]
+        seen = {uri}
+        current = uri
+        while current in self.parents:
+            if max_depth is not None and len(chain) > max_depth:
+                break
+            current = self.parents[current]
+            if current in seen:
+                # Defensive: a malformed trace must not loop forever
+                break
+            seen.add(current)
+            chain.append(current)
+        return chain
+
+    def descendants(self, uri: str, max_depth: Optional[int] = None) -> List[tuple]:
+        """
+        Breadth-first walk of child links starting below `uri`.
+        Returns (uri, depth) pairs.
+        """
+        result = []
+        seen = {uri}
+        queue = deque([(uri, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for child in self.children.get(current, ()):
+                if child in seen:
+                    continue
+                seen.add(child)
+                result.append((child, depth + 1))
+                queue.append((child, depth + 1))
+        return result
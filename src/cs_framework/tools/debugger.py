@@ -1,17 +1,26 @@
 import os
-from typing import List, Dict, Any
+import uuid
+from typing import List, Dict, Any, Optional, Union
 from rdflib import Graph
+from ..logging.trace_index import TraceIndex, to_uri
+from ..logging.trace_cache import load_trace_graph
 
 class LogQueryEngine:
-    def __init__(self, log_file: str):
+    def __init__(self, log_file: str, use_cache: bool = True):
         self.log_file = log_file
         self.graph = Graph()
         if os.path.exists(log_file):
             try:
-                self.graph.parse(log_file, format="turtle")
+                if use_cache:
+                    self.graph = load_trace_graph(log_file)
+                else:
+                    self.graph.parse(log_file, format="turtle")
             except Exception as e:
                 print(f"Error loading log file: {e}")
 
+        # Causal adjacency and per-type counters, built once per load
+        self.index = TraceIndex(self.graph)
+
     def execute_query(self, query: str) -> List[Dict[str, Any]]:
         """
         Executes a SPARQL query and returns the results as a list of dictionaries.
@@ -37,25 +46,90 @@ class LogQueryEngine:
         """
         Returns a summary of the log (counts of Concepts, Events, Actions).
         """
-        summary = {}
-        summary['concepts'] = len(list(self.graph.subjects(predicate=None, object=None))) # Rough count
-        # Better to use specific queries
-        
-        q_concepts = "SELECT (COUNT(?s) as ?count) WHERE { ?s a <http://cs-framework.org/schema#Concept> }"
-        q_events = "SELECT (COUNT(?s) as ?count) WHERE { ?s a <http://cs-framework.org/schema#Event> }"
-        q_actions = "SELECT (COUNT(?s) as ?count) WHERE { ?s a <http://cs-framework.org/schema#Action> }"
-        
-        summary['concepts'] = self._get_count(q_concepts)
-        summary['events'] = self._get_count(q_events)
-        summary['actions'] = self._get_count(q_actions)
-        
-        return summary
-
-    def _get_count(self, query: str) -> int:
-        try:
-            res = self.execute_query(query)
-            if res and 'count' in res[0]:
-                return int(res[0]['count'])
-        except:
-            pass
-        return 0
+        counts = self.index.counts
+        return {
+            "concepts": counts["Concept"],
+            "events": counts["Event"],
+            "actions": counts["Action"],
+            "synchronizations": counts["Synchronization"],
+            "failures": self.index.failures,
+        }
+
+    def explain(self, event_id: Union[str, uuid.UUID], max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Answers "why did this happen?".
+        Returns the causal chain of an Event (or Action), ordered from the
+        root cause down to the requested node.
+        """
+        uri = to_uri(event_id)
+        if uri not in self.index.types:
+            return []
+        chain = self.index.ancestors(uri, max_depth)
+        chain.reverse()
+        return [self.index.describe(node) for node in chain]
+
+    def consequences(self, action_id: Union[str, uuid.UUID], depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Answers "what happened next?".
+        Returns every Event/Action caused (directly or transitively) by the
+        given Action (or Event), breadth-first, each tagged with its distance.
+        """
+        uri = to_uri(action_id)
+        result = []
+        for node, distance in self.index.descendants(uri, depth):
+            info = self.index.describe(node)
+            info["depth"] = distance
+            result.append(info)
+        return result
+
+    def find_events(self, name: Optional[str] = None, status: Optional[str] = None,
+                    payload: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Filter Events by name, status and payload fields.
+        Payload keys may be dotted paths into nested payloads, e.g. {"pos.x": 3}.
+        """
+        index = self.index
+        if name is not None:
+            candidates = index.by_name.get(name, [])
+        else:
+            candidates = index.types.keys()
+
+        result = []
+        for uri in candidates:
+            if index.types.get(uri) != "Event":
+                continue
+            if status is not None and index.status.get(uri) != status:
+                continue
+            if payload and not _payload_matches(index.payload(uri), payload):
+                continue
+            info = index.describe(uri)
+            info["payload"] = index.payload(uri)
+            result.append(info)
+        return result
+
+    def window(self, first: int, last: int) -> List[Dict[str, Any]]:
+        """
+        Actions and Events logged during Runner ticks first..last (inclusive),
+        ordered by tick. Requires a trace that records cs:atTick.
+        """
+        return [self.index.describe(uri) for uri in self.index.in_ticks(first, last)]
+
+
+_MISSING = object()
+
+
+def _payload_matches(data: Any, conditions: Dict[str, Any]) -> bool:
+    for path, expected in conditions.items():
+        value = data
+        for key in path.split("."):
+            if isinstance(value, dict):
+                value = value.get(key, _MISSING)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = _MISSING
+            if value is _MISSING:
+                return False
+        if value != expected:
+            return False
+    return True
@@ -0,0 +1,130 @@
+import cProfile
+import os
+import pstats
+import sys
+import sysconfig
+from typing import Any, Dict, List
+from cs_framework.engine.scenario import ScenarioPlayer
+from cs_framework.engine.profiling import SpanRecorder, write_profile, ACTION, SYNC
+from cs_framework.tools.scenario_runner import load_runner, load_scenario
+
+FRAMEWORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LOGGER_FILE = os.path.join(FRAMEWORK_DIR, "logging", "logger.py")
+_LIBRARY_DIRS = tuple(
+    os.path.abspath(p) for p in {sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"],
+                                 sysconfig.get_paths()["platlib"]}
+)
+
+
+def classify(filename: str) -> str:
+    """'framework', 'library' (stdlib / third-party) or 'user' for a code object's file."""
+    if filename.startswith("<") or filename == "~":
+        # Built-ins and generated code
+        return "library"
+    path = os.path.abspath(filename)
+    if path.startswith(FRAMEWORK_DIR):
+        return "framework"
+    if path.startswith(_LIBRARY_DIRS) or "site-packages" in path:
+        return "library"
+    return "user"
+
+
+def _span_totals(spans, kind: str) -> List[Dict[str, Any]]:
+    totals: Dict[str, List[int]] = {}
+    for span_kind, name, _, _, start_ns, end_ns, _ in spans:
+        if span_kind != kind:
+            continue
+        entry = totals.setdefault(name, [0, 0])
+        entry[0] += 1
+        entry[1] += end_ns - start_ns
+    rows = [{"name": name, "calls": calls, "seconds": ns / 1e9} for name, (calls, ns) in totals.items()]
+    rows.sort(key=lambda row: row["seconds"], reverse=True)
+    return rows
+
+
+def summarize(stats: pstats.Stats, spans) -> Dict[str, Any]:
+    """
+    Build the report: time per concept action and per synchronization (from
+    Runner spans), per RDFLogger method (cumulative, from cProfile) and own
+    time split into framework / user code / libraries.
+    """
+    split = {"framework": 0.0, "user": 0.0, "library": 0.0}
+    logger_calls = []
+    for (filename, line, func), (cc, nc, tottime, cumtime, callers) in stats.stats.items():
+        split[classify(filename)] += tottime
+        if os.path.abspath(filename) == _LOGGER_FILE and not func.startswith("<"):
+            logger_calls.append({"name": f"RDFLogger.{func}", "calls": nc, "seconds": cumtime})
+    logger_calls.sort(key=lambda row: row["seconds"], reverse=True)
+    return {
+        "total_seconds": stats.total_tt,
+        "actions": _span_totals(spans, ACTION),
+        "synchronizations": _span_totals(spans, SYNC),
+        "logger": logger_calls,
+        "own_time": split,
+    }
+
+
+def profile_scenario(setup_file: str, scenario_file: str, output: str = "profile") -> Dict[str, Any]:
+    """
+    Play a scenario under cProfile with Runner span recording enabled.
+    Writes `<output>.pstats` and `<output>.speedscope.json` and returns the report.
+    """
+    runner = load_runner(setup_file)
+    scenario = load_scenario(scenario_file)
+    if runner.profiler is None:
+        runner.profiler = SpanRecorder()
+
+    profiler = cProfile.Profile()
+    runner.start()
+    player = ScenarioPlayer(runner)
+    profiler.enable()
+    try:
+        player.play(scenario)
+    finally:
+        profiler.disable()
+
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(output + ".pstats")
+    write_profile(output + ".speedscope.json", runner.profiler.spans, "speedscope")
+
+    report = summarize(stats, runner.profiler.spans)
+    report["files"] = [output + ".pstats", output + ".speedscope.json"]
+    return report
+
+
+def _print_table(title: str, rows: List[Dict[str, Any]], total: float, top: int):
+    print(f"\n{title}")
+    if not rows:
+        print("  (none)")
+        return
+    for row in rows[:top]:
+        share = 100 * row["seconds"] / total if total else 0
+        print(f"  {row['name']:<40} {row['calls']:>8} calls {row['seconds'] * 1000:>10.2f} ms {share:>6.1f}%")
+
+
+def print_report(report: Dict[str, Any], top: int = 15):
+    total = report["total_seconds"]
+    print(f"Total profiled time: {total * 1000:.2f} ms")
+    _print_table("Concept actions (wall clock)", report["actions"], total, top)
+    _print_table("Synchronizations (evaluate + execute)", report["synchronizations"], total, top)
+    _print_table("RDFLogger calls (cumulative)", report["logger"], total, top)
+
+    print("\nOwn time by origin")
+    for origin, label in (("framework", "cs_framework"), ("user", "user code"), ("library", "stdlib / third-party")):
+        seconds = report["own_time"][origin]
+        share = 100 * seconds / total if total else 0
+        print(f"  {label:<40} {seconds * 1000:>10.2f} ms {share:>6.1f}%")
+
+    print("\nWrote " + ", ".join(report["files"]))
+    print("Open the .speedscope.json file at https://www.speedscope.app, "
+          "or the .pstats file with `python -m pstats` / snakeviz.")
+
+
+def run_profile_tool(setup_file: str, scenario_file: str, output: str = "profile", top: int = 15):
+    try:
+        print(f"Profiling {scenario_file} with {setup_file}...")
+        report = profile_scenario(setup_file, scenario_file, output)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_report(report, top)
@@ -1,102 +1,363 @@
-from rdflib import Graph, RDF, URIRef
-from cs_framework.logging.ontology import CONCEPT, ACTION, EVENT, SYNCHRONIZATION, HAS_NAME, BELONGS_TO, TRIGGERED_BY, CAUSED_BY, STATUS
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from cs_framework.logging.trace_cache import load_trace_graph
+from cs_framework.logging.trace_index import TraceIndex
+from cs_framework.logging.tail import JournalTickIndex
 
-def load_graph_data(ttl_file: str):
-    g = Graph()
+CATEGORY_STYLE = {
+    "Concept": (30, "#5470c6"),
+    "Action": (15, "#91cc75"),
+    "Event": (15, "#fac858"),
+}
+FAILURE_COLOR = "#ee6666"
+
+MODES = ("detail", "aggregate", "hot", "window")
+
+# Parsed graph -> index, so repeated loads of an unchanged trace skip the indexing pass
+_index_memo: Dict[str, Tuple[int, int, TraceIndex]] = {}
+# Journal path -> tick offsets, kept up to date incrementally
+_tick_indexes: Dict[str, JournalTickIndex] = {}
+
+
+def _trace_index(ttl_file: str) -> TraceIndex:
+    g = load_trace_graph(ttl_file)
+    memo = _index_memo.get(ttl_file)
+    if memo and memo[0] == id(g) and memo[1] == len(g):
+        return memo[2]
+    index = TraceIndex(g)
+    _index_memo[ttl_file] = (id(g), len(g), index)
+    return index
+
+
+def _tick_index(journal_file: str) -> JournalTickIndex:
+    if journal_file not in _tick_indexes:
+        _tick_indexes[journal_file] = JournalTickIndex(journal_file)
+    return _tick_indexes[journal_file]
+
+
+def tick_range(ttl_file: str) -> Optional[Tuple[int, int]]:
+    """(first, last) tick recorded in a trace or journal, or None."""
     try:
-        g.parse(ttl_file, format="turtle")
+        if ttl_file.endswith(".nt"):
+            return _tick_index(ttl_file).tick_range()
+        return _trace_index(ttl_file).tick_range()
+    except Exception:
+        return None
+
+
+def load_graph_data(ttl_file: str, mode: str = "detail", max_events: int = 50, top_k: int = 10,
+                    ticks: Optional[Tuple[int, int]] = None):
+    """
+    Build chart data for a trace.
+
+    mode="detail": one node per Concept/Action/Event, limited to the latest
+        `max_events` events and the actions around them.
+    mode="aggregate": repeated Concept -> Action -> Event patterns collapsed
+        into one node per (concept, name) with weighted edges.
+    mode="hot": only the `top_k` most frequently fired Event -> Action
+        synchronizations.
+    mode="window": every Action/Event of the ticks `ticks=(first, last)`.
+        For a journal (.nt) only the batches of those ticks are read.
+    """
+    if mode == "window":
+        return window_graph(ttl_file, *(ticks or (0, 0)))
+
+    try:
+        # Shared parsed-graph cache: unchanged or append-only logs are not re-parsed
+        index = _trace_index(ttl_file)
     except FileNotFoundError:
         return {"nodes": [], "links": []}
     except Exception as e:
         # It's common to hit a race condition where the file is being written.
         # Just ignore this update cycle.
-        # print(f"Error parsing log: {e}") 
+        # print(f"Error parsing log: {e}")
         return {"nodes": [], "links": []}
 
+    if mode == "detail":
+        return detail_graph(index, max_events)
+
+    aggregator = TraceAggregator()
+    aggregator.add_records(index_records(index), index)
+    if mode == "aggregate":
+        return aggregator.to_graph()
+    if mode == "hot":
+        return aggregator.to_graph(top_k=top_k)
+    raise ValueError(f"Unknown mode '{mode}'. Available: {', '.join(MODES)}")
+
+
+def index_records(index: TraceIndex, uris: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Records in the same shape TraceTailReader returns, built from an index."""
+    records = []
+    for uri in (index.types if uris is None else uris):
+        record = index.describe(uri)
+        record["concept_uri"] = index.belongs_to.get(uri)
+        record["parent"] = index.parents.get(uri)
+        records.append(record)
+    return records
+
+
+def detail_graph(index: TraceIndex, max_events: int = 50):
+    """
+    Detail view bounded to the latest `max_events` events (by cs:atTick),
+    plus the actions that caused or were triggered by them and all concepts.
+    """
+    events = [uri for uri, kind in index.types.items() if kind == "Event"]
+    # Index order follows the serializer (subjects sorted by id), not logging order
+    events.sort(key=lambda uri: index.ticks.get(uri, -1))
+    shown = set(events[-max_events:]) if max_events else set(events)
+
+    uris = [uri for uri, kind in index.types.items() if kind == "Concept"]
+    actions = set()
+    for uri in shown:
+        parent = index.parents.get(uri)
+        if parent and index.types.get(parent) == "Action":
+            actions.add(parent)
+        for child in index.children.get(uri, ()):
+            actions.add(child)
+    uris.extend(uri for uri in index.types if uri in actions or uri in shown)
+    return _subgraph(index, uris)
+
+
+def window_graph(trace_file: str, first: int, last: int):
+    """All Actions/Events of ticks first..last (inclusive) plus the concepts."""
+    try:
+        if trace_file.endswith(".nt"):
+            index = _tick_index(trace_file).read_window(first, last)
+        else:
+            index = _trace_index(trace_file)
+    except FileNotFoundError:
+        return {"nodes": [], "links": []}
+    except Exception:
+        # Same race with the writer as in load_graph_data
+        return {"nodes": [], "links": []}
+    uris = [uri for uri, kind in index.types.items() if kind == "Concept"]
+    uris.extend(index.in_ticks(first, last))
+    return _subgraph(index, uris)
+
+
+def _subgraph(index: TraceIndex, uris: List[str]):
+    data = records_to_graph(index_records(index, uris))
+    # Drop links to nodes outside the selection
+    ids = {n["id"] for n in data["nodes"]}
+    data["links"] = [l for l in data["links"] if l["source"] in ids and l["target"] in ids]
+    return data
+
+
+def records_to_graph(records):
+    """
+    Convert trace records (see cs_framework.logging.tail.TraceTailReader)
+    into the nodes/links that are new for the chart.
+    """
     nodes = []
     links = []
-    
-    # Helper to get name
-    def get_name(uri):
-        name = g.value(uri, HAS_NAME)
-        return str(name) if name else str(uri).split("/")[-1]
-
-    # 1. Concepts
-    for s in g.subjects(RDF.type, CONCEPT):
+    for record in records:
+        category = record["type"]
+        if category not in CATEGORY_STYLE:
+            continue
+        size, color = CATEGORY_STYLE[category]
+        if category == "Event" and record.get("status", "Success") != "Success":
+            color = FAILURE_COLOR
         nodes.append({
-            "id": str(s),
-            "name": get_name(s),
-            "category": "Concept",
-            "symbolSize": 30,
-            "itemStyle": {"color": "#5470c6"}
+            "id": record["uri"],
+            "name": record["name"] or record["id"],
+            "category": category,
+            "symbolSize": size,
+            "itemStyle": {"color": color}
         })
+        if category == "Concept":
+            continue
 
-    # 2. Actions
-    for s in g.subjects(RDF.type, ACTION):
-        concept_uri = g.value(s, BELONGS_TO)
-        nodes.append({
-            "id": str(s),
-            "name": get_name(s),
-            "category": "Action",
-            "symbolSize": 15,
-            "itemStyle": {"color": "#91cc75"}
-        })
-        # Link Action to Concept
-        if concept_uri:
+        if record.get("concept_uri"):
             links.append({
-                "source": str(concept_uri),
-                "target": str(s),
+                "source": record["concept_uri"],
+                "target": record["uri"],
                 "lineStyle": {"type": "dashed"}
             })
-        
-        # Triggered By (Event -> Action)
-        trigger_uri = g.value(s, TRIGGERED_BY)
-        if trigger_uri:
+        if record.get("parent"):
             links.append({
-                "source": str(trigger_uri),
-                "target": str(s),
-                "label": {"show": True, "formatter": "TriggeredBy"}
+                "source": record["parent"],
+                "target": record["uri"],
+                "label": {"show": True, "formatter": "TriggeredBy" if category == "Action" else "CausedBy"}
             })
+    return {"nodes": nodes, "links": links}
 
-    # 3. Events
-    # Limit to last 50 events to prevent graph explosion
-    all_events = list(g.subjects(RDF.type, EVENT))
-    # Assuming the parser reads in order, or we just take a subset.
-    # For a better UX, we should sort by timestamp if available, but for now we slice.
-    # Since we append to file, the last ones parsed might be the last ones in file (depending on parser implementation).
-    # However, rdflib's default store is not ordered. 
-    # But let's try to just show a limited number.
-    display_events = all_events[-50:] if len(all_events) > 50 else all_events
-
-    for s in display_events:
-        concept_uri = g.value(s, BELONGS_TO)
-        status = g.value(s, STATUS)
-        color = "#fac858" if str(status) == "Success" else "#ee6666"
-        
-        nodes.append({
-            "id": str(s),
-            "name": get_name(s),
-            "category": "Event",
-            "symbolSize": 15,
-            "itemStyle": {"color": color}
-        })
-        
-        # Link Event to Concept
-        if concept_uri:
-            links.append({
-                "source": str(concept_uri),
-                "target": str(s),
-                "lineStyle": {"type": "dashed"}
-            })
-            
-        # Caused By (Action -> Event)
-        cause_uri = g.value(s, CAUSED_BY)
-        if cause_uri:
-            # Only add link if the Action is also in the graph (Actions are not limited currently, but good to check)
-            links.append({
-                "source": str(cause_uri),
-                "target": str(s),
-                "label": {"show": True, "formatter": "CausedBy"}
+
+class TraceAggregator:
+    """
+    Incrementally collapses a trace into patterns.
+
+    Every Action/Event is counted under its (type, concept, name) pattern and
+    every causal link under its (parent pattern, child pattern) edge, so the
+    resulting graph has one node per distinct pattern no matter how long the
+    trace is. Event -> Action edges are synchronization firings.
+    """
+    def __init__(self):
+        self.concepts: Dict[str, str] = {}
+        self.node_counts: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.edge_counts: Counter = Counter()
+
+    def add_records(self, records: Iterable[Dict[str, Any]], index: TraceIndex):
+        for record in records:
+            kind = record["type"]
+            if kind == "Concept":
+                self.concepts[record["uri"]] = record["name"] or record["id"]
+                continue
+            if kind not in ("Action", "Event"):
+                continue
+            key = (kind, record.get("concept_uri"), record["name"])
+            self.node_counts[key] += 1
+            if kind == "Event" and record.get("status", "Success") != "Success":
+                self.failures[key] += 1
+            if record.get("concept_uri"):
+                self.edge_counts[(("Concept", record["concept_uri"], None), key)] += 1
+            parent = record.get("parent")
+            if parent and parent in index.types:
+                parent_key = (index.types[parent], index.belongs_to.get(parent), index.names.get(parent))
+                self.edge_counts[(parent_key, key)] += 1
+
+    def hot_syncs(self, top_k: int = 10) -> List[Tuple[tuple, int]]:
+        """The `top_k` most frequent Event -> Action edges."""
+        syncs = [(edge, count) for edge, count in self.edge_counts.items()
+                 if edge[0][0] == "Event" and edge[1][0] == "Action"]
+        syncs.sort(key=lambda item: item[1], reverse=True)
+        return syncs[:top_k]
+
+    def to_graph(self, top_k: Optional[int] = None):
+        if top_k is not None:
+            edges = dict(self.hot_syncs(top_k))
+            # Keep the concepts owning the endpoints for context
+            for (src, dst) in list(edges):
+                for key in (src, dst):
+                    concept_edge = (("Concept", key[1], None), key)
+                    if concept_edge in self.edge_counts:
+                        edges[concept_edge] = self.edge_counts[concept_edge]
+        else:
+            edges = dict(self.edge_counts)
+
+        keys = set()
+        for src, dst in edges:
+            keys.add(src)
+            keys.add(dst)
+        max_count = max((self.node_counts[k] for k in keys if k[0] != "Concept"), default=1)
+
+        nodes = []
+        for key in sorted(keys, key=lambda k: (k[0], str(k[1]), str(k[2]))):
+            kind, concept_uri, name = key
+            size, color = CATEGORY_STYLE[kind]
+            if kind == "Concept":
+                nodes.append({
+                    "id": _key_id(key),
+                    "name": self.concepts.get(concept_uri, str(concept_uri).rsplit("/", 1)[-1]),
+                    "category": kind,
+                    "symbolSize": size,
+                    "itemStyle": {"color": color}
+                })
+                continue
+            count = self.node_counts[key]
+            if self.failures[key]:
+                color = FAILURE_COLOR
+            nodes.append({
+                "id": _key_id(key),
+                "name": f"{name} x{count}",
+                "category": kind,
+                "value": count,
+                # Log scale keeps hot patterns visible without dwarfing the rest
+                "symbolSize": size + 20 * math.log1p(count) / math.log1p(max_count),
+                "itemStyle": {"color": color}
             })
 
-    return {"nodes": nodes, "links": links}
+        max_edge = max(edges.values(), default=1)
+        links = []
+        for (src, dst), count in edges.items():
+            link = {
+                "source": _key_id(src),
+                "target": _key_id(dst),
+                "value": count,
+                "lineStyle": {"width": 1 + 4 * count / max_edge},
+            }
+            if src[0] == "Concept":
+                link["lineStyle"]["type"] = "dashed"
+            else:
+                link["label"] = {"show": True, "formatter": str(count)}
+            links.append(link)
+        return {"nodes": nodes, "links": links}
+
+
+def flame_data(index: TraceIndex, min_fraction: float = 0.001) -> List[list]:
+    """
+    Icicle layout of measured durations (Runner(profile=True)).
+
+    Actions are nested under the events that triggered them and events under
+    the actions that emitted them; siblings with the same name are merged, so
+    repeated cascades add up into one wide frame. Returns rows of
+    [start_ns, end_ns, depth, label, self_ns, total_ns, kind]; frames narrower
+    than `min_fraction` of the total are dropped to keep the chart bounded.
+    """
+    # Merged frame tree: path of (kind, name) -> [self_ns, count]
+    frames: Dict[tuple, list] = {}
+    for uri, duration in index.durations.items():
+        kind = index.types.get(uri)
+        if kind not in ("Action", "Event"):
+            continue
+        path = []
+        seen = set()
+        current = uri
+        while current is not None and current not in seen:
+            seen.add(current)
+            path.append((index.types.get(current), index.names.get(current)))
+            current = index.parents.get(current)
+        frame = frames.setdefault(tuple(reversed(path)), [0, 0])
+        frame[0] += duration
+        frame[1] += 1
+
+    # Make sure every prefix exists (ancestors without a measured duration)
+    for path in list(frames):
+        for i in range(1, len(path)):
+            frames.setdefault(path[:i], [0, 0])
+
+    totals: Dict[tuple, int] = {path: frame[0] for path, frame in frames.items()}
+    for path in sorted(frames, key=len, reverse=True):
+        if len(path) > 1:
+            totals[path[:-1]] += totals[path]
+
+    children: Dict[tuple, List[tuple]] = {}
+    for path in frames:
+        children.setdefault(path[:-1], []).append(path)
+
+    grand_total = sum(totals[p] for p in children.get((), []))
+    if grand_total == 0:
+        return []
+    rows = []
+    stack = [(path, 0) for path in sorted(children.get((), []), key=lambda p: totals[p], reverse=True)]
+    offsets = {(): 0}
+    # Lay out roots left to right, children starting at their parent's offset
+    x = 0
+    for path, _ in stack:
+        offsets[path] = x
+        x += totals[path]
+    while stack:
+        path, depth = stack.pop()
+        total = totals[path]
+        if total < grand_total * min_fraction:
+            continue
+        start = offsets[path]
+        kind, name = path[-1]
+        count = frames[path][1]
+        label = f"{name} x{count}" if count > 1 else str(name)
+        rows.append([start, start + total, depth, label, frames[path][0], total, kind])
+        x = start + frames[path][0]
+        for child in sorted(children.get(path, []), key=lambda p: totals[p], reverse=True):
+            offsets[child] = x
+            x += totals[child]
+            stack.append((child, depth + 1))
+    rows.sort(key=lambda row: (row[2], row[0]))
+    return rows
+
+
+def _key_id(key: tuple) -> str:
+    kind, concept_uri, name = key
+    if kind == "Concept":
+        return str(concept_uri)
+    return f"{kind}:{concept_uri}:{name}"
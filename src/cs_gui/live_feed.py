@@ -0,0 +1,169 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+from cs_framework.logging.tail import TraceTailReader
+try:
+    from .graph_loader import records_to_graph, TraceAggregator, window_graph, tick_range, flame_data
+except ImportError:
+    from graph_loader import records_to_graph, TraceAggregator, window_graph, tick_range, flame_data
+
+
+class GraphDiffFeed:
+    """
+    Turns a growing trace into incremental chart diffs.
+
+    Each poll() returns only nodes/links the browser has not seen yet, at most
+    `max_items` at a time, so a large backlog is streamed in chunks instead of
+    one huge message. Links are held back until both endpoints were sent.
+
+    The browser keeps at most `max_nodes` Action/Event nodes (a sliding
+    window over the newest ones; Concepts always stay): older nodes are
+    listed in "remove" and dropped client-side with their links.
+    """
+    def __init__(self, log_path: str, max_items: int = 5000, max_nodes: int = 2000):
+        self.reader = TraceTailReader(log_path)
+        self.max_items = max_items
+        self.max_nodes = max_nodes
+        self._resets = self.reader.resets
+        self._backlog: deque = deque()
+        self._waiting_links: List[Dict[str, Any]] = []
+        self._sent: Set[str] = set()
+        # Action/Event node ids in the browser, oldest first
+        self._window: deque = deque()
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Return {"reset": bool, "nodes": [...], "links": [...], "remove": [ids]}
+        or None when there is nothing new.
+        """
+        records = self.reader.read_new()
+        reset = self.reader.resets != self._resets
+        if reset:
+            self._resets = self.reader.resets
+            self._backlog.clear()
+            self._waiting_links = []
+            self._sent = set()
+            self._window = deque()
+
+        if records:
+            data = records_to_graph(records)
+            self._backlog.extend(("node", n) for n in data["nodes"])
+            self._backlog.extend(("link", l) for l in data["links"])
+
+        nodes = []
+        new_links = False
+        while self._backlog and len(nodes) < self.max_items:
+            kind, item = self._backlog.popleft()
+            if kind == "node":
+                nodes.append(item)
+                if item["category"] != "Concept" and item["id"] not in self._sent:
+                    self._window.append(item["id"])
+                self._sent.add(item["id"])
+            else:
+                self._waiting_links.append(item)
+                new_links = True
+
+        removed = []
+        while len(self._window) > self.max_nodes:
+            node_id = self._window.popleft()
+            self._sent.discard(node_id)
+            removed.append(node_id)
+        if removed:
+            # Evicted within this poll: the browser never needs to see them
+            gone = set(removed)
+            nodes = [n for n in nodes if n["id"] not in gone]
+
+        links = []
+        if nodes or new_links:
+            waiting = []
+            for link in self._waiting_links:
+                if link["source"] in self._sent and link["target"] in self._sent:
+                    links.append(link)
+                else:
+                    waiting.append(link)
+            # Links whose endpoint never shows up must not pile up forever
+            self._waiting_links = waiting[-self.max_items:]
+
+        if not (reset or nodes or links or removed):
+            return None
+        return {"reset": reset, "nodes": nodes, "links": links, "remove": removed}
+
+    @property
+    def pending(self) -> int:
+        return len(self._backlog)
+
+
+class AggregateFeed:
+    """
+    Keeps a TraceAggregator up to date from a growing trace.
+
+    The aggregated graph has one node per (concept, name) pattern, so poll()
+    returns the whole (small) graph whenever the trace changed instead of a
+    diff. `top_k` limits it to the hottest synchronizations.
+    """
+    def __init__(self, log_path: str, top_k: Optional[int] = None):
+        self.reader = TraceTailReader(log_path)
+        self.top_k = top_k
+        self.aggregator = TraceAggregator()
+        self._resets = self.reader.resets
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Return {"reset": True, "nodes": [...], "links": [...]} or None."""
+        records = self.reader.read_new()
+        reset = self.reader.resets != self._resets
+        if reset:
+            self._resets = self.reader.resets
+            self.aggregator = TraceAggregator()
+        if not (records or reset):
+            return None
+        self.aggregator.add_records(records, self.reader.index)
+        data = self.aggregator.to_graph(top_k=self.top_k)
+        return {"reset": True, "nodes": data["nodes"], "links": data["links"]}
+
+
+class WindowFeed:
+    """
+    Shows the Actions/Events of a tick window selected with set_window().
+    poll() only loads the trace when the window changed.
+    """
+    def __init__(self, log_path: str, first: int = 0, last: int = 0):
+        self.log_path = log_path
+        self.window = (first, last)
+        self._shown: Optional[tuple] = None
+
+    def set_window(self, first: int, last: int):
+        self.window = (first, last)
+
+    def tick_range(self) -> Optional[tuple]:
+        return tick_range(self.log_path)
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        if self.window == self._shown:
+            return None
+        self._shown = self.window
+        data = window_graph(self.log_path, *self.window)
+        return {"reset": True, "nodes": data["nodes"], "links": data["links"]}
+
+
+class FlameFeed:
+    """
+    Icicle rows (see graph_loader.flame_data) for a growing trace.
+    The index is fed incrementally from the tail reader; rows are only
+    recomputed when something new arrived, including durations recorded
+    for nodes that were already shown.
+    """
+    def __init__(self, log_path: str):
+        self.reader = TraceTailReader(log_path)
+        self._resets = self.reader.resets
+        self._triples = self.reader.triples_read
+        self._first = True
+
+    def poll(self) -> Optional[List[list]]:
+        self.reader.read_new()
+        changed = (self.reader.triples_read != self._triples or self.reader.resets != self._resets
+                   or self._first)
+        self._resets = self.reader.resets
+        self._triples = self.reader.triples_read
+        self._first = False
+        if not changed:
+            return None
+        return flame_data(self.reader.index)
@@ -1,4 +1,5 @@
 import argparse
+import json
 import os
 import sys
 
@@ -6,10 +7,70 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
 from nicegui import ui, app
+from cs_framework.logging.logger import journal_path
 try:
-    from .graph_loader import load_graph_data
+    from .live_feed import GraphDiffFeed, AggregateFeed, WindowFeed, FlameFeed
 except ImportError:
-    from graph_loader import load_graph_data
+    from live_feed import GraphDiffFeed, AggregateFeed, WindowFeed, FlameFeed
+
+# Number of synchronizations shown in the "Hot syncs" view
+HOT_SYNCS_TOP_K = 15
+# Ticks shown at once when the timeline is opened
+DEFAULT_TICK_WINDOW = 20
+# Actions/Events the detail view keeps in the browser (newest first; concepts always stay)
+DETAIL_MAX_NODES = 2000
+
+# Applies a diff in the browser: nodes/links are accumulated client-side, so the
+# websocket only carries what is new instead of the whole series every update.
+APPLY_DIFF_JS = """
+(() => {
+    const chart = getElement(%(id)d).chart;
+    if (!chart) return;
+    const store = window.__csfwGraph = window.__csfwGraph || {nodes: [], links: []};
+    const diff = %(diff)s;
+    if (diff.reset) { store.nodes = []; store.links = []; }
+    if (diff.remove && diff.remove.length) {
+        // Sliding window: nodes that fell out of it go, with their links
+        const gone = new Set(diff.remove);
+        store.nodes = store.nodes.filter(n => !gone.has(n.id));
+        store.links = store.links.filter(l => !gone.has(l.source) && !gone.has(l.target));
+    }
+    for (const n of diff.nodes) store.nodes.push(n);
+    for (const l of diff.links) store.links.push(l);
+    chart.setOption({series: [{data: store.nodes, links: store.links}]});
+})();
+"""
+
+# Icicle chart: rows are [start_ns, end_ns, depth, label, self_ns, total_ns, kind]
+FLAME_RENDER_JS = """(params, api) => {
+    const start = api.coord([api.value(0), api.value(2)]);
+    const end = api.coord([api.value(1), api.value(2)]);
+    const height = api.size([0, 1])[1];
+    return {
+        type: 'rect',
+        shape: {x: start[0], y: start[1] - height / 2, width: Math.max(end[0] - start[0], 1), height: height - 2},
+        style: {fill: api.value(6) === 'Event' ? '#fac858' : '#91cc75', stroke: '#fff'},
+        textContent: {style: {text: api.value(3), fontSize: 11, overflow: 'truncate', width: Math.max(end[0] - start[0] - 4, 0)}},
+        textConfig: {position: 'insideLeft'}
+    };
+}"""
+FLAME_TOOLTIP_JS = """(p) => `${p.value[3]}<br/>total ${(p.value[5] / 1e6).toFixed(3)} ms, self ${(p.value[4] / 1e6).toFixed(3)} ms`"""
+
+def feed_path(log_file):
+    # Prefer the append-only journal (RDFLogger(journal=True)): only new bytes are read.
+    journal = journal_path(log_file)
+    return journal if os.path.exists(journal) else log_file
+
+def make_feed(path, mode):
+    if mode == "aggregate":
+        return AggregateFeed(path)
+    if mode == "hot":
+        return AggregateFeed(path, top_k=HOT_SYNCS_TOP_K)
+    if mode == "window":
+        return WindowFeed(path)
+    if mode == "flame":
+        return FlameFeed(path)
+    return GraphDiffFeed(path, max_nodes=DETAIL_MAX_NODES)
 
 def run_gui(log_file="execution.ttl"):
     @ui.page('/')
@@ -48,6 +109,17 @@ def run_gui(log_file="execution.ttl"):
             ui.html('<span title="Action: A command executed by a Concept" style="cursor: help; display: inline-block; width: 12px; height: 12px; background-color: #91cc75; border-radius: 50%; margin-right: 5px;"></span> Action', sanitize=False)
             ui.html('<span title="Event: A signal emitted by a Concept" style="cursor: help; display: inline-block; width: 12px; height: 12px; background-color: #fac858; border-radius: 50%; margin-right: 5px;"></span> Event (Success)', sanitize=False)
             ui.html('<span title="Failure: An error occurred during processing" style="cursor: help; display: inline-block; width: 12px; height: 12px; background-color: #ee6666; border-radius: 50%; margin-right: 5px;"></span> Event (Failure)', sanitize=False)
+            # Aggregated views collapse repeated patterns so large traces stay readable
+            view = ui.toggle({'detail': 'Detail', 'aggregate': 'Patterns', 'hot': 'Hot syncs', 'window': 'Timeline',
+                              'flame': 'Flame'},
+                             value='detail')
+
+        # Tick window for the timeline view; only that window is fetched from the trace
+        with ui.row().classes('w-full items-center gap-4') as timeline:
+            tick_label = ui.label('Ticks')
+            ticks = ui.range(min=0, max=DEFAULT_TICK_WINDOW, value={'min': 0, 'max': DEFAULT_TICK_WINDOW}) \
+                .props('label-always').classes('flex-grow')
+        timeline.set_visibility(False)
 
         # ECharts container
         chart = ui.echart({
@@ -73,24 +145,83 @@ def run_gui(log_file="execution.ttl"):
             ]
         }).classes('w-full h-screen')
 
-        last_mtime = 0
+        # Flame view: where time goes inside cascades (needs Runner(profile=True))
+        flame_chart = ui.echart({
+            'title': {'text': 'Cascade Flame Graph (Runner(profile=True))'},
+            'tooltip': {':formatter': FLAME_TOOLTIP_JS},
+            'xAxis': {'type': 'value', 'show': False},
+            'yAxis': {'type': 'category', 'inverse': True, 'show': False, 'data': []},
+            'dataZoom': [{'type': 'inside', 'xAxisIndex': 0, 'filterMode': 'weakFilter'}],
+            'series': [{'type': 'custom', ':renderItem': FLAME_RENDER_JS, 'encode': {'x': [0, 1], 'y': 2}, 'data': []}]
+        }).classes('w-full h-screen')
+        flame_chart.set_visibility(False)
 
-        def update_graph():
-            nonlocal last_mtime
-            try:
-                mtime = os.path.getmtime(log_file)
-            except FileNotFoundError:
+        # Each page has its own feed, so a freshly opened page starts from the beginning.
+        source = feed_path(log_file)
+        feed = make_feed(source, view.value)
+        first_push = True
+
+        def switch_feed(mode):
+            nonlocal feed, source, first_push
+            source = feed_path(log_file)
+            feed = make_feed(source, mode)
+            first_push = True
+
+        def change_view(e):
+            switch_feed(e.value)
+            timeline.set_visibility(e.value == 'window')
+            chart.set_visibility(e.value != 'flame')
+            flame_chart.set_visibility(e.value == 'flame')
+            if e.value == 'window':
+                update_ticks()
+
+        def update_ticks():
+            # The trace keeps growing: extend the slider to the newest tick
+            span = feed.tick_range()
+            if span is None:
                 return
+            ticks.min, ticks.max = span
+            tick_label.set_text(f'Ticks {span[0]}-{span[1]}')
+            if ticks.value is None or ticks.value['min'] < span[0] or ticks.value['min'] > span[1]:
+                ticks.value = {'min': max(span[0], span[1] - DEFAULT_TICK_WINDOW), 'max': span[1]}
+            feed.set_window(int(ticks.value['min']), int(ticks.value['max']))
 
-            if mtime > last_mtime:
-                data = load_graph_data(log_file)
-                if data["nodes"]:
-                    chart.options['series'][0]['data'] = data["nodes"]
-                    chart.options['series'][0]['links'] = data["links"]
-                    chart.update()
-                last_mtime = mtime
+        def change_ticks(e):
+            if isinstance(feed, WindowFeed) and e.value:
+                feed.set_window(int(e.value['min']), int(e.value['max']))
+
+        view.on_value_change(change_view)
+        ticks.on_value_change(change_ticks)
+
+        def push_diff():
+            nonlocal first_push
+            if source == log_file and feed_path(log_file) != source:
+                # The run started its journal after the page was opened
+                switch_feed(view.value)
+            if isinstance(feed, WindowFeed) and first_push:
+                update_ticks()
+            if isinstance(feed, FlameFeed):
+                rows = feed.poll()
+                if rows is not None:
+                    depth = max((row[2] for row in rows), default=0)
+                    flame_chart.options['yAxis']['data'] = list(range(depth + 1))
+                    flame_chart.options['series'][0]['data'] = rows
+                    flame_chart.update()
+                return
+            diff = feed.poll()
+            if diff is None:
+                if not first_push:
+                    return
+                diff = {"reset": True, "nodes": [], "links": [], "remove": []}
+            if first_push:
+                # The page may have been reloaded: drop what the browser still holds
+                diff["reset"] = True
+                first_push = False
+            ui.run_javascript(APPLY_DIFF_JS % {"id": chart.id, "diff": json.dumps(diff)})
 
-        ui.timer(0.5, update_graph)
+        # Checking the tail is a stat() plus the appended bytes, so it can run often
+        ui.timer(0.1, push_diff)
+        ui.timer(1.0, lambda: isinstance(feed, WindowFeed) and update_ticks())
 
     ui.run(title='C-S Framework GUI', port=8080, reload=False)
 
@@ -68,9 +68,9 @@ def main():
     runner_a.process_events()
 
     # At this point, BridgeA has published to transport.
-    # BridgeB's callback has been called, so BridgeB has a pending event 'remote_received'.
+    # BridgeB's callback has queued the message in its inbox.
     
-    # Step Node B to process remote_received -> pong
+    # Step Node B: the inbox becomes a 'remote_received' event -> pong
     print("Stepping Node B...")
     runner_b.process_events()
 
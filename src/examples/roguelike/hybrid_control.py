@@ -1,7 +1,7 @@
 """
 Hybrid-Control Roguelike
 - Human: Keyboard input (WASD/Arrows)
-- AI/LLM: RDF command file (external process writes to .ttl)
+- AI/LLM: SQLite command queue (external process inserts rows)
 
 Both use the same Runner.dispatch() - unified interface!
 """
@@ -15,6 +15,7 @@ import pyxel
 from cs_framework.engine.runner import Runner
 from cs_framework.core.yaml_loader import YamlLoader
 from cs_framework.logging.logger import RDFLogger
+from cs_framework.engine.command_channel import SQLiteCommandChannel
 from examples.roguelike.src.concepts.player import Player
 from examples.roguelike.src.concepts.monster import Monster
 from examples.roguelike.src.concepts.dungeon import Dungeon
@@ -26,17 +27,18 @@ import numpy as np
 
 
 class HybridControlGame:
-    """Game controllable by both human (keyboard) and AI (RDF commands)."""
+    """Game controllable by both human (keyboard) and AI (queued commands)."""
     
     TILE_SIZE = 8
     
     def __init__(self):
-        # Use a fixed command file path
-        self.command_file = os.path.abspath("src/examples/roguelike/hybrid_commands.ttl")
+        # Use a fixed command queue path
+        self.command_file = os.path.abspath("src/examples/roguelike/hybrid_commands.db")
+        self.commands = SQLiteCommandChannel(self.command_file)
         
         # Setup game with RDF logging
         self.logger = RDFLogger("src/examples/roguelike/hybrid_execution.ttl", console_output=False)
-        self.runner = Runner(logger=self.logger)
+        self.runner = Runner(logger=self.logger, command_channel=self.commands)
         
         self.dungeon = Dungeon("Dungeon", width=30, height=20)
         self.dungeon.generate({"floor": 1})
@@ -77,7 +79,7 @@ class HybridControlGame:
         print(f"Command file: {self.command_file}")
         print("\nControls:")
         print("  Human: WASD or Arrow keys")
-        print("  AI: Write to command file")
+        print("  AI: INSERT INTO commands (target, action, payload) VALUES ('Player', 'move', '{\"dx\": 1, \"dy\": 0}')")
         print("  Q: Quit")
         print(f"{'='*60}\n")
         
@@ -213,11 +215,11 @@ class HybridControlGame:
                 self.command_count["human"] += 1
                 action_taken = True
         
-        # === Check for AI input (RDF commands) ===
+        # === Check for AI input (queued commands) ===
         if not action_taken:
             # Manually poll commands to add validation logic
-            # commands = self.runner.logger.get_pending_commands()
-            commands = [] # DISABLED for performance (using virtual input)
+            # (a single indexed SELECT, cheap enough to run every frame)
+            commands = self.commands.poll()
             executed_count = 0
             
             for cmd in commands:
@@ -246,11 +248,11 @@ class HybridControlGame:
                                 self.runner.dispatch(self.player.id, "move", payload)
                             
                             executed_count += 1
-                            self.runner.logger.mark_command_done(cmd["uri"])
+                            self.commands.ack(cmd["id"])
                         else:
                             # Hit wall - invalid move
                             print(f"  BLOCKED BY WALL at ({new_x}, {new_y})")
-                            self.runner.logger.mark_command_done(cmd["uri"], "Hit wall")
+                            self.commands.ack(cmd["id"], "Hit wall")
 
                     
                     else:
@@ -259,12 +261,13 @@ class HybridControlGame:
                         if concept:
                             self.runner.dispatch(concept.id, action_name, payload)
                             executed_count += 1
-                            self.runner.logger.mark_command_done(cmd["uri"])
+                            self.commands.ack(cmd["id"])
                         else:
-                            self.runner.logger.mark_command_done(cmd["uri"], f"Concept {target_name} not found")
+                            self.commands.ack(cmd["id"], f"Concept {target_name} not found")
 
                 except Exception as e:
-                    self.runner.logger.mark_command_done(cmd["uri"], str(e))
+                    self.commands.ack(cmd["id"], str(e))
+            self.commands.flush()
             
             if executed_count > 0:
                 self.last_controller = "AI"
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import unittest
+from cs_framework.core.async_socket_transport import AsyncSocketHub, AsyncSocketTransport
+from cs_framework.core.async_transport import AsyncLocalTransport, AsyncTransportAdapter, SyncTransportAdapter
+from cs_framework.core.event_bridge import EventBridge
+from cs_framework.core.socket_transport import PUBLISH, SocketHub, SocketTransport, pack_frame
+from cs_framework.core.transport import LocalTransport
+
+
+async def _take(subscription, count, timeout=5):
+    async def take():
+        return [await subscription.get() for _ in range(count)]
+    return await asyncio.wait_for(take(), timeout)
+
+
+class TestAsyncLocalTransport(unittest.TestCase):
+    def test_publish_iterate_and_close(self):
+        async def main():
+            transport = AsyncLocalTransport()
+            first = transport.subscribe("a")
+            second = transport.subscribe("a", maxsize=2, overflow="drop_oldest")
+            for i in range(4):
+                await transport.publish("a", {"i": i})
+            await transport.publish("b", {"i": -1})
+            self.assertEqual([m["i"] for m in await _take(first, 4)], [0, 1, 2, 3])
+            self.assertEqual(second.dropped, 2)
+            second.close()
+            # Buffered messages are still delivered, then the iteration ends
+            self.assertEqual([m["i"] async for m in second], [2, 3])
+            self.assertEqual(list(transport.subscriptions), ["a"])
+
+            # "block" makes the publisher wait for the consumer
+            slow = transport.subscribe("c", maxsize=1)
+            await transport.publish("c", {"i": 0})
+            second_publish = asyncio.create_task(transport.publish("c", {"i": 1}))
+            await asyncio.sleep(0)
+            self.assertFalse(second_publish.done())
+            self.assertEqual((await slow.get())["i"], 0)
+            await second_publish
+            self.assertEqual((await slow.get())["i"], 1)
+
+            # close() wakes a waiting consumer
+            waiter = asyncio.create_task(slow.get())
+            await asyncio.sleep(0)
+            slow.close()
+            with self.assertRaises(StopAsyncIteration):
+                await waiter
+        asyncio.run(main())
+
+
+class TestAdapters(unittest.TestCase):
+    def test_async_over_sync_socket_transport(self):
+        with SocketHub() as hub, SocketTransport(hub.address) as remote:
+            async def main():
+                transport = AsyncTransportAdapter(SocketTransport(hub.address))
+                subscriptions = [transport.subscribe(f"ch{i}") for i in range(50)]
+                # Wait until the hub knows about the channels
+                while len(hub._channels) < 50:
+                    await asyncio.sleep(0.01)
+                for i in range(50):
+                    remote.publish(f"ch{i}", {"i": i})
+                for i, subscription in enumerate(subscriptions):
+                    self.assertEqual(await _take(subscription, 1), [{"i": i}])
+                transport.transport.close()
+            asyncio.run(main())
+
+    def test_event_bridges_over_async_transport(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            shared = AsyncLocalTransport()
+            adapters = [SyncTransportAdapter(shared, loop), SyncTransportAdapter(shared, loop)]
+            sender = EventBridge("BridgeA", adapters[0])
+            receiver = EventBridge("BridgeB", adapters[1], ordered=True)
+            for i in range(20):
+                sender.send_remote({"event_name": "moved", "payload": {"i": i}})
+            for adapter in adapters:
+                adapter.close()
+            receiver.on_tick_start()
+            self.assertEqual([e.payload["payload"]["i"] for e in receiver.collect_events()], list(range(20)))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(2)
+            loop.close()
+
+    def test_sync_callbacks_on_the_loop(self):
+        async def main():
+            local = LocalTransport()
+            transport = AsyncTransportAdapter(local)
+            subscription = transport.subscribe("global")
+            local.publish("global", {"x": 1})
+            await transport.publish("global", {"x": 2})
+            self.assertEqual(await _take(subscription, 2), [{"x": 1}, {"x": 2}])
+        asyncio.run(main())
+
+
+class TestAsyncSocketTransport(unittest.TestCase):
+    def test_async_hub_relays_between_sync_and_async_clients(self):
+        async def main():
+            async with await AsyncSocketHub.start() as hub:
+                a = await AsyncSocketTransport.connect(hub.address, codec="json")
+                b = await AsyncSocketTransport.connect(hub.address, codec="json")
+                inbox = {i: b.subscribe(f"room{i}") for i in range(100)}
+                sync_client = await asyncio.to_thread(SocketTransport, hub.address, "json")
+                received = []
+                sync_client.subscribe("room7", received.append)
+                while len(hub._channels) < 100 or len(hub._channels["room7"]) < 2:
+                    await asyncio.sleep(0.01)
+
+                for i in range(100):
+                    await a.publish(f"room{i}", {"i": i})
+                for i, subscription in inbox.items():
+                    self.assertEqual(await _take(subscription, 1), [{"i": i}])
+                while not received:
+                    await asyncio.sleep(0.01)
+                self.assertEqual(received, [{"i": 7}])
+
+                # Sync client -> async client
+                await asyncio.to_thread(sync_client.publish, "room3", {"from": "sync"})
+                self.assertEqual(await _take(inbox[3], 1), [{"from": "sync"}])
+
+                inbox[5].close()
+                while "room5" in hub._channels:
+                    await asyncio.sleep(0.01)
+                sync_client.close()
+                await a.close()
+                await b.close()
+                # Subscriptions end with the connection
+                self.assertEqual([m async for m in inbox[1]], [])
+        asyncio.run(main())
+
+    def test_full_subscription_does_not_stall_other_channels(self):
+        async def main():
+            async with await AsyncSocketHub.start() as hub:
+                a = await AsyncSocketTransport.connect(hub.address, codec="json")
+                b = await AsyncSocketTransport.connect(hub.address, codec="json")
+                slow = b.subscribe("slow", maxsize=1)
+                fast = b.subscribe("fast")
+                while len(hub._channels) < 2:
+                    await asyncio.sleep(0.01)
+
+                for i in range(3):
+                    await a.publish("slow", {"i": i})
+                # Undecodable frames are skipped, not fatal
+                a._writer.write(pack_frame(PUBLISH, "fast", b"\xff not a message"))
+                await a.publish("fast", {"i": 0})
+                self.assertEqual(await _take(fast, 1), [{"i": 0}])
+                self.assertEqual(await _take(slow, 1), [{"i": 0}])
+                self.assertEqual(slow.dropped, 2)
+                await a.close()
+                await b.close()
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
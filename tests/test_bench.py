@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from cs_framework.bench.harness import run_benchmarks, compare, BENCHMARKS
+from cs_framework.bench.cli import run_bench_tool
+
+
+class TestBench(unittest.TestCase):
+    def test_run_and_compare(self):
+        results = run_benchmarks("concept.*", min_time=0.001, repeats=2)
+        names = set(results["results"])
+        self.assertEqual(names, {"concept.dispatch", "concept.emit.dict", "concept.emit.pydantic"})
+        for result in results["results"].values():
+            self.assertGreater(result["ns_per_op"], 0)
+        self.assertIn("python", results["meta"])
+
+        slower = json.loads(json.dumps(results))
+        slower["results"]["concept.dispatch"]["ns_per_op"] *= 2
+        rows = {row["name"]: row["status"] for row in compare(slower, results)}
+        self.assertEqual(rows["concept.dispatch"], "regressed")
+        rows = {row["name"]: row["status"] for row in compare(results, slower)}
+        self.assertEqual(rows["concept.dispatch"], "improved")
+        self.assertEqual(rows["concept.emit.dict"], "ok")
+
+    def test_examples_and_groups_are_registered(self):
+        run_benchmarks("no-such-benchmark")
+        groups = {group for group, _ in BENCHMARKS.values()}
+        self.assertEqual(groups, {"core", "runner", "logging", "examples", "transport"})
+
+    def test_transport_benchmark_is_torn_down(self):
+        threads = threading.active_count()
+        results = run_benchmarks("transport.socket.roundtrip", min_time=0.001, repeats=1)
+        self.assertGreater(results["results"]["transport.socket.roundtrip"]["ns_per_op"], 0)
+        # Hub, transports and their reader threads are closed after timing
+        deadline = time.monotonic() + 5
+        while threading.active_count() > threads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_cli_exit_code_against_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bench.json")
+            self.assertEqual(run_bench_tool("concept.dispatch", output=output, min_time=0.001, repeats=1), 0)
+            with open(output) as f:
+                baseline = json.load(f)
+            baseline["results"]["concept.dispatch"]["ns_per_op"] /= 100
+            with open(output, "w") as f:
+                json.dump(baseline, f)
+            code = run_bench_tool("concept.dispatch", baseline=output, min_time=0.001, repeats=1)
+            self.assertEqual(code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import tempfile
+import os
+import time
+import threading
+from cs_framework.core.concept import Concept
+from cs_framework.engine.runner import Runner
+from cs_framework.engine.command_channel import SQLiteCommandChannel, RDFCommandChannel, InProcessCommandChannel, _wait_for
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.tools.debugger import LogQueryEngine
+
+class Counter(Concept):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._state = {"count": 0}
+
+    def increment(self, payload: dict):
+        self._state["count"] += payload.get("amount", 1)
+
+class TestCommandChannel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sqlite_channel_delivers_external_commands(self):
+        db = os.path.join(self.tmp.name, "commands.db")
+        channel = SQLiteCommandChannel(db)
+        runner = Runner(command_channel=channel)
+        counter = Counter("Counter")
+        runner.register(counter)
+        runner.start()
+
+        # An external process would open its own connection
+        agent = SQLiteCommandChannel(db)
+        ok = agent.submit("Counter", "increment", {"amount": 3})
+        missing = agent.submit("Nobody", "increment")
+
+        self.assertEqual(runner.poll_and_execute_commands(), 1)
+        self.assertEqual(counter._state["count"], 3)
+        self.assertEqual(agent.status(ok), "done")
+        self.assertEqual(agent.status(missing), "error")
+
+        # Commands are delivered once
+        self.assertEqual(runner.poll_and_execute_commands(), 0)
+        agent.close()
+        channel.close()
+
+    def test_rdf_channel_is_default_with_logger(self):
+        logger = RDFLogger(os.path.join(self.tmp.name, "run.ttl"), console_output=False)
+        runner = Runner(logger=logger)
+        counter = Counter("Counter")
+        runner.register(counter)
+        runner.start()
+
+        logger.add_command("increment", "Counter", {"amount": 2})
+        self.assertEqual(runner.poll_and_execute_commands(), 1)
+        self.assertIsInstance(runner.command_channel, RDFCommandChannel)
+        self.assertEqual(counter._state["count"], 2)
+        self.assertEqual(runner.command_channel.poll(), [])
+
+    def test_states_and_acks_are_written_once_per_tick(self):
+        logger = RDFLogger(os.path.join(self.tmp.name, "run.ttl"), console_output=False)
+        runner = Runner(logger=logger)
+        counter = Counter("Counter")
+        runner.register(counter)
+        runner.start()
+
+        logger.add_command("increment", "Counter", {"amount": 1})
+        logger.add_command("increment", "Counter", {"amount": 1})
+        writes = []
+        for _ in range(3):
+            runner.run_with_external_control(max_ticks=1, poll_interval=0)
+            writes.append(runner.last_tick_writes)
+
+        self.assertEqual(counter._state["count"], 2)
+        # Tick 1: initial states + two acks in a single write, and one trace save
+        # for both commands. Tick 2: only the counter's new state; tick 3: nothing changed
+        self.assertEqual(writes, [2, 1, 0])
+        self.assertEqual(runner.tick_count, 2)
+        # The deferred save still wrote both actions to the trace
+        self.assertEqual(LogQueryEngine(logger.log_file, use_cache=False).get_summary()["actions"], 2)
+
+        # The file reflects the in-memory graph
+        self.assertEqual(RDFLogger(os.path.join(self.tmp.name, "run.ttl"), console_output=False).get_pending_commands(), [])
+
+    def _measure_latency(self, runner, submit):
+        """Submit from another thread while the Runner blocks; return command-to-effect seconds."""
+        counter = runner.get_concept_by_name("Counter")
+        done = threading.Event()
+        latency = []
+
+        def agent():
+            time.sleep(0.05)
+            start = time.perf_counter()
+            submit()
+            while counter._state["count"] == 0:
+                time.sleep(0.0001)
+            latency.append(time.perf_counter() - start)
+            runner.stop_external_control()
+            done.set()
+
+        threading.Thread(target=agent, daemon=True).start()
+        # A long poll interval: only a readiness signal can make this fast
+        runner.run_with_external_control(max_ticks=5, poll_interval=2.0)
+        self.assertTrue(done.wait(1))
+        return latency[0]
+
+    def test_in_process_channel_wakes_runner(self):
+        channel = InProcessCommandChannel()
+        runner = Runner(command_channel=channel)
+        runner.register(Counter("Counter"))
+        runner.start()
+        latency = self._measure_latency(runner, lambda: runner.submit_command("Counter", "increment"))
+        # Woken by the condition variable, not by a timeout
+        self.assertLess(latency, 0.01)
+        self.assertEqual(list(channel.results.values()), ["done"])
+
+    def test_sqlite_channel_wakes_on_external_commit(self):
+        db = os.path.join(self.tmp.name, "commands.db")
+        runner = Runner(command_channel=SQLiteCommandChannel(db))
+        runner.register(Counter("Counter"))
+        runner.start()
+        agent = SQLiteCommandChannel(db)
+        latency = self._measure_latency(runner, lambda: agent.submit("Counter", "increment"))
+        # Noticed within one (capped) check interval after idling
+        self.assertLess(latency, 0.015)
+        agent.close()
+
+    def test_wait_times_out_without_commands(self):
+        channel = InProcessCommandChannel()
+        start = time.perf_counter()
+        self.assertFalse(channel.wait(0.05))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_idle_wait_backs_off(self):
+        checks = []
+        start = time.perf_counter()
+        self.assertFalse(_wait_for(lambda: checks.append(1) and False, 0.3, threading.Event()))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.29)
+        # 1 ms checks would be ~300; backing off to 4 ms leaves about 80
+        self.assertLess(len(checks), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+import threading
+import time
+import unittest
+from cs_framework.core.concept import Concept
+from cs_framework.core.event import EventPattern, ActionInvocation
+from cs_framework.core.event_bridge import EventBridge, BridgeInbox, SequenceTracker
+from cs_framework.core.synchronization import Synchronization
+from cs_framework.core.transport import LocalTransport
+from cs_framework.engine.runner import Runner
+
+
+class Receiver(Concept):
+    def __init__(self, name):
+        super().__init__(name)
+        self._state = {"received": []}
+
+    def receive(self, payload):
+        self._state["received"].append(payload)
+
+
+class TestBridgeInbox(unittest.TestCase):
+    def test_drop_policies(self):
+        inbox = BridgeInbox(2, "drop_oldest")
+        for i in range(4):
+            self.assertTrue(inbox.put({"i": i}))
+        self.assertEqual([m["i"] for m in inbox.drain()], [2, 3])
+        self.assertEqual(inbox.stats(), {"pending": 0, "received": 4, "dropped": 2, "blocked": 0, "high_water": 2})
+
+        inbox = BridgeInbox(2, "drop_newest")
+        results = [inbox.put({"i": i}) for i in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual([m["i"] for m in inbox.drain()], [0, 1])
+        self.assertEqual(inbox.dropped, 2)
+
+        with self.assertRaises(ValueError):
+            BridgeInbox(2, "explode")
+
+    def test_block_waits_for_drain(self):
+        inbox = BridgeInbox(1, "block")
+        inbox.put({"i": 0})
+        done = []
+        producer = threading.Thread(target=lambda: done.append(inbox.put({"i": 1})))
+        producer.start()
+        time.sleep(0.05)
+        self.assertEqual(done, [])
+        self.assertEqual([m["i"] for m in inbox.drain()], [0])
+        producer.join(2)
+        self.assertEqual(done, [True])
+        self.assertEqual(inbox.blocked, 1)
+        self.assertEqual([m["i"] for m in inbox.drain()], [1])
+
+        # The draining thread never waits on itself
+        inbox.put({"i": 2})
+        self.assertFalse(inbox.put({"i": 3}))
+
+        # A bounded wait drops the message
+        other = BridgeInbox(1, "block", block_timeout=0.01)
+        other.put({})
+        worker = threading.Thread(target=lambda: done.append(other.put({})))
+        worker.start()
+        worker.join(2)
+        self.assertEqual(done[-1], False)
+        self.assertEqual(other.dropped, 1)
+
+
+    def test_block_before_first_drain_does_not_deadlock(self):
+        # LocalTransport delivers on the publishing thread, which is also the Runner thread
+        inbox = BridgeInbox(1, "block")
+        self.assertTrue(inbox.put({"i": 0}))
+        self.assertFalse(inbox.put({"i": 1}))
+        self.assertEqual(inbox.dropped, 1)
+        self.assertEqual([m["i"] for m in inbox.drain()], [0])
+
+        bridge = EventBridge("Bridge", LocalTransport(), inbox_size=1)
+        for i in range(3):
+            bridge.transport.publish("global", {"source_bridge": "other", "original_event": "moved",
+                                                "payload": {"i": i}})
+        self.assertEqual(len(bridge.inbox), 1)
+
+
+class TestSequenceTracker(unittest.TestCase):
+    def test_duplicates_within_window(self):
+        tracker = SequenceTracker(window=8)
+        delivered = [m for seq in (0, 1, 1, 3, 2, 0, 3, 20, 13, 12, 20) for m in tracker.offer("a", seq, seq)]
+        self.assertEqual(delivered, [0, 1, 3, 2, 20, 13])
+        # 12 fell out of the 8-wide window behind 20
+        self.assertEqual((tracker.accepted, tracker.duplicates), (6, 5))
+        # Senders are independent
+        self.assertEqual(tracker.offer("b", 1, "b1"), ["b1"])
+
+    def test_ordered_delivery(self):
+        tracker = SequenceTracker(ordered=True, reorder_limit=3, reorder_timeout=60)
+        delivered = []
+        for seq in (0, 2, 3, 1, 1, 4):
+            delivered += tracker.offer("a", seq, seq)
+        self.assertEqual(delivered, [0, 1, 2, 3, 4])
+        self.assertEqual((tracker.reordered, tracker.duplicates), (2, 1))
+
+        # 5 never arrives: given up on once more than 3 later messages are held
+        for seq in (6, 7, 8):
+            self.assertEqual(tracker.offer("a", seq, seq), [])
+        self.assertEqual(tracker.offer("a", 9, 9), [6, 7, 8, 9])
+        self.assertEqual(tracker.skipped, 1)
+        self.assertEqual(tracker.offer("a", 5, 5), [])
+        self.assertEqual(tracker.late, 1)
+
+        # ... or once the oldest held message waited reorder_timeout
+        tracker.reorder_timeout = 0
+        tracker.offer("a", 11, 11)
+        self.assertEqual(tracker.expire(), [11])
+        self.assertEqual(tracker.stats()["held"], 0)
+
+
+class TestEventBridge(unittest.TestCase):
+    def test_runner_drains_inbox_at_tick_start(self):
+        transport = LocalTransport()
+        sender = EventBridge("BridgeA", transport)
+        runner = Runner()
+        bridge = EventBridge("BridgeB", transport)
+        receiver = Receiver("Receiver")
+        runner.register(bridge)
+        runner.register(receiver)
+        runner.register(Synchronization("Forward", when=EventPattern(bridge, "remote_received"),
+                                        then=[ActionInvocation(receiver, "receive", lambda e: e.payload["payload"])]))
+        runner.start()
+
+        threads = [threading.Thread(target=sender.send_remote, args=({"event_name": "moved", "payload": {"i": i}},))
+                   for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Nothing reaches the concept until the Runner ticks
+        self.assertEqual(bridge._pending_events, [])
+        self.assertEqual(len(bridge.inbox), 20)
+
+        runner.process_events()
+        self.assertEqual(sorted(p["i"] for p in receiver._state["received"]), list(range(20)))
+        self.assertEqual(len(bridge.inbox), 0)
+
+    def test_batching_flushes_at_tick_end(self):
+        transport = LocalTransport()
+        published = []
+        transport.subscribe("global", published.append)
+        runner = Runner()
+        source = Receiver("Ghosts")
+        bridge = EventBridge("BridgeA", transport, batch=True, coalesce=["moved"])
+        peer = EventBridge("BridgeB", transport)
+        runner.register(source)
+        runner.register(bridge)
+        runner.register(Synchronization("Send", when=EventPattern(source, "moved"),
+                                        then=[ActionInvocation(bridge, "send_remote", lambda e: {
+                                            "event_name": "moved", "source": e.payload["ghost"], "payload": e.payload})]))
+        runner.start()
+
+        def move_all(payload):
+            for step in range(5):
+                for ghost in ("blinky", "pinky"):
+                    source.emit("moved", {"ghost": ghost, "step": step})
+            source.emit("scored", {})
+        source.move_all = move_all
+        runner.dispatch(source.id, "move_all", {})
+
+        # 10 sends became one message holding the last move of each ghost
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0]["batch"], [["moved", {"ghost": "blinky", "step": 4}],
+                                                 ["moved", {"ghost": "pinky", "step": 4}]])
+        self.assertEqual((bridge.events_sent, bridge.events_coalesced, bridge.messages_published), (10, 8, 1))
+
+        # The receiving bridge unpacks the batch into one event per entry
+        peer.on_tick_start()
+        events = peer.collect_events()
+        self.assertEqual([e.payload["payload"]["ghost"] for e in events], ["blinky", "pinky"])
+        self.assertEqual(events[0].payload["source_bridge"], str(bridge.id))
+        self.assertEqual(events[0].payload["original_event"], "moved")
+
+    def test_coalescing_needs_a_source(self):
+        transport = LocalTransport()
+        published = []
+        transport.subscribe("global", published.append)
+        bridge = EventBridge("Bridge", transport, batch=True, coalesce=["moved"])
+        for ghost in ("blinky", "pinky"):
+            bridge.send_remote({"event_name": "moved", "payload": {"ghost": ghost}})
+        bridge.on_tick_end()
+        # Without "source" the two concepts' moves are not merged into one
+        self.assertEqual(published[0]["batch"], [["moved", {"ghost": "blinky"}], ["moved", {"ghost": "pinky"}]])
+        self.assertEqual(bridge.events_coalesced, 0)
+        self.assertEqual(bridge._unkeyed_warned, {"moved"})
+
+    def test_batch_size_threshold(self):
+        transport = LocalTransport()
+        published = []
+        transport.subscribe("global", published.append)
+        bridge = EventBridge("Bridge", transport, batch=True, max_batch=3)
+        for i in range(7):
+            bridge.send_remote({"event_name": "tick", "payload": {"i": i}})
+        self.assertEqual([len(m["batch"]) for m in published], [3, 3])
+        bridge.on_tick_end()
+        self.assertEqual([len(m["batch"]) for m in published], [3, 3, 1])
+        bridge.on_tick_end()
+        self.assertEqual(len(published), 3)
+
+    def test_batches_survive_the_wire_codec(self):
+        from cs_framework.core.message_codec import JsonMessageCodec, SchemaMessageCodec
+        source = "8c1f6a0e-0000-4000-8000-000000000000"
+        for codec in (JsonMessageCodec(), SchemaMessageCodec()):
+            for message in ({"source_bridge": source, "batch": [["moved", {"x": 1}], ["scored", {}]]},
+                            {"source_bridge": source, "batch": [["moved", {"x": 1}]], "seq": 300},
+                            {"source_bridge": source, "original_event": "moved", "payload": {}, "seq": 0}):
+                data = codec.encode(message)
+                self.assertNotIn(b"source_bridge", data)
+                self.assertEqual(codec.decode(data), message)
+
+    def test_duplicated_and_reordered_delivery(self):
+        transport = LocalTransport()
+        sender = EventBridge("BridgeA", transport)
+        wire = []
+        transport.subscribe("global", wire.append)
+        for i in range(4):
+            sender.send_remote({"event_name": "moved", "payload": {"i": i}})
+        self.assertEqual([m["seq"] for m in wire], [0, 1, 2, 3])
+
+        # An at-least-once path delivers everything twice, out of order
+        receiver = EventBridge("BridgeB", LocalTransport(), ordered=True)
+        for message in [wire[1], wire[0], wire[1], wire[3], wire[0], wire[2], wire[3]]:
+            receiver._on_remote_message(message)
+        receiver.on_tick_start()
+        events = receiver.collect_events()
+        self.assertEqual([e.payload["payload"]["i"] for e in events], [0, 1, 2, 3])
+        self.assertEqual(set(events[0].payload), {"source_bridge", "original_event", "payload"})
+        self.assertEqual(receiver.sequencer.duplicates, 3)
+
+        # Without ordering duplicates are still dropped
+        unordered = EventBridge("BridgeC", LocalTransport())
+        for message in [wire[1], wire[0], wire[1]]:
+            unordered._on_remote_message(message)
+        self.assertEqual([m["payload"]["i"] for m in unordered.inbox.drain()], [1, 0])
+
+    def test_own_messages_are_ignored(self):
+        transport = LocalTransport()
+        bridge = EventBridge("Bridge", transport)
+        bridge.send_remote({"event_name": "moved", "payload": {}})
+        self.assertEqual(bridge.inbox.received, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import urllib.request
+from cs_framework.core.concept import Concept
+from cs_framework.core.event import EventPattern, ActionInvocation
+from cs_framework.core.synchronization import Synchronization
+from cs_framework.engine.runner import Runner
+from cs_framework.engine.metrics import MetricsRegistry
+
+
+class Button(Concept):
+    def press(self, payload: dict):
+        self.emit("pressed", payload)
+
+
+class Lamp(Concept):
+    def toggle(self, payload: dict):
+        if payload.get("broken"):
+            raise ValueError("bulb is broken")
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.runner = Runner()
+        self.button = Button("Button")
+        self.lamp = Lamp("Lamp")
+        self.runner.register(self.button)
+        self.runner.register(self.lamp)
+        self.runner.register(Synchronization(
+            "ButtonToLamp",
+            when=EventPattern(self.button, "pressed"),
+            then=[ActionInvocation(self.lamp, "toggle", lambda e: e.payload)]
+        ))
+        self.runner.start()
+
+    def test_runner_metrics(self):
+        self.runner.dispatch(self.button.id, "press", {})
+        self.runner.dispatch(self.button.id, "press", {"broken": True})
+
+        metrics = self.runner.metrics()
+        self.assertEqual(metrics["ticks_total"][""], 2)
+        # pressed x2 + one failure event
+        self.assertEqual(metrics["events_handled_total"][""], 3)
+        self.assertEqual(metrics["failures_total"][""], 1)
+        self.assertEqual(metrics["sync_matches_total"]["ButtonToLamp"], 2)
+        self.assertEqual(metrics["action_latency_seconds"]["Button.press"]["count"], 2)
+        # The failing toggle raised, so only one toggle completed
+        self.assertEqual(metrics["action_latency_seconds"]["Lamp.toggle"]["count"], 1)
+        self.assertEqual(metrics["cascade_depth"][""]["count"], 2)
+        self.assertEqual(metrics["snapshot_seconds"][""]["count"], 2)
+
+    def test_prometheus_exposition_and_endpoint(self):
+        self.runner.dispatch(self.button.id, "press", {})
+        server = self.runner.serve_metrics(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertIn("text/plain", response.headers["Content-Type"])
+                text = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertIn("# TYPE csfw_events_handled_total counter", text)
+        self.assertIn('csfw_sync_matches_total{sync="ButtonToLamp"} 1', text)
+        self.assertIn('csfw_action_latency_seconds_bucket{action="Lamp.toggle",le="+Inf"} 1', text)
+        self.assertIn('csfw_action_latency_seconds_count{action="Lamp.toggle"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry(prefix="")
+        h = registry.histogram("latency", "test", buckets=(1, 2))
+        for value in (0.5, 1.5, 1.5, 3):
+            h.observe(value)
+        lines = registry.expose().splitlines()
+        self.assertIn('latency_bucket{le="1"} 1', lines)
+        self.assertIn('latency_bucket{le="2"} 3', lines)
+        self.assertIn('latency_bucket{le="+Inf"} 4', lines)
+        self.assertIn("latency_sum 6.5", lines)
+        self.assertIn("latency_count 4", lines)
+
+    def test_disabled(self):
+        runner = Runner(metrics=False)
+        self.assertEqual(runner.metrics(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from cs_framework.tools.profiler import profile_scenario, classify, FRAMEWORK_DIR
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestProfileTool(unittest.TestCase):
+    def test_profile_scenario_writes_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "run")
+            report = profile_scenario(os.path.join(HERE, "fuzzer_setup.py"),
+                                      os.path.join(HERE, "fuzzer_scenario.yaml"), output)
+
+            self.assertEqual([row["name"] for row in report["actions"]], ["TestConcept.add"])
+            self.assertEqual(report["actions"][0]["calls"], 2)
+            self.assertGreater(report["own_time"]["framework"], 0)
+            self.assertGreater(report["own_time"]["user"], 0)
+
+            pstats.Stats(output + ".pstats")
+            with open(output + ".speedscope.json") as f:
+                data = json.load(f)
+            self.assertEqual(data["profiles"][0]["type"], "sampled")
+
+    def test_classify(self):
+        self.assertEqual(classify(os.path.join(FRAMEWORK_DIR, "engine", "runner.py")), "framework")
+        self.assertEqual(classify(json.__file__), "library")
+        self.assertEqual(classify("~"), "library")
+        self.assertEqual(classify(__file__), "user")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from cs_framework.core.concept import Concept
+from cs_framework.core.event import EventPattern, ActionInvocation
+from cs_framework.core.synchronization import Synchronization
+from cs_framework.engine.runner import Runner
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.logging.trace_index import TraceIndex
+from cs_gui.graph_loader import flame_data
+
+
+class Button(Concept):
+    def press(self, payload: dict):
+        self.emit("pressed", payload)
+
+
+class Lamp(Concept):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._state = {"on": False}
+
+    def toggle(self, payload: dict):
+        time.sleep(0.002)
+        self._state["on"] = not self._state["on"]
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logger = RDFLogger(os.path.join(self.tmp.name, "run.ttl"), console_output=False, text_log=False)
+        self.runner = Runner(logger=self.logger, profile=True)
+        self.button = Button("Button")
+        self.lamp = Lamp("Lamp")
+        self.runner.register(self.button)
+        self.runner.register(self.lamp)
+        self.runner.register(Synchronization(
+            "ButtonToLamp",
+            when=EventPattern(self.button, "pressed"),
+            then=[ActionInvocation(self.lamp, "toggle", lambda e: {})]
+        ))
+        self.runner.start()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_spans_nest_actions_under_events(self):
+        self.runner.dispatch(self.button.id, "press", {})
+
+        sync = [s for s in self.runner.profiler.spans if s[0] == "sync"]
+        self.assertEqual(len(sync), 1)
+        by_name = {s[1]: s for s in self.runner.profiler.spans}
+        toggle, pressed = by_name["Lamp.toggle"], by_name["pressed"]
+        self.assertEqual(toggle[3], pressed[2])
+        self.assertEqual(pressed[3], by_name["Button.press"][2])
+        self.assertGreaterEqual(toggle[5] - toggle[4], 2_000_000)
+        # The event span covers the cascade it started
+        self.assertLessEqual(pressed[4], toggle[4])
+        self.assertGreaterEqual(pressed[5], toggle[5])
+
+    def test_exports(self):
+        self.runner.dispatch(self.button.id, "press", {})
+
+        path = os.path.join(self.tmp.name, "run.speedscope.json")
+        self.runner.export_profile(path)
+        with open(path) as f:
+            data = json.load(f)
+        frames = [f["name"] for f in data["shared"]["frames"]]
+        profile = data["profiles"][0]
+        stacks = [[frames[i] for i in sample] for sample in profile["samples"]]
+        self.assertIn(["action:Button.press", "event:pressed", "action:Lamp.toggle"], stacks)
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+
+        path = os.path.join(self.tmp.name, "run.trace.json")
+        self.runner.export_profile(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual({e["cat"] for e in events}, {"action", "event", "sync"})
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+
+    def test_durations_in_trace_feed_flame_view(self):
+        for _ in range(3):
+            self.runner.dispatch(self.button.id, "press", {})
+
+        index = TraceIndex(self.logger.graph)
+        self.assertEqual(len(index.durations), 9)
+        rows = flame_data(index)
+        labels = [(row[2], row[3]) for row in rows]
+        self.assertEqual(labels, [(0, "press x3"), (1, "pressed x3"), (2, "toggle x3")])
+        root, _, leaf = rows
+        # Parents contain their children
+        self.assertLessEqual(root[0], leaf[0])
+        self.assertGreaterEqual(root[1], leaf[1])
+        self.assertGreaterEqual(leaf[4], 6_000_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
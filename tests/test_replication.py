@@ -0,0 +1,121 @@
+import unittest
+from cs_framework.core.concept import Concept
+from cs_framework.core.transport import LocalTransport
+from cs_framework.engine.replication import ReplicaRunner, StatePublisher, apply_delta, diff_state
+from cs_framework.engine.runner import Runner
+
+
+class Board(Concept):
+    def __init__(self, name="Board"):
+        super().__init__(name)
+        self._state = {"score": 0, "pos": {"x": 0, "y": 0}, "dots": [1, 2, 3], "bonus": None}
+
+    def move(self, payload):
+        self._state["pos"]["x"] += 1
+        self._state["score"] += 10
+
+    def eat(self, payload):
+        self._state["dots"].pop()
+        del self._state["bonus"]
+
+
+class Clock(Concept):
+    def __init__(self):
+        super().__init__("Clock")
+        self._state = {"frames": 0}
+
+    def tick(self, payload):
+        self._state["frames"] += 1
+
+
+class TestStateDelta(unittest.TestCase):
+    def test_diff_and_apply(self):
+        old = {"a": 1, "b": {"c": 1, "d": {"e": 1}}, "f": [1], "g": 0}
+        new = {"a": 1, "b": {"c": 2, "d": {"e": 1}}, "f": [1, 2], "h": {"i": 1}}
+        delta = diff_state(old, new)
+        self.assertEqual(delta, {"nested": {"b": {"set": {"c": 2}}}, "set": {"f": [1, 2], "h": {"i": 1}},
+                                 "unset": ["g"]})
+        self.assertEqual(apply_delta(dict(old, b=dict(old["b"])), delta), new)
+        self.assertEqual(diff_state(new, new), {})
+
+
+class TestReplication(unittest.TestCase):
+    def setUp(self):
+        self.transport = LocalTransport()
+        self.runner = Runner()
+        self.board = Board()
+        self.clock = Clock()
+        self.runner.register(self.board)
+        self.runner.register(self.clock)
+        self.runner.start()
+        self.published = []
+        self.transport.subscribe("replication", self.published.append)
+
+    def test_replica_follows_deltas_of_selected_concepts(self):
+        publisher = StatePublisher(self.runner, self.transport, concepts=["Board"])
+        replica = ReplicaRunner(self.transport)
+        mirror = Board()
+        replica.register(mirror)
+
+        self.runner.dispatch(self.board.id, "move", {})
+        self.assertEqual(self.published[-1]["kind"], "keyframe")
+        self.assertEqual(replica.get_state("Board"), self.board._state)
+        self.assertIsNone(replica.get_state("Clock"))
+
+        self.runner.dispatch(self.board.id, "move", {})
+        self.runner.dispatch(self.board.id, "eat", {})
+        # Only changed keys travel
+        self.assertEqual(self.published[-2]["states"], {"Board": {"set": {"score": 20},
+                                                                  "nested": {"pos": {"set": {"x": 2}}}}})
+        self.assertEqual(self.published[-1]["states"], {"Board": {"set": {"dots": [1, 2]}, "unset": ["bonus"]}})
+        self.assertEqual(replica.get_state("Board"), self.board._state)
+        self.assertEqual(mirror._state, self.board._state)
+        self.assertEqual(replica.tick, self.runner.tick_count)
+
+        # Ticks that only change unselected concepts publish nothing
+        count = len(self.published)
+        self.runner.dispatch(self.clock.id, "tick", {})
+        self.assertEqual(len(self.published), count)
+        self.assertEqual((publisher.keyframes, publisher.deltas), (1, 2))
+
+        # Replicas never alias the primary's snapshots
+        replica.states["Board"]["pos"]["x"] = 99
+        self.assertNotEqual(self.runner.history[-1][self.board.id]["pos"]["x"], 99)
+        with self.assertRaises(RuntimeError):
+            replica.dispatch(self.board.id, "move", {})
+
+    def test_late_replica_and_lost_messages_resync(self):
+        publisher = StatePublisher(self.runner, self.transport)
+        self.runner.dispatch(self.board.id, "move", {})
+        self.runner.dispatch(self.board.id, "move", {})
+
+        replica = ReplicaRunner(self.transport)
+        changes = []
+        replica.add_listener(lambda r, names: changes.append(sorted(names)))
+        self.assertFalse(replica.synced)
+        self.runner.dispatch(self.clock.id, "tick", {})
+        self.assertTrue(replica.synced)
+        self.assertEqual(changes, [["Board", "Clock"]])
+        self.assertEqual(replica.get_state("Clock"), {"frames": 1})
+
+        # Drop one delta: the replica notices the gap and asks for a keyframe
+        publisher.seq += 1
+        self.runner.dispatch(self.board.id, "move", {})
+        self.assertEqual((replica.gaps, replica.synced), (1, False))
+        self.runner.dispatch(self.board.id, "move", {})
+        self.assertTrue(replica.synced)
+        self.assertEqual(replica.get_state("Board")["score"], 40)
+        self.assertEqual(publisher.keyframes, 3)
+
+    def test_keyframe_interval(self):
+        publisher = StatePublisher(self.runner, self.transport, keyframe_interval=3)
+        for _ in range(7):
+            self.runner.dispatch(self.clock.id, "tick", {})
+        self.assertEqual([m["kind"][0] for m in self.published], list("kddkddk"))
+        publisher.close()
+        self.runner.dispatch(self.clock.id, "tick", {})
+        self.assertEqual(len(self.published), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import threading
+import unittest
+from unittest import mock
+from cs_framework.core.concept import Concept
+from cs_framework.engine import shadow_runner
+from cs_framework.engine.runner import Runner
+from cs_framework.engine.shadow_runner import ShadowRunner, state_fingerprint
+
+
+class CounterV1(Concept):
+    def __init__(self, name="Counter"):
+        super().__init__(name)
+        self._state["count"] = 0
+
+    def increment(self, payload):
+        self._state["count"] += 1
+
+
+class CounterV2(CounterV1):
+    def increment(self, payload):
+        # Off by one once the count reaches 5
+        self._state["count"] += 2 if self._state["count"] == 5 else 1
+
+
+class SlowCounter(CounterV1):
+    gate = None
+    entered = None
+
+    def increment(self, payload):
+        self.entered.set()
+        self.gate.wait(5)
+        super().increment(payload)
+
+
+class Board(Concept):
+    def __init__(self):
+        super().__init__("Board")
+        self._state = {"cells": {str(i): i for i in range(100)}, "moves": 0}
+
+    def move(self, payload):
+        self._state["moves"] += 1
+
+
+class ClockV1(Concept):
+    """Advances in on_tick_start, without any action."""
+    step = 1
+
+    def __init__(self):
+        super().__init__("Clock")
+        self._state["now"] = 0
+
+    def on_tick_start(self):
+        self._state["now"] += self.step
+
+
+class ClockV2(ClockV1):
+    step = 2
+
+
+def _runners(shadow_cls=CounterV2):
+    main, shadow = Runner(), Runner()
+    main.register(CounterV1())
+    shadow.register(shadow_cls())
+    main.start()
+    shadow.start()
+    return main, shadow
+
+
+class TestShadowRunner(unittest.TestCase):
+    def test_sync_mode(self):
+        main, shadow = _runners()
+        runner = ShadowRunner(main, shadow)
+        for _ in range(6):
+            runner.dispatch("Counter", "increment", {})
+        runner.process_events()
+        # Diffs keep only the differing keys of each side
+        self.assertEqual(runner.diffs[-1]["main"], {"set": {"count": 6}})
+        self.assertEqual(runner.diffs[-1]["shadow"], {"set": {"count": 7}})
+
+    def test_only_changed_concepts_are_fingerprinted(self):
+        self.assertEqual(state_fingerprint({"a": 1, "b": [1, {"c": 2}]}), state_fingerprint({"b": [1, {"c": 2}], "a": 1}))
+        self.assertNotEqual(state_fingerprint({"a": 1}), state_fingerprint({"a": 2}))
+        main, shadow = _runners()
+        main.register(Board())
+        shadow.register(Board())
+        runner = ShadowRunner(main, shadow)
+        with mock.patch.object(shadow_runner, "state_fingerprint", wraps=state_fingerprint) as fingerprint:
+            runner.process_events()
+            self.assertEqual(fingerprint.call_count, 4)
+            for _ in range(6):
+                runner.dispatch("Counter", "increment", {})
+            runner.process_events()
+            # Board did not change: only the two Counter states were hashed again
+            self.assertEqual(fingerprint.call_count, 6)
+            self.assertEqual([d["concept"] for d in runner.diffs], ["Counter"])
+            runner.dispatch("Board", "move", {})
+            runner.process_events()
+            self.assertEqual(fingerprint.call_count, 8)
+        self.assertEqual(len(runner.diffs), 1)
+
+    def test_state_changed_in_tick_hooks_is_compared(self):
+        main, shadow = Runner(), Runner()
+        main.register(ClockV1())
+        shadow.register(ClockV2())
+        main.start()
+        shadow.start()
+        runner = ShadowRunner(main, shadow)
+        for _ in range(3):
+            runner.process_events()
+        self.assertEqual([d["main"] for d in runner.diffs],
+                         [{"set": {"now": 1}}, {"set": {"now": 2}}, {"set": {"now": 3}}])
+
+    def test_full_check_interval_catches_direct_mutation(self):
+        for interval, expected in ((0, 0), (1, 1)):
+            main, shadow = _runners(CounterV1)
+            runner = ShadowRunner(main, shadow, full_check_interval=interval)
+            runner.process_events()
+            # Changed behind the Runner's back: no action marks it
+            main.get_concept_by_name("Counter")._state["count"] = 42
+            runner.process_events()
+            self.assertEqual(len(runner.diffs), expected)
+
+    def test_threaded_mode_compares_each_action(self):
+        main, shadow = _runners()
+        runner = ShadowRunner(main, shadow, threaded=True)
+        for _ in range(8):
+            runner.dispatch("Counter", "increment", {})
+        self.assertTrue(runner.wait(5))
+        # Each action starts from the main state, so only the 6th one differs
+        self.assertEqual([(d["tick"], d["main"], d["shadow"]) for d in runner.diffs],
+                         [(6, {"set": {"count": 6}}, {"set": {"count": 7}})])
+        self.assertEqual(runner.stats()["mirrored"], 8)
+        self.assertEqual(runner.resyncs, 2)
+        self.assertEqual(main.metrics()["shadow_actions_total"]["mirrored"], 8)
+        self.assertEqual(main.metrics()["shadow_diffs_total"][""], 1)
+        self.assertGreater(main.metrics()["shadow_lag_seconds"][""], 0)
+        runner.stop(5)
+
+    def test_sampling_resyncs_from_main_history(self):
+        main, shadow = _runners(CounterV1)
+        runner = ShadowRunner(main, shadow, threaded=True, sample_rate=0.25)
+        for _ in range(12):
+            runner.dispatch("Counter", "increment", {})
+        runner.wait(5)
+        self.assertEqual((runner.mirrored, runner.skipped), (3, 9))
+        self.assertEqual(runner.diffs, [])
+        self.assertEqual(runner.resyncs, 3)
+        self.assertEqual(shadow.get_concept_by_name("Counter")._state, {"count": 12})
+        runner.stop(5)
+
+    def test_main_never_waits_for_a_slow_shadow(self):
+        main, shadow = _runners(SlowCounter)
+        SlowCounter.gate, SlowCounter.entered = threading.Event(), threading.Event()
+        runner = ShadowRunner(main, shadow, threaded=True, queue_size=2)
+        try:
+            runner.dispatch("Counter", "increment", {})
+            SlowCounter.entered.wait(5)
+            for _ in range(9):
+                runner.dispatch("Counter", "increment", {})
+            self.assertEqual(main.get_concept_by_name("Counter")._state, {"count": 10})
+            # One action executing, two queued, the rest dropped
+            self.assertEqual(runner.dropped, 7)
+        finally:
+            SlowCounter.gate.set()
+        runner.wait(5)
+        self.assertEqual(runner.mirrored, 3)
+        self.assertEqual(runner.diffs, [])
+        self.assertGreaterEqual(runner.lag_ticks, 0)
+        runner.stop(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
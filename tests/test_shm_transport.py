@@ -0,0 +1,131 @@
+import multiprocessing
+import subprocess
+import sys
+import time
+import unittest
+import uuid
+from cs_framework.core.event_bridge import EventBridge
+from cs_framework.core.shm_transport import (
+    ShmRing, SharedMemoryTransport, _DATA, _META, _META_STRUCT, _MAGIC, _RECORD
+)
+
+
+def _echo(namespace, count):
+    transport = SharedMemoryTransport(namespace, "peer", "main", codec="json", start_reader=False)
+    transport.subscribe("ping", lambda message: transport.publish("pong", message))
+    deadline = time.monotonic() + 10
+    while transport.messages_received < count and time.monotonic() < deadline:
+        if not transport.poll():
+            time.sleep(0)
+    # Let the other side drain before the rings this process owns are unlinked
+    time.sleep(0.5)
+    transport.close()
+
+
+class TestShmRing(unittest.TestCase):
+    def test_wrap_around_and_full(self):
+        name = "csfw_test_" + uuid.uuid4().hex[:8]
+        writer = ShmRing(name, capacity=64)
+        reader = ShmRing(name)
+        try:
+            self.assertTrue(writer.owner)
+            self.assertFalse(reader.owner)
+            self.assertEqual(reader.capacity, 64)
+            # 24-byte records (8-byte header) wrap the 64-byte ring repeatedly
+            for i in range(50):
+                record = bytes([i]) * 16
+                self.assertTrue(writer.write(record))
+                self.assertEqual(reader.read(), record)
+            self.assertIsNone(reader.read())
+
+            self.assertTrue(writer.write(b"a" * 24))
+            self.assertTrue(writer.write(b"b" * 24))
+            self.assertFalse(writer.write(b"c"))
+            self.assertEqual(reader.read(), b"a" * 24)
+            self.assertTrue(writer.write(b"c"))
+            with self.assertRaises(ValueError):
+                writer.write(b"x" * 100)
+        finally:
+            reader.close()
+            writer.close()
+
+    def test_record_is_read_only_once_fully_visible(self):
+        name = "csfw_test_" + uuid.uuid4().hex[:8]
+        writer = ShmRing(name, capacity=64)
+        reader = ShmRing(name)
+        try:
+            self.assertTrue(writer.write(b"hello"))
+            # As if head became visible before the last payload byte (weak memory ordering)
+            position = _DATA + _RECORD.size + 4
+            writer.buf[position] = ord("x")
+            self.assertIsNone(reader.read())
+            self.assertEqual(reader.pending_bytes(), _RECORD.size + 5)
+            writer.buf[position] = ord("o")
+            self.assertEqual(reader.read(), b"hello")
+        finally:
+            reader.close()
+            writer.close()
+
+    def test_segment_of_dead_creator_is_replaced(self):
+        name = "csfw_test_" + uuid.uuid4().hex[:8]
+        crashed = ShmRing(name, capacity=64)
+        crashed.write(b"stale")
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        # The header now names a creator that is gone, as after a crash
+        _META_STRUCT.pack_into(crashed.buf, _META, _MAGIC, crashed.capacity, dead.pid)
+        crashed.owner = False
+        ring = ShmRing(name, capacity=64)
+        try:
+            self.assertTrue(ring.owner)
+            self.assertIsNone(ring.read())
+        finally:
+            crashed.close()
+            ring.close()
+
+
+class TestSharedMemoryTransport(unittest.TestCase):
+    def test_bridges_in_one_process(self):
+        namespace = "test-" + uuid.uuid4().hex[:8]
+        with SharedMemoryTransport(namespace, "a", "b", codec="json", start_reader=False) as ta, \
+                SharedMemoryTransport(namespace, "b", "a", codec="json", start_reader=False) as tb:
+            bridge_a = EventBridge("BridgeA", ta)
+            bridge_b = EventBridge("BridgeB", tb)
+            bridge_a.send_remote({"event_name": "moved", "payload": {"x": 1}})
+            self.assertEqual(tb.poll(), 1)
+            bridge_b.on_tick_start()
+            event = bridge_b._pending_events[-1]
+            self.assertEqual(event.name, "remote_received")
+            self.assertEqual(event.payload["payload"], {"x": 1})
+            self.assertEqual(event.payload["source_bridge"], str(bridge_a.id))
+            self.assertEqual(ta.poll(), 0)
+
+    def test_full_ring_raises_after_timeout(self):
+        namespace = "test-" + uuid.uuid4().hex[:8]
+        with SharedMemoryTransport(namespace, "a", "b", codec="json", capacity=256,
+                                   publish_timeout=0.01, start_reader=False) as transport:
+            with self.assertRaises(BufferError):
+                for i in range(100):
+                    transport.publish("global", {"i": i})
+
+    def test_across_processes(self):
+        namespace = "test-" + uuid.uuid4().hex[:8]
+        transport = SharedMemoryTransport(namespace, "main", "peer", codec="json")
+        received = []
+        transport.subscribe("pong", received.append)
+        peer = multiprocessing.Process(target=_echo, args=(namespace, 100), daemon=True)
+        peer.start()
+        try:
+            for i in range(100):
+                transport.publish("ping", {"i": i})
+            deadline = time.monotonic() + 10
+            while len(received) < 100 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([m["i"] for m in received], list(range(100)))
+        finally:
+            peer.join(10)
+            transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import io
+import os
+import queue
+import tempfile
+import time
+import unittest
+from cs_framework.core.event_bridge import EventBridge
+from cs_framework.core.message_codec import JsonMessageCodec, MsgpackMessageCodec, get_message_codec, msgpack
+from cs_framework.core.socket_transport import SocketHub, SocketTransport, pack_frame, read_frame, PUBLISH
+
+
+def _wait(q, timeout=5):
+    return q.get(timeout=timeout)
+
+
+def _await_subscription(address, channel, q):
+    # Hub connections are served by separate threads: probe until the
+    # subscriber's SUBSCRIBE frame has been handled
+    probe = SocketTransport(address, codec="json")
+    try:
+        for _ in range(100):
+            probe.publish(channel, {"probe": True})
+            try:
+                return q.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        raise AssertionError("subscription never became active")
+    finally:
+        probe.close()
+
+
+class TestMessageCodec(unittest.TestCase):
+    def test_bridge_messages_use_compact_form(self):
+        codec = JsonMessageCodec()
+        message = {"source_bridge": "8c1f6a0e-0000-4000-8000-000000000000", "original_event": "moved",
+                   "payload": {"x": 1}}
+        data = codec.encode(message)
+        self.assertNotIn(b"source_bridge", data)
+        self.assertEqual(codec.decode(data), message)
+        other = {"kind": "custom", "value": [1, 2]}
+        self.assertEqual(codec.decode(codec.encode(other)), other)
+
+    @unittest.skipIf(msgpack is None, "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        codec = MsgpackMessageCodec()
+        message = {"source_bridge": "8c1f6a0e-0000-4000-8000-000000000000", "original_event": "moved",
+                   "payload": {"x": 1}}
+        self.assertEqual(codec.decode(codec.encode(message)), message)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            get_message_codec("nope")
+
+    def test_frames(self):
+        stream = io.BytesIO(pack_frame(PUBLISH, "chan", b"abc") + pack_frame(PUBLISH, "", b""))
+        self.assertEqual(read_frame(stream), (PUBLISH, "chan", b"abc"))
+        self.assertEqual(read_frame(stream), (PUBLISH, "", b""))
+        self.assertIsNone(read_frame(stream))
+
+
+class TestSocketTransport(unittest.TestCase):
+    def setUp(self):
+        self.hub = SocketHub()
+        self.transports = []
+
+    def tearDown(self):
+        for transport in self.transports:
+            transport.close()
+        self.hub.close()
+
+    def _connect(self, address=None):
+        transport = SocketTransport(address or self.hub.address, codec="json")
+        self.transports.append(transport)
+        return transport
+
+    def _sync(self, transport, channel="sync"):
+        # SUBSCRIBE frames on one connection are handled in order
+        q = queue.Queue()
+        transport.subscribe(channel, q.put)
+        _await_subscription(self.hub.address, channel, q)
+        while not q.empty():
+            q.get()
+
+    def test_fan_out_per_channel(self):
+        a, b, c = self._connect(), self._connect(), self._connect()
+        got_b, got_c = queue.Queue(), queue.Queue()
+        b.subscribe("game", got_b.put)
+        c.subscribe("chat", got_c.put)
+        self._sync(b)
+        self._sync(c)
+
+        a.publish("game", {"n": 1})
+        a.publish("chat", {"n": 2})
+        self.assertEqual(_wait(got_b), {"n": 1})
+        self.assertEqual(_wait(got_c), {"n": 2})
+        self.assertTrue(got_b.empty())
+
+    def test_local_delivery_and_single_hub_subscription(self):
+        a = self._connect()
+        local = []
+        a.subscribe("game", local.append)
+        a.subscribe("game", local.append)
+        a.publish("game", {"n": 1})
+        self.assertEqual(local, [{"n": 1}, {"n": 1}])
+
+        self._sync(a)
+        self.assertEqual(len(self.hub._channels["game"]), 1)
+        a.unsubscribe("game", local.append)
+        a.unsubscribe("game", local.append)
+        self._sync(a, "sync2")
+        self.assertNotIn("game", self.hub._channels)
+
+    def test_event_bridges_across_connections(self):
+        bridge_a = EventBridge("BridgeA", self._connect())
+        bridge_b = EventBridge("BridgeB", self._connect())
+        self._sync(bridge_b.transport, "global")
+        bridge_b.inbox.drain()
+
+        bridge_a.send_remote({"event_name": "moved", "payload": {"x": 3}})
+        for _ in range(100):
+            if len(bridge_b.inbox):
+                break
+            time.sleep(0.05)
+        bridge_b.on_tick_start()
+        event = bridge_b._pending_events[0]
+        self.assertEqual(event.name, "remote_received")
+        self.assertEqual(event.payload["original_event"], "moved")
+        self.assertEqual(event.payload["payload"], {"x": 3})
+        self.assertEqual(event.payload["source_bridge"], str(bridge_a.id))
+
+    def test_undecodable_frame_is_skipped(self):
+        a, b = self._connect(), self._connect()
+        got = queue.Queue()
+        b.subscribe("game", got.put)
+        self._sync(b)
+        received = b.messages_received
+
+        a._connection.send(pack_frame(PUBLISH, "game", b"\xff not a message"))
+        a.publish("game", {"n": 1})
+        self.assertEqual(_wait(got), {"n": 1})
+        self.assertEqual(b.messages_received, received + 1)
+        self.assertTrue(b._reader.is_alive())
+
+    def test_default_codec_is_portable(self):
+        transport = SocketTransport(self.hub.address)
+        self.transports.append(transport)
+        self.assertEqual(transport.codec.name, "json")
+
+    @unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "Unix sockets not available")
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with SocketHub(os.path.join(tmp, "hub.sock")) as hub:
+                a = SocketTransport(hub.address, codec="json")
+                b = SocketTransport(hub.address, codec="json")
+                self.transports += [a, b]
+                q = queue.Queue()
+                b.subscribe("global", q.put)
+                _await_subscription(hub.address, "global", q)
+                a.publish("global", {"n": 1})
+                while _wait(q) != {"n": 1}:
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import uuid
+import pytest
+from pydantic import BaseModel
+from cs_framework.logging.codec import JsonCodec, get_codec, decode_literal
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.logging.ontology import CS, HAS_STATE
+from cs_framework.tools.debugger import LogQueryEngine
+
+
+class Position(BaseModel):
+    x: int
+    y: int
+
+
+def test_json_codec_handles_non_json_values():
+    codec = JsonCodec()
+    value = {"pos": Position(x=1, y=2), "cells": {(0, 1): "wall"}, "id": uuid.UUID(int=1)}
+    decoded = codec.decode(codec.encode(value))
+    assert decoded == {"pos": {"x": 1, "y": 2}, "cells": {"(0, 1)": "wall"}, "id": str(uuid.UUID(int=1))}
+
+
+def test_orjson_codec_matches_json():
+    pytest.importorskip("orjson")
+    codec = get_codec("orjson")
+    value = {"a": [1, 2.5, None, True], "b": {"c": "d"}}
+    assert codec.decode(codec.encode(value)) == value
+    assert decode_literal(codec.to_literal(value)) == value
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("nope")
+
+
+def test_logger_encodes_mutated_payload_again(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "run.ttl"), console_output=False, codec="json")
+    cid = uuid.uuid4()
+    state = {"n": 1}
+    first, second = uuid.uuid4(), uuid.uuid4()
+    # Same dict object emitted twice within one tick, changed in between
+    logger.log_event(first, "stepped", cid, payload=state)
+    state["n"] = 2
+    logger.log_event(second, "stepped", cid, payload=state)
+
+    def logged(event_id):
+        return decode_literal(logger.graph.value(CS[str(event_id)], HAS_STATE))
+
+    assert logged(first) == {"n": 1}
+    assert logged(second) == {"n": 2}
+
+
+def test_query_engine_filters_on_payload_fields(tmp_path):
+    filename = str(tmp_path / "test_codec_query.ttl")
+    logger = RDFLogger(log_file=filename, console_output=False)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Pacman", {"x": 0})
+    logger.log_event(uuid.uuid4(), "moved", cid, payload={"pos": {"x": 1, "y": 0}})
+    logger.log_event(uuid.uuid4(), "moved", cid, payload={"pos": {"x": 2, "y": 0}})
+    logger.log_event(uuid.uuid4(), "ate", cid, payload={"pos": {"x": 2, "y": 0}})
+    logger.save()
+    engine = LogQueryEngine(filename, use_cache=False)
+    assert len(engine.find_events(name="moved")) == 2
+    hits = engine.find_events(name="moved", payload={"pos.x": 2})
+    assert len(hits) == 1
+    assert hits[0]["payload"] == {"pos": {"x": 2, "y": 0}}
+    assert len(engine.find_events(payload={"pos.x": 2})) == 2
+    assert engine.find_events(payload={"pos.z": 2}) == []
@@ -0,0 +1,51 @@
+import uuid
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.tools.debugger import LogQueryEngine
+
+
+def _write_trace(filename):
+    logger = RDFLogger(log_file=filename, console_output=False)
+    cid = uuid.uuid4()
+    root_action = uuid.uuid4()
+    moved = uuid.uuid4()
+    follow_up = uuid.uuid4()
+    failed = uuid.uuid4()
+
+    logger.log_concept(cid, "Player", {})
+    logger.log_synchronization(uuid.uuid4(), "PlayerToBoard")
+    logger.log_action(root_action, "move", cid)
+    logger.log_event(moved, "moved", cid, causal_link=root_action)
+    logger.log_action(follow_up, "update", cid, triggered_by=moved)
+    logger.log_event(failed, "Failure", cid, causal_link=follow_up, status="Error")
+    logger.save()
+    return root_action, moved, follow_up, failed
+
+
+def test_summary_counts(tmp_path):
+    filename = str(tmp_path / "test_debugger_summary.ttl")
+    _write_trace(filename)
+    summary = LogQueryEngine(filename).get_summary()
+    assert summary["concepts"] == 1
+    assert summary["actions"] == 2
+    assert summary["events"] == 2
+    assert summary["synchronizations"] == 1
+    assert summary["failures"] == 1
+
+
+def test_explain_and_consequences(tmp_path):
+    filename = str(tmp_path / "test_debugger_causal.ttl")
+    root_action, moved, follow_up, failed = _write_trace(filename)
+    engine = LogQueryEngine(filename)
+
+    chain = engine.explain(failed)
+    assert [n["name"] for n in chain] == ["move", "moved", "update", "Failure"]
+    assert chain[0]["id"] == str(root_action)
+    assert chain[-1]["status"] == "Error"
+    assert chain[-1]["concept"] == "Player"
+
+    downstream = engine.consequences(root_action)
+    assert [(n["name"], n["depth"]) for n in downstream] == [
+        ("moved", 1), ("update", 2), ("Failure", 3)
+    ]
+    assert len(engine.consequences(str(root_action), depth=2)) == 2
+    assert engine.explain(uuid.uuid4()) == []
@@ -0,0 +1,91 @@
+import uuid
+from cs_framework.logging.logger import RDFLogger
+from cs_gui.graph_loader import load_graph_data
+from cs_gui.live_feed import AggregateFeed
+
+
+def _write_trace(path, rounds):
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    player, board = uuid.uuid4(), uuid.uuid4()
+    logger.log_concept(player, "Player", {})
+    logger.log_concept(board, "Board", {})
+    for i in range(rounds):
+        move = uuid.uuid4()
+        moved = uuid.uuid4()
+        logger.log_action(move, "move", player)
+        logger.log_event(moved, "moved", player, payload={"i": i}, causal_link=move)
+        redraw = uuid.uuid4()
+        logger.log_action(redraw, "redraw", board, triggered_by=moved)
+        if i % 2 == 0:
+            logger.log_event(uuid.uuid4(), "blocked", board, status="Failure", causal_link=redraw)
+    logger.save()
+    return logger
+
+
+def test_aggregate_mode_is_bounded_by_patterns(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    _write_trace(path, 40)
+
+    data = load_graph_data(path, mode="aggregate")
+    by_name = {n["name"]: n for n in data["nodes"]}
+    # 2 concepts + move/moved/redraw/blocked patterns, regardless of 40 rounds
+    assert len(data["nodes"]) == 6
+    assert by_name["moved x40"]["value"] == 40
+    assert by_name["blocked x20"]["itemStyle"]["color"] == "#ee6666"
+    sync = [l for l in data["links"] if "moved" in l["source"] and "redraw" in l["target"]]
+    assert sync[0]["value"] == 40
+
+    detail = load_graph_data(path, mode="detail", max_events=10)
+    events = [n for n in detail["nodes"] if n["category"] == "Event"]
+    assert len(events) == 10
+    ids = {n["id"] for n in detail["nodes"]}
+    assert all(l["source"] in ids and l["target"] in ids for l in detail["links"])
+
+
+def test_detail_mode_shows_latest_ticks(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, text_log=False)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    for tick in range(100):
+        logger.log_event(uuid.uuid4(), f"e{tick:03d}", cid, tick=tick)
+    logger.save()
+
+    detail = load_graph_data(path, mode="detail", max_events=10)
+    events = sorted(n["name"] for n in detail["nodes"] if n["category"] == "Event")
+    assert events == [f"e{tick:03d}" for tick in range(90, 100)]
+
+
+def test_hot_mode_keeps_top_syncs(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    _write_trace(path, 5)
+
+    data = load_graph_data(path, mode="hot", top_k=1)
+    names = {n["name"] for n in data["nodes"]}
+    assert names == {"Player", "Board", "moved x5", "redraw x5"}
+
+
+def test_aggregate_feed_follows_journal(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = _write_trace(path, 3)
+    feed = AggregateFeed(logger.journal_file)
+
+    first = feed.poll()
+    assert first["reset"] is True
+    assert "moved x3" in {n["name"] for n in first["nodes"]}
+    assert feed.poll() is None
+
+
+def test_window_mode_uses_runner_ticks(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    for tick in range(5):
+        logger.log_event(uuid.uuid4(), "tick", cid, tick=tick)
+        logger.save()
+
+    for trace in (path, logger.journal_file):
+        data = load_graph_data(trace, mode="window", ticks=(1, 2))
+        assert [n["category"] for n in data["nodes"]] == ["Concept", "Event", "Event"]
+        assert len(data["links"]) == 2
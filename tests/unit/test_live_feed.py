@@ -0,0 +1,60 @@
+import uuid
+from cs_framework.logging.logger import RDFLogger
+from cs_gui.live_feed import GraphDiffFeed
+
+
+def test_feed_streams_only_new_items_in_chunks(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    feed = GraphDiffFeed(logger.journal_file, max_items=2)
+    assert feed.poll() is None
+
+    cid = uuid.uuid4()
+    aid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    logger.log_action(aid, "move", cid)
+    logger.log_event(uuid.uuid4(), "moved", cid, causal_link=aid)
+    logger.save()
+
+    first = feed.poll()
+    assert [n["name"] for n in first["nodes"]] == ["Player", "move"]
+    assert feed.pending > 0
+
+    second = feed.poll()
+    assert [n["name"] for n in second["nodes"]] == ["moved"]
+    # Links are sent once both endpoints are in the browser
+    sent = {n["id"] for n in first["nodes"] + second["nodes"]}
+    assert len(second["links"]) == 3
+    assert all(l["source"] in sent and l["target"] in sent for l in second["links"])
+    assert feed.poll() is None
+
+    # A new run resets the browser state
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    logger.log_concept(uuid.uuid4(), "Ghost", {})
+    logger.save()
+    diff = feed.poll()
+    assert diff["reset"] is True
+    assert [n["name"] for n in diff["nodes"]] == ["Ghost"]
+
+
+def test_feed_keeps_a_sliding_window_of_nodes(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    feed = GraphDiffFeed(logger.journal_file, max_nodes=4)
+
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    store = {}
+    for i in range(5):
+        aid = uuid.uuid4()
+        logger.log_action(aid, f"move{i}", cid)
+        logger.log_event(uuid.uuid4(), f"moved{i}", cid, causal_link=aid)
+        logger.save()
+        diff = feed.poll()
+        # Mirror APPLY_DIFF_JS
+        for node_id in diff["remove"]:
+            store.pop(node_id, None)
+        store.update((n["id"], n["name"]) for n in diff["nodes"])
+
+    # Concepts stay; only the newest Actions/Events are kept
+    assert sorted(store.values()) == ["Player", "move3", "move4", "moved3", "moved4"]
@@ -52,3 +52,37 @@ def test_logger_full_flow():
     results = logger.graph.query(q)
     names = [str(r[0]) for r in results]
     assert "MyConcept" in names
+
+def _capture(rdf_logger):
+    from loguru import logger as loguru_logger
+    messages = []
+    loguru_logger.add(lambda m: messages.append(m.record["message"]), level=rdf_logger.level)
+    return messages
+
+def test_logger_sampling(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "s.ttl"), console_output=False, sample_rate=3)
+    messages = _capture(logger)
+    cid = uuid.uuid4()
+    for _ in range(6):
+        logger.log_action(uuid.uuid4(), "move", cid)
+    assert len(messages) == 2
+    # Sampling only thins console output; the RDF graph keeps everything
+    assert len(list(logger.graph.subjects(RDF.type, ACTION))) == 6
+
+def test_logger_failures_only(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "f.ttl"), console_output=False, failures_only=True)
+    messages = _capture(logger)
+    cid = uuid.uuid4()
+    for _ in range(3):
+        logger.log_event(uuid.uuid4(), "moved", cid)
+    logger.log_event(uuid.uuid4(), "Failure", cid, status="Error")
+    assert len(messages) == 1
+    assert "Failure" in messages[0]
+
+def test_logger_level_gating(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "l.ttl"), console_output=False, level="INFO")
+    messages = _capture(logger)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "MyConcept", {})
+    logger.log_action(uuid.uuid4(), "move", cid)
+    assert messages == [f"Registered Concept: MyConcept ({cid})"]
@@ -0,0 +1,133 @@
+import enum
+import uuid
+from typing import Any, Dict, List, Literal, Optional
+import pytest
+from pydantic import BaseModel, Field
+from cs_framework.core.message_codec import get_message_codec
+from cs_framework.core.schema_codec import SchemaRegistry, describe_model
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.logging.ontology import CS
+from cs_framework.logging.trace_index import TraceIndex
+from rdflib import Graph
+
+
+class Direction(enum.Enum):
+    UP = "up"
+    DOWN = "down"
+
+
+class Position(BaseModel):
+    x: int = Field(ge=0, le=255)
+    y: int = Field(ge=0, le=255)
+
+
+class Moved(BaseModel):
+    pos: Position
+    direction: Direction
+    mode: Literal["chase", "scatter"]
+    speed: float
+    alive: bool
+    score: int
+    target: Optional[Position] = None
+    trail: List[int] = []
+    extra: Dict[str, Any] = {}
+    name: str = ""
+
+
+PAYLOAD = {"pos": {"x": 3, "y": 200}, "direction": "down", "mode": "scatter", "speed": 1.5,
+           "alive": True, "score": -70000, "target": None, "trail": [1, 2, 3],
+           "extra": {"k": [1, "a"]}, "name": "blinky"}
+
+
+def test_round_trip_and_compact_layout():
+    registry = SchemaRegistry()
+    registry.register("moved", Moved)
+    data = registry.encode("moved", PAYLOAD)
+    assert registry.decode(data) == ("moved", PAYLOAD)
+    with_target = dict(PAYLOAD, target={"x": 1, "y": 2})
+    assert registry.decode(registry.encode("moved", with_target))[1] == with_target
+    # Bounded ints take one byte each, enums an index
+    assert describe_model(Position) == ["model", [["x", ["int", "B"]], ["y", ["int", "B"]]]]
+    assert len(data) < len(get_message_codec("json").encode(PAYLOAD)) // 2
+
+
+def test_unregistered_or_mismatching_payload_falls_back_to_json():
+    registry = SchemaRegistry()
+    registry.register("moved", Moved)
+    for name, payload in (("ate", {"dot": 1}), ("moved", {"pos": "nowhere"}),
+                          ("moved", dict(PAYLOAD, pos={"x": 999, "y": 0}))):
+        out = bytearray()
+        assert registry.encode_into(out, name, payload) == 0
+        assert registry.decode(bytes(out)) == (name, payload)
+
+
+def test_payload_of_another_shape_is_not_cut_down():
+    class GhostMoved(BaseModel):
+        x: int
+        y: int
+        frightened: bool
+
+    registry = SchemaRegistry()
+    registry.register("moved", GhostMoved)
+    # Same event name from another concept: extra key, non-bool value
+    other = {"x": 1, "y": 2, "frightened": "no", "ghost": "blinky"}
+    for payload in (other, {"x": 1, "y": 2, "frightened": "no"}, {"x": True, "y": 2, "frightened": False},
+                    {"x": 1, "y": 2}):
+        out = bytearray()
+        assert registry.encode_into(out, "moved", payload) == 0
+        assert registry.decode(bytes(out)) == ("moved", payload)
+    assert registry.decode(registry.encode("moved", {"x": 1, "y": 2, "frightened": False}))[1] == \
+        {"x": 1, "y": 2, "frightened": False}
+
+
+def test_type_ids_are_stable_and_collisions_are_reported():
+    first, second = SchemaRegistry(), SchemaRegistry()
+    assert first.register("moved", Moved) == second.register("moved", Moved)
+    assert first.register("moved", Position) != first.register("moved", Moved)
+    first.register("teleported", Position, type_id=7)
+    with pytest.raises(ValueError):
+        first.register("moved", Moved, type_id=7)
+    # A reader with only the descriptor decodes the same bytes
+    type_id = first.register("moved", Moved)
+    reader = SchemaRegistry()
+    reader.register_descriptor(*first.describe(type_id), type_id=type_id)
+    assert reader.decode(first.encode("moved", PAYLOAD))[1] == PAYLOAD
+
+
+def test_schema_message_codec_round_trips_bridge_messages():
+    registry = SchemaRegistry()
+    registry.register("moved", Moved)
+    codec = get_message_codec("schema")
+    codec.registry = registry
+    source = str(uuid.uuid4())
+    single = {"source_bridge": source, "original_event": "moved", "payload": PAYLOAD}
+    batch = {"source_bridge": source, "batch": [["moved", PAYLOAD], ["scored", {"points": 10}]]}
+    for message in (single, batch, {"anything": [1, 2]}):
+        assert codec.decode(codec.encode(message)) == message
+    assert len(codec.encode(single)) < len(get_message_codec("json").encode(single))
+
+
+def test_logger_writes_layouts_for_readers(monkeypatch, tmp_path):
+    from cs_framework.core import schema_codec
+    registry = SchemaRegistry()
+    registry.register("moved", Moved)
+    monkeypatch.setattr(schema_codec, "EVENT_SCHEMAS", registry)
+    filename = str(tmp_path / "test_schema_codec.ttl")
+    logger = RDFLogger(log_file=filename, console_output=False, codec="schema")
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Ghost", {"x": 0})
+    moved, ate = uuid.uuid4(), uuid.uuid4()
+    logger.log_event(moved, "moved", cid, payload=PAYLOAD)
+    logger.log_event(uuid.uuid4(), "moved", cid, payload=PAYLOAD)
+    logger.log_event(ate, "ate", cid, payload={"dot": 1})
+    logger.save()
+    monkeypatch.undo()
+    graph = Graph()
+    graph.parse(filename, format="turtle")
+    # Decoded from the layout stored in the trace, not the process registry
+    index = TraceIndex(graph)
+    assert index.payload(str(CS[str(moved)])) == PAYLOAD
+    assert index.payload(str(CS[str(ate)])) == {"dot": 1}
+    assert index.payload(str(CS[str(cid)])) == {"x": 0}
+    assert len(index.schemas()._by_id) == 1
+    assert index.counts["Event"] == 3
@@ -0,0 +1,113 @@
+import uuid
+from cs_framework.logging.logger import RDFLogger
+from cs_framework.logging.ontology import CS
+from cs_framework.logging.tail import TraceTailReader, JournalTickIndex
+from cs_framework.tools.debugger import LogQueryEngine
+
+
+def test_journal_tail_returns_only_new_records(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "run.ttl"), console_output=False, journal=True)
+    reader = TraceTailReader(logger.journal_file)
+    assert reader.read_new() == []
+
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    logger.save()
+    records = reader.read_new()
+    assert [(r["type"], r["name"]) for r in records] == [("Concept", "Player")]
+
+    aid = uuid.uuid4()
+    eid = uuid.uuid4()
+    logger.log_action(aid, "move", cid)
+    logger.log_event(eid, "moved", cid, causal_link=aid)
+    logger.save()
+    records = reader.read_new()
+    assert [r["name"] for r in records] == ["move", "moved"]
+    assert records[1]["parent"] == records[0]["uri"]
+    assert records[1]["concept"] == "Player"
+    assert reader.read_new() == []
+
+
+def test_incomplete_batch_is_deferred(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "run.ttl"), console_output=False, journal=True)
+    logger.log_concept(uuid.uuid4(), "Player", {})
+    logger.save()
+    reader = TraceTailReader(logger.journal_file)
+    reader.read_new()
+
+    # Simulate a writer that has not finished its batch yet
+    line = f"<http://cs-framework.org/schema/{uuid.uuid4()}> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://cs-framework.org/schema/Event> .\n"
+    with open(logger.journal_file, "a", encoding="utf-8") as f:
+        f.write(line)
+    assert reader.read_new() == []
+
+    with open(logger.journal_file, "a", encoding="utf-8") as f:
+        f.write("# batch 99\n")
+    assert [r["type"] for r in reader.read_new()] == ["Event"]
+
+
+def test_truncated_journal_resets(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    logger.log_concept(uuid.uuid4(), "Player", {})
+    logger.log_concept(uuid.uuid4(), "Ghost", {})
+    logger.save()
+    reader = TraceTailReader(logger.journal_file)
+    assert len(reader.read_new()) == 2
+
+    # A new run starts a fresh journal
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    logger.log_concept(uuid.uuid4(), "Board", {})
+    logger.save()
+    records = reader.read_new()
+    assert reader.resets == 1
+    assert [r["name"] for r in records] == ["Board"]
+
+
+def test_turtle_fallback_diffs_triples(tmp_path):
+    logger = RDFLogger(log_file=str(tmp_path / "run.ttl"), console_output=False)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    logger.save()
+    reader = TraceTailReader(logger.log_file)
+    assert len(reader.read_new()) == 1
+
+    eid = uuid.uuid4()
+    logger.log_event(eid, "moved", cid)
+    logger.save()
+    assert [r["name"] for r in reader.read_new()] == ["moved"]
+
+    # A later fact about a node that was already returned still reaches the index
+    read = reader.triples_read
+    logger.log_duration(eid, 1500)
+    logger.save()
+    assert reader.read_new() == []
+    assert reader.triples_read == read + 1
+    assert reader.index.durations[str(CS[str(eid)])] == 1500
+
+
+def test_tick_window_reads_only_matching_batches(tmp_path):
+    path = str(tmp_path / "run.ttl")
+    logger = RDFLogger(log_file=path, console_output=False, journal=True)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    for tick in range(10):
+        aid = uuid.uuid4()
+        logger.log_action(aid, f"move{tick}", cid, tick=tick)
+        logger.log_event(uuid.uuid4(), f"moved{tick}", cid, causal_link=aid, tick=tick)
+        logger.save()
+
+    ticks = JournalTickIndex(logger.journal_file)
+    assert ticks.tick_range() == (0, 9)
+    assert len(ticks.batches) == 10
+
+    index = ticks.read_window(3, 4)
+    names = sorted(index.names[uri] for uri in index.in_ticks(3, 4))
+    assert names == ["move3", "move4", "moved3", "moved4"]
+    # Concepts come along so the window can show them
+    assert index.counts["Concept"] == 1
+    assert index.counts["Action"] == 2
+
+    # The Turtle log records the same ticks
+    engine = LogQueryEngine(path)
+    assert [e["tick"] for e in engine.window(8, 9)] == [8, 8, 9, 9]
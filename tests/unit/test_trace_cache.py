@@ -0,0 +1,104 @@
+import os
+import json
+import uuid
+from rdflib import Graph
+from cs_framework.logging.logger import RDFLogger, journal_path
+from cs_framework.logging.trace_cache import CACHE_VERSION, TraceCache
+
+
+def _write_log(path, n_events=3):
+    logger = RDFLogger(log_file=str(path), console_output=False, text_log=False)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    for _ in range(n_events):
+        logger.log_event(uuid.uuid4(), "moved", cid)
+    logger.save()
+    return logger
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    log = tmp_path / "trace.ttl"
+    _write_log(log)
+
+    first = TraceCache(persist=True)
+    g1 = first.load(str(log))
+    assert first.stats["full_parses"] == 1
+    assert os.path.exists(first.cache_path(str(log)))
+
+    # Same process: memory hit
+    assert first.load(str(log)) is g1
+    assert first.stats["memory_hits"] == 1
+
+    # New process (fresh cache object): served from the binary cache
+    second = TraceCache(persist=True)
+    g2 = second.load(str(log))
+    assert second.stats["disk_hits"] == 1
+    assert set(g1) == set(g2)
+
+    # The copy is plain JSON, never unpickled
+    with open(first.cache_path(str(log)), encoding="utf-8") as f:
+        assert json.load(f)["version"] == CACHE_VERSION
+
+
+def test_no_cache_file_by_default(tmp_path):
+    log = tmp_path / "trace.ttl"
+    _write_log(log)
+    cache = TraceCache()
+    cache.load(str(log))
+    assert not os.path.exists(cache.cache_path(str(log)))
+
+
+def test_appended_log_is_extended(tmp_path):
+    log = tmp_path / "trace.ttl"
+    _write_log(log)
+    cache = TraceCache()
+    graph = cache.load(str(log))
+    before = len(graph)
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('\ncs:extra a cs:Event ;\n    cs:hasName "late" .\n')
+
+    extended = cache.load(str(log))
+    assert cache.stats["extended"] == 1
+    assert len(extended) == before + 2
+    # The graph handed out before is left as it was
+    assert len(graph) == before
+    graph = extended
+
+    expected = Graph()
+    expected.parse(str(log), format="turtle")
+    assert set(graph) == set(expected)
+
+
+def test_rewritten_log_is_reparsed(tmp_path):
+    log = tmp_path / "trace.ttl"
+    _write_log(log, n_events=1)
+    cache = TraceCache()
+    cache.load(str(log))
+
+    _write_log(log, n_events=5)
+    graph = cache.load(str(log))
+    assert cache.stats["full_parses"] == 2
+
+    expected = Graph()
+    expected.parse(str(log), format="turtle")
+    assert set(graph) == set(expected)
+
+
+def test_journal_is_extended_across_saves(tmp_path):
+    log = tmp_path / "trace.ttl"
+    logger = RDFLogger(log_file=str(log), console_output=False, text_log=False, journal=True)
+    cid = uuid.uuid4()
+    logger.log_concept(cid, "Player", {})
+    logger.log_event(uuid.uuid4(), "moved", cid)
+    logger.save()
+
+    cache = TraceCache()
+    journal = journal_path(str(log))
+    cache.load(journal)
+    logger.log_event(uuid.uuid4(), "moved", cid)
+    logger.save()
+    graph = cache.load(journal)
+
+    assert cache.stats == {"memory_hits": 0, "disk_hits": 0, "extended": 1, "full_parses": 1}
+    assert set(graph) == set(logger.graph)